@@ -13,7 +13,10 @@ except ImportError:
     from distutils.core import Extension
 
 
-TO_CYTHONIZE = ["src/bleak_esphome/backend/scanner.py"]
+TO_CYTHONIZE = [
+    "src/bleak_esphome/backend/cache.py",
+    "src/bleak_esphome/backend/scanner.py",
+]
 
 EXTENSIONS = [
     Extension(
@@ -0,0 +1,225 @@
+"""Fleet-wide budget for on-demand active scanning across esphome proxies."""
+
+from __future__ import annotations
+
+import logging
+from collections import deque
+from typing import TYPE_CHECKING
+
+from bluetooth_data_tools import monotonic_time_coarse as MONOTONIC_TIME
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+
+    from .scanner import ESPHomeScanner
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_ACTIVE_PROXIES = 2
+DEFAULT_ACTIVE_SECONDS_PER_MINUTE = 60.0
+DEFAULT_MIN_ACTIVE_WINDOW = 1.0
+
+# The budget is a trailing window of this many seconds.
+_BUDGET_PERIOD = 60.0
+
+# A proxy refused for want of a slot keeps its claim on the next free one
+# this long; habluetooth retries a refused window within about a minute.
+_PENDING_TIMEOUT = 60.0
+
+
+class _ActiveGrant:
+    """Active seconds granted to one proxy's window."""
+
+    __slots__ = ("granted_at", "seconds")
+
+    def __init__(self, granted_at: float, seconds: float) -> None:
+        self.granted_at = granted_at
+        self.seconds = seconds
+
+
+class ActiveScanBudget:
+    """
+    Cap on-demand active scanning across every bound proxy.
+
+    Each proxy flips to ACTIVE on its own when habluetooth asks it to; when
+    many do it together the scan responses flood both the air and the
+    host. Bind one budget to every scanner with
+    :meth:`ESPHomeScanner.set_active_scan_budget` and a new active window
+    only opens when:
+
+    - fewer than ``max_active`` proxies are in a window, and
+    - the windows granted in the last minute add up to less than
+      ``active_seconds_per_minute``. A window that would overrun the
+      budget is shortened to what is left, or refused when that is below
+      ``min_window`` seconds.
+
+    :meth:`async_set_wanted_addresses` names the devices that need scan
+    responses. A proxy's coverage is how many of them it currently hears.
+    Free slots are kept for the best-covering proxies: a request is
+    refused while at least as many idle proxies with strictly better
+    coverage exist as there are free slots. Only proxies whose own
+    request is still pending hold slots back this way: ones refused for
+    want of a slot within the last minute that have not had a window
+    since. A proxy that is idle, finished its window or was refused for
+    lack of seconds cannot starve the others. Refused requests return
+    ``False`` from :meth:`ESPHomeScanner.async_request_active_window`, so
+    habluetooth's scheduler moves on; they are counted in ``denied``.
+    """
+
+    __slots__ = (
+        "_active",
+        "_grants",
+        "_pending",
+        "_scanners",
+        "_wanted",
+        "active_seconds_per_minute",
+        "denied",
+        "granted",
+        "max_active",
+        "min_window",
+        "trimmed",
+    )
+
+    def __init__(
+        self,
+        max_active: int = DEFAULT_MAX_ACTIVE_PROXIES,
+        active_seconds_per_minute: float = DEFAULT_ACTIVE_SECONDS_PER_MINUTE,
+        min_window: float = DEFAULT_MIN_ACTIVE_WINDOW,
+    ) -> None:
+        if max_active <= 0:
+            raise ValueError(f"Active proxy limit must be positive, got {max_active}")
+        if active_seconds_per_minute <= 0:
+            raise ValueError(
+                "Active seconds per minute must be positive, got "
+                f"{active_seconds_per_minute}"
+            )
+        if not 0 <= min_window <= active_seconds_per_minute:
+            raise ValueError(
+                "Minimum window must be between 0 and the per-minute budget, "
+                f"got {min_window}"
+            )
+        self.max_active = max_active
+        self.active_seconds_per_minute = active_seconds_per_minute
+        self.min_window = min_window
+        self.granted = 0
+        self.denied = 0
+        self.trimmed = 0
+        self._active: dict[str, _ActiveGrant] = {}
+        self._grants: deque[_ActiveGrant] = deque()
+        # source -> when its request was refused for want of a slot.
+        self._pending: dict[str, float] = {}
+        self._scanners: dict[str, ESPHomeScanner] = {}
+        self._wanted: frozenset[str] = frozenset()
+
+    @property
+    def active_sources(self) -> list[str]:
+        """Return the sources of the proxies currently in an active window."""
+        return list(self._active)
+
+    def async_register(self, scanner: ESPHomeScanner) -> None:
+        """Consider ``scanner`` when ranking proxies by coverage."""
+        self._scanners[scanner.source] = scanner
+
+    def async_unregister(self, scanner: ESPHomeScanner) -> None:
+        """Stop considering ``scanner``; an open window keeps its grant."""
+        if self._scanners.get(scanner.source) is scanner:
+            del self._scanners[scanner.source]
+            self._pending.pop(scanner.source, None)
+
+    def async_set_wanted_addresses(self, addresses: Iterable[str]) -> None:
+        """Set the addresses of the devices that need scan responses."""
+        self._wanted = frozenset(addresses)
+
+    def async_coverage(self, scanner: ESPHomeScanner) -> int:
+        """Return how many wanted addresses ``scanner`` currently hears."""
+        return scanner.async_count_heard(self._wanted) if self._wanted else 0
+
+    def async_used_seconds(self) -> float:
+        """Return the active seconds granted within the last minute."""
+        grants = self._grants
+        cutoff = MONOTONIC_TIME() - _BUDGET_PERIOD
+        while grants and grants[0].granted_at <= cutoff:
+            grants.popleft()
+        return sum(grant.seconds for grant in grants)
+
+    def async_request(self, scanner: ESPHomeScanner, duration: float) -> float | None:
+        """
+        Ask to open a ``duration`` second window on ``scanner``.
+
+        Returns the seconds granted, possibly fewer than asked for, or
+        ``None`` when the window must not open.
+        """
+        source = scanner.source
+        free_slots = self.max_active - len(self._active)
+        if free_slots <= 0 or self._outranked(scanner, free_slots):
+            self._pending[source] = MONOTONIC_TIME()
+            self._deny(source, duration)
+            return None
+        seconds = min(
+            duration, self.active_seconds_per_minute - self.async_used_seconds()
+        )
+        if seconds < duration:
+            if seconds < self.min_window:
+                # Out of seconds, not slots: nothing to hold a slot for.
+                self._pending.pop(source, None)
+                self._deny(source, duration)
+                return None
+            self.trimmed += 1
+        self._pending.pop(source, None)
+        grant = _ActiveGrant(MONOTONIC_TIME(), seconds)
+        self._grants.append(grant)
+        self._active[source] = grant
+        self.granted += 1
+        return seconds
+
+    def async_extend(self, scanner: ESPHomeScanner, seconds: float) -> float:
+        """Grant up to ``seconds`` more to the open window on ``scanner``."""
+        if (grant := self._active.get(scanner.source)) is None:
+            return 0.0
+        extra = min(seconds, self.active_seconds_per_minute - self.async_used_seconds())
+        if extra <= 0:
+            return 0.0
+        if extra < seconds:
+            self.trimmed += 1
+        grant.seconds += extra
+        return extra
+
+    def async_release(self, scanner: ESPHomeScanner) -> None:
+        """Close the window on ``scanner`` and refund its unused seconds."""
+        if (grant := self._active.pop(scanner.source, None)) is None:
+            return
+        grant.seconds = min(grant.seconds, MONOTONIC_TIME() - grant.granted_at)
+
+    def _outranked(self, scanner: ESPHomeScanner, free_slots: int) -> bool:
+        """Return True if the free slots belong to better-covering proxies."""
+        if not self._wanted:
+            return False
+        coverage = self.async_coverage(scanner)
+        cutoff = MONOTONIC_TIME() - _PENDING_TIMEOUT
+        pending = self._pending
+        better = 0
+        for source, other in self._scanners.items():
+            if (
+                source != scanner.source
+                and source not in self._active
+                and pending.get(source, cutoff) > cutoff
+                and self.async_coverage(other) > coverage
+            ):
+                better += 1
+                if better >= free_slots:
+                    return True
+        return False
+
+    def _deny(self, source: str, duration: float) -> None:
+        """Count and log a refused window."""
+        self.denied += 1
+        _LOGGER.debug(
+            "%s: active window of %ss refused by the fleet budget "
+            "(active=%s/%s used=%.1fs/%.1fs)",
+            source,
+            duration,
+            len(self._active),
+            self.max_active,
+            self.async_used_seconds(),
+            self.active_seconds_per_minute,
+        )
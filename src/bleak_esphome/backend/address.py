@@ -0,0 +1,81 @@
+"""Process-wide uint64 to MAC string intern table for esphome."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+from bluetooth_data_tools import int_to_bluetooth_address
+from lru import LRU  # pylint: disable=no-name-in-module
+
+from .threadsafe import FREE_THREADED, LockedLRU
+
+# Upper bound on interned addresses. Sized for a large fleet's steady-state
+# device population; random private addresses that rotate out are evicted
+# least recently used first.
+MAX_INTERNED_ADDRESSES = 8192
+
+# Shared by every scanner and device in the process so each address is
+# converted once and every call site hands out the same ``str`` object.
+# Resized in place by ``set_address_intern_size``; never rebound, so the
+# hot paths may hold a reference to its bound ``get``. Free-threaded
+# builds may convert on several threads at once, so there every access
+# takes a lock; two threads missing on the same address at once may each
+# convert it, which only costs the interned identity until one of the
+# strings is evicted.
+INTERNED_ADDRESSES: LRU[int, str] | LockedLRU[int, str] = (
+    LockedLRU(MAX_INTERNED_ADDRESSES) if FREE_THREADED else LRU(MAX_INTERNED_ADDRESSES)
+)
+
+
+@dataclass(frozen=True, slots=True)
+class AddressInternStats:
+    """Snapshot of the address intern table."""
+
+    hits: int
+    misses: int
+    size: int
+    capacity: int
+
+
+def intern_address(address: int) -> str:
+    """Return the interned MAC string for a uint64 ``address``."""
+    if (mac := INTERNED_ADDRESSES.get(address)) is None:
+        mac = _intern_miss(address)
+    return mac
+
+
+def _intern_miss(address: int) -> str:
+    """
+    Intern ``address`` after a lookup has already missed.
+
+    The hot paths inline the lookup; going through :func:`intern_address`
+    on a miss would look it up again and count the miss twice.
+    """
+    mac = INTERNED_ADDRESSES[address] = int_to_bluetooth_address(address)
+    return mac
+
+
+def intern_addresses(addresses: list[int]) -> list[str]:
+    """Return the interned MAC strings for a list of uint64 addresses."""
+    return [intern_address(address) for address in addresses]
+
+
+def get_address_intern_stats() -> AddressInternStats:
+    """
+    Return the intern table's hit/miss counters and occupancy.
+
+    A steady miss rate with ``size == capacity`` means the fleet sees more
+    distinct devices than the table holds; raise it with
+    :func:`set_address_intern_size`.
+    """
+    hits, misses = INTERNED_ADDRESSES.get_stats()
+    return AddressInternStats(
+        hits, misses, len(INTERNED_ADDRESSES), INTERNED_ADDRESSES.get_size()
+    )
+
+
+def set_address_intern_size(size: int) -> None:
+    """Resize the intern table, evicting least recently used entries."""
+    if size < 1:
+        raise ValueError(f"Intern table size must be positive, got {size}")
+    INTERNED_ADDRESSES.set_size(size)
@@ -0,0 +1,28 @@
+"""Struct-of-arrays advertisement batches for esphome."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+
+@dataclass(slots=True)
+class RawAdvertisementBatch:
+    """
+    One proxy batch of raw advertisements as parallel arrays.
+
+    Index ``i`` of ``addresses``, ``rssis``, ``payloads`` and
+    ``address_types`` describes the same advertisement; every entry
+    shares the batch's arrival ``time``. ``addresses`` holds interned MAC
+    strings, so a consumer may compare them by identity.
+    """
+
+    source: str
+    time: float
+    addresses: list[str]
+    rssis: list[int]
+    payloads: list[bytes]
+    address_types: list[int]
+
+    def __len__(self) -> int:
+        """Return the number of advertisements in the batch."""
+        return len(self.addresses)
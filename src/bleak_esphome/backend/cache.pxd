@@ -0,0 +1,2 @@
+
+cdef object LRU
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any
 
 from lru import LRU  # pylint: disable=no-name-in-module
 
+from .threadsafe import FREE_THREADED, LockedLRU
+
 if TYPE_CHECKING:
     from collections.abc import MutableMapping
 
@@ -15,16 +17,21 @@ if TYPE_CHECKING:
 MAX_CACHED_SERVICES = 128
 
 
+def _new_cache() -> MutableMapping[Any, Any]:
+    """Return an empty cache, locked when devices may share it across threads."""
+    if FREE_THREADED:
+        return LockedLRU(MAX_CACHED_SERVICES)
+    return LRU(MAX_CACHED_SERVICES)
+
+
 @dataclass(slots=True)
 class ESPHomeBluetoothCache:
     """Shared cache between all ESPHome bluetooth devices."""
 
     _gatt_services_cache: MutableMapping[int, BleakGATTServiceCollection] = field(
-        default_factory=lambda: LRU(MAX_CACHED_SERVICES)
-    )
-    _gatt_mtu_cache: MutableMapping[int, int] = field(
-        default_factory=lambda: LRU(MAX_CACHED_SERVICES)
+        default_factory=_new_cache
     )
+    _gatt_mtu_cache: MutableMapping[int, int] = field(default_factory=_new_cache)
 
     def get_gatt_services_cache(
         self, address: int
@@ -0,0 +1,290 @@
+"""Binary capture and replay of esphome advertisement streams."""
+
+from __future__ import annotations
+
+import asyncio
+import mmap
+import struct
+from typing import TYPE_CHECKING, Any, BinaryIO, NamedTuple
+
+from aioesphomeapi import (
+    BluetoothLEAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator, Mapping
+    from os import PathLike
+
+    from .scanner import ESPHomeScanner
+
+# File layout: an 8 byte magic, then length-prefixed records. Each record
+# is ``<H body length><B type>`` followed by the body, so a reader can
+# skip record types it does not know. A proxy's source is written once as
+# a SOURCE record and batches refer to it by a 16-bit id; each BATCH
+# record is followed by ``count`` ADVERTISEMENT records sharing its
+# monotonic arrival time.
+CAPTURE_MAGIC = b"BLECAP\x00\x01"
+
+RECORD_SOURCE = 1
+RECORD_BATCH = 2
+RECORD_ADVERTISEMENT = 3
+
+_RECORD_HEADER = struct.Struct("<HB")
+_SOURCE = struct.Struct("<HBH")
+_BATCH = struct.Struct("<HBHdH")
+_ADVERTISEMENT = struct.Struct("<HBQBb")
+_SOURCE_BODY = _SOURCE.size - _RECORD_HEADER.size
+_BATCH_BODY = _BATCH.size - _RECORD_HEADER.size
+_ADVERTISEMENT_BODY = _ADVERTISEMENT.size - _RECORD_HEADER.size
+
+# Generous so the event loop only reaches the disk every few thousand
+# advertisements.
+DEFAULT_CAPTURE_BUFFER_SIZE = 1 << 20
+
+_AD_COMPLETE_LOCAL_NAME = 0x09
+_AD_COMPLETE_UUID16 = 0x03
+_AD_COMPLETE_UUID128 = 0x07
+_AD_SERVICE_DATA_UUID16 = 0x16
+_AD_SERVICE_DATA_UUID128 = 0x21
+_AD_MANUFACTURER_DATA = 0xFF
+_BASE_UUID_SUFFIX = "-0000-1000-8000-00805f9b34fb"
+
+
+class CapturedBatch(NamedTuple):
+    """One recorded proxy batch, ready to feed to a scanner."""
+
+    source: str
+    time: float
+    response: BluetoothLERawAdvertisementsResponse
+
+
+def _uuid16(uuid: str) -> int | None:
+    """Return the 16-bit alias of a Bluetooth base UUID, if it is one."""
+    if uuid.startswith("0000") and uuid.endswith(_BASE_UUID_SUFFIX):
+        return int(uuid[4:8], 16)
+    return None
+
+
+def _ad_structure(ad_type: int, value: bytes) -> bytes:
+    """Encode one AD structure, truncating it to the 255 byte maximum."""
+    value = value[:254]
+    return bytes((len(value) + 1, ad_type)) + value
+
+
+def encode_advertisement_data(adv: BluetoothLEAdvertisement) -> bytes:
+    """
+    Re-encode a decoded advertisement as raw AD structures.
+
+    Lets firmware without ``RAW_ADVERTISEMENTS`` be captured in the same
+    format. The structure order and 16/128-bit UUID split are rebuilt
+    from the decoded fields, so the bytes need not match the original
+    over-the-air payload, but parsing them yields the same data.
+    """
+    parts: list[bytes] = []
+    if adv.name:
+        parts.append(_ad_structure(_AD_COMPLETE_LOCAL_NAME, adv.name.encode()))
+    uuid16s = bytearray()
+    uuid128s = bytearray()
+    for uuid in adv.service_uuids:
+        if (short := _uuid16(uuid)) is not None:
+            uuid16s += short.to_bytes(2, "little")
+        else:
+            uuid128s += bytes.fromhex(uuid.replace("-", ""))[::-1]
+    if uuid16s:
+        parts.append(_ad_structure(_AD_COMPLETE_UUID16, bytes(uuid16s)))
+    if uuid128s:
+        parts.append(_ad_structure(_AD_COMPLETE_UUID128, bytes(uuid128s)))
+    for uuid, data in adv.service_data.items():
+        if (short := _uuid16(uuid)) is not None:
+            parts.append(
+                _ad_structure(
+                    _AD_SERVICE_DATA_UUID16, short.to_bytes(2, "little") + data
+                )
+            )
+        else:
+            parts.append(
+                _ad_structure(
+                    _AD_SERVICE_DATA_UUID128,
+                    bytes.fromhex(uuid.replace("-", ""))[::-1] + data,
+                )
+            )
+    for company_id, data in adv.manufacturer_data.items():
+        parts.append(
+            _ad_structure(
+                _AD_MANUFACTURER_DATA, company_id.to_bytes(2, "little") + data
+            )
+        )
+    return b"".join(parts)
+
+
+class AdvertisementRecorder:
+    """
+    Append proxy advertisement batches to a compact binary capture.
+
+    Bind to one or more scanners with
+    :meth:`ESPHomeScanner.set_capture_recorder`; every batch is recorded
+    before any filtering or suppression, so a replay reproduces the
+    load the host actually received. Writes go through a large buffer
+    and only reach the disk when it fills or on :meth:`flush` /
+    :meth:`close`.
+    """
+
+    __slots__ = ("_file", "_sources", "records")
+
+    def __init__(
+        self,
+        path: str | PathLike[str],
+        buffer_size: int = DEFAULT_CAPTURE_BUFFER_SIZE,
+    ) -> None:
+        self._file: BinaryIO = open(path, "ab", buffering=buffer_size)  # noqa: SIM115
+        if not self._file.tell():
+            self._file.write(CAPTURE_MAGIC)
+        self._sources: dict[str, int] = {}
+        self.records = 0
+
+    def _source_id(self, source: str) -> int:
+        """Return the id for ``source``, writing its SOURCE record once."""
+        if (source_id := self._sources.get(source)) is None:
+            source_id = self._sources[source] = len(self._sources)
+            name = source.encode()
+            self._file.write(
+                _SOURCE.pack(_SOURCE_BODY + len(name), RECORD_SOURCE, source_id) + name
+            )
+        return source_id
+
+    def record_raw_advertisements(
+        self, source: str, time: float, advertisements: Any
+    ) -> None:
+        """Record a repeated ``BluetoothLERawAdvertisement`` field."""
+        count = len(advertisements)
+        out = bytearray(
+            _BATCH.pack(_BATCH_BODY, RECORD_BATCH, self._source_id(source), time, count)
+        )
+        pack = _ADVERTISEMENT.pack
+        # Subscript rather than iterate; see async_on_raw_advertisements.
+        for i in range(count):
+            adv = advertisements[i]
+            data = adv.data
+            out += pack(
+                _ADVERTISEMENT_BODY + len(data),
+                RECORD_ADVERTISEMENT,
+                adv.address,
+                adv.address_type,
+                adv.rssi,
+            )
+            out += data
+        self._file.write(out)
+        self.records += count
+
+    def record_advertisement(
+        self, source: str, time: float, adv: BluetoothLEAdvertisement
+    ) -> None:
+        """Record a decoded advertisement as a batch of one."""
+        data = encode_advertisement_data(adv)
+        self._file.write(
+            _BATCH.pack(_BATCH_BODY, RECORD_BATCH, self._source_id(source), time, 1)
+            + _ADVERTISEMENT.pack(
+                _ADVERTISEMENT_BODY + len(data),
+                RECORD_ADVERTISEMENT,
+                adv.address,
+                adv.address_type,
+                adv.rssi,
+            )
+            + data
+        )
+        self.records += 1
+
+    def flush(self) -> None:
+        """Push buffered records to the file."""
+        self._file.flush()
+
+    def close(self) -> None:
+        """Flush and close the capture file."""
+        self._file.close()
+
+
+def read_capture(path: str | PathLike[str]) -> Iterator[CapturedBatch]:
+    """
+    Yield the batches of a capture file in recording order.
+
+    The file is memory-mapped and parsed in place. A record cut short by
+    a crash mid-write ends the iteration; unknown record types are
+    skipped.
+    """
+    with open(path, "rb") as file:
+        if not file.seek(0, 2):
+            return
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as view:
+            if view[: len(CAPTURE_MAGIC)] != CAPTURE_MAGIC:
+                raise ValueError(f"{path} is not an advertisement capture")
+            yield from _parse_records(view)
+
+
+def _parse_records(view: mmap.mmap) -> Iterator[CapturedBatch]:
+    """Parse the records following the magic."""
+    end = len(view)
+    pos = len(CAPTURE_MAGIC)
+    header_size = _RECORD_HEADER.size
+    sources: dict[int, str] = {}
+    pending: CapturedBatch | None = None
+    remaining = 0
+    while pos + header_size <= end:
+        length, record_type = _RECORD_HEADER.unpack_from(view, pos)
+        record_end = pos + header_size + length
+        if record_end > end:
+            break
+        if record_type == RECORD_ADVERTISEMENT and pending is not None and remaining:
+            _, _, address, address_type, rssi = _ADVERTISEMENT.unpack_from(view, pos)
+            pending.response.advertisements.add(
+                address=address,
+                address_type=address_type,
+                rssi=rssi,
+                data=view[pos + _ADVERTISEMENT.size : record_end],
+            )
+            remaining -= 1
+        elif record_type == RECORD_BATCH:
+            if pending is not None:
+                yield pending
+            _, _, source_id, time, remaining = _BATCH.unpack_from(view, pos)
+            pending = CapturedBatch(
+                sources[source_id], time, BluetoothLERawAdvertisementsResponse()
+            )
+        elif record_type == RECORD_SOURCE:
+            _, _, source_id = _SOURCE.unpack_from(view, pos)
+            sources[source_id] = view[pos + _SOURCE.size : record_end].decode()
+        pos = record_end
+    if pending is not None and not remaining:
+        yield pending
+
+
+async def async_replay_capture(
+    path: str | PathLike[str],
+    scanners: Mapping[str, ESPHomeScanner],
+    speed: float = 1.0,
+) -> int:
+    """
+    Feed a capture into ``scanners`` keyed by source and return the count.
+
+    Batches are spaced by their recorded gaps divided by ``speed``;
+    ``speed=0`` replays as fast as possible. Batches from sources with no
+    scanner in ``scanners`` are skipped. The scanners stamp advertisements
+    with the replay-time clock.
+    """
+    replayed = 0
+    start: float | None = None
+    loop = asyncio.get_running_loop()
+    replay_start = loop.time()
+    for batch in read_capture(path):
+        if (scanner := scanners.get(batch.source)) is None:
+            continue
+        if speed:
+            if start is None:
+                start = batch.time
+            if (
+                delay := (batch.time - start) / speed - (loop.time() - replay_start)
+            ) > 0:
+                await asyncio.sleep(delay)
+        scanner.async_on_raw_advertisements(batch.response)
+        replayed += len(batch.response.advertisements)
+    return replayed
@@ -36,7 +36,7 @@ from bluetooth_data_tools import mac_to_int
 from .._cancellation import is_spurious_cancellation
 
 if TYPE_CHECKING:
-    from collections.abc import Callable, Coroutine
+    from collections.abc import Callable, Coroutine, Iterator
 
     from bleak.backends.device import BLEDevice
 
@@ -439,6 +439,7 @@ class ESPHomeClient(BaseBleakClient):
                     passed to the constructor.
 
         """
+        self._reroute_if_queued()
         await self._wait_for_free_connection_slot(CONNECT_FREE_SLOT_TIMEOUT)
         cache = self._cache
 
@@ -454,7 +455,10 @@ class ESPHomeClient(BaseBleakClient):
         timeout = kwargs.get("timeout", self._timeout)
         settle_needed = False
         try:
-            with self._scanner.connecting():
+            with (
+                self._scanner.connecting(),
+                self._slot_lease(timeout + CONNECT_FREE_SLOT_TIMEOUT),
+            ):
                 try:
                     self._cancel_connection_state = (
                         await self._client.bluetooth_device_connect(
@@ -551,10 +555,49 @@ class ESPHomeClient(BaseBleakClient):
         # Settle only; a teardown path has nothing to fail over to.
         await self._settle_slot("disconnect", DISCONNECT_TIMEOUT)
 
+    @contextlib.contextmanager
+    def _slot_lease(self, timeout: float) -> Iterator[None]:
+        """
+        Lease a slot on the proxy for the duration of a connect attempt.
+
+        Other clients passing the connect gate meanwhile see one slot
+        fewer, so they do not pile onto a slot this attempt already
+        claimed. The lease ends with the attempt, or after ``timeout``.
+        """
+        bluetooth_device = self._bluetooth_device
+        address = self._address_as_int
+        bluetooth_device.async_lease_slot(address, timeout)
+        try:
+            yield
+        finally:
+            bluetooth_device.async_release_slot_lease(address)
+
+    def _reroute_if_queued(self) -> None:
+        """
+        Refuse a connect that would queue when another proxy is free.
+
+        Only applies with a connection router bound to the scanner. The
+        refusal fails the attempt fast so the retry is routed to the
+        proxy the router picked instead of waiting for a slot here.
+        habluetooth records it as a failed connect of this device on
+        this proxy, which lowers its score for the retry; the router
+        leaves it out of the proxy's success rate.
+        """
+        bluetooth_device = self._bluetooth_device
+        if bluetooth_device.unleased_slots and not bluetooth_device.slot_waiters:
+            return
+        if (router := self._scanner.connection_router) is None:
+            return
+        if (better := router.async_reroute(self._scanner, self.address)) is not None:
+            raise BleakError(
+                f"{self._description}: Out of connection slots, "
+                f"re-routing to {better.name}"
+            )
+
     async def _wait_for_free_connection_slot(self, timeout: float) -> None:
         """Wait for a free connection slot."""
         bluetooth_device = self._bluetooth_device
-        if bluetooth_device.ble_connections_free:
+        if bluetooth_device.unleased_slots and not bluetooth_device.slot_waiters:
             return
         _LOGGER.debug(
             "%s: Out of connection slots, waiting for a free one",
@@ -4,12 +4,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
+from collections import deque
 from dataclasses import dataclass, field
 from typing import TYPE_CHECKING
 
 from bleak_retry_connector import Allocations
-from bluetooth_data_tools import int_to_bluetooth_address
 
+from .address import intern_address, intern_addresses
 from .cache import ESPHomeBluetoothCache
 
 if TYPE_CHECKING:
@@ -27,7 +28,10 @@ class ESPHomeBluetoothDevice:
     ble_connections_free: int = 0
     ble_connections_limit: int = 0
     ble_allocations: list[int] = field(default_factory=list)
-    _ble_connection_free_futures: set[asyncio.Future[int]] = field(default_factory=set)
+    # Parked slot waiters in arrival order.
+    _ble_connection_free_futures: deque[asyncio.Future[int]] = field(
+        default_factory=deque
+    )
     loop: asyncio.AbstractEventLoop = field(default_factory=asyncio.get_running_loop)
     available: bool = False
     cache: ESPHomeBluetoothCache = field(default_factory=ESPHomeBluetoothCache)
@@ -37,13 +41,155 @@ class ESPHomeBluetoothDevice:
     _tracked_clients: dict[int, Callable[[], None]] = field(default_factory=dict)
     _seen_allocated: bool = False
     _warned_untrusted: bool = False
+    # Index of ``ble_allocations``: its members and their MAC strings,
+    # rebuilt only when the members differ.
+    _allocated_members: frozenset[int] = frozenset()
+    _allocated_addresses: list[str] = field(default_factory=list)
+    # Set when the members or the tracked clients change, so unchanged
+    # slot reports skip the reconcile pass.
+    _reconcile_pending: bool = False
+    # Allocation push coalescing, see ``async_set_allocation_coalescing``.
+    allocation_quiet_period: float = 0.0
+    allocation_max_delay: float = 0.0
+    allocation_pushes_coalesced: int = 0
+    _publish_handle: asyncio.TimerHandle | None = None
+    _publish_deadline: float = 0.0
+    _pending_reports: int = 0
+    # The last snapshot that landed with the subscriber.
+    _published: tuple[int, int, list[str]] | None = None
+    # Local slot leases by address, each expiring on its own timer.
+    _slot_leases: dict[int, asyncio.TimerHandle] = field(default_factory=dict)
+    # Waiters woken with a slot that have not resumed (and leased) yet.
+    _slot_grants: int = 0
+    slot_waits: int = 0
+    slot_wait_seconds: float = 0.0
+    slot_wait_max_seconds: float = 0.0
+
+    @property
+    def slot_waiters(self) -> int:
+        """Return how many callers are parked waiting for a free slot."""
+        return len(self._ble_connection_free_futures)
+
+    @property
+    def slot_leases(self) -> int:
+        """Return how many slots are leased to connects in flight."""
+        return len(self._slot_leases)
+
+    @property
+    def unleased_slots(self) -> int:
+        """
+        Return the free slots not yet claimed by a local connect.
+
+        The proxy's ``ble_connections_free`` only drops once it has seen
+        a connect request, so connects that passed the gate but have not
+        reached the proxy yet are subtracted here.
+        """
+        return max(
+            self.ble_connections_free - len(self._slot_leases) - self._slot_grants, 0
+        )
+
+    @property
+    def allocated_addresses(self) -> list[str]:
+        """
+        Return ``ble_allocations`` as MAC strings.
+
+        The list is cached and shared until the allocated members change;
+        callers must not modify it.
+        """
+        self._async_index_allocations()
+        return self._allocated_addresses
+
+    def _async_index_allocations(self) -> frozenset[int]:
+        """
+        Return the allocated members, reindexing if they changed.
+
+        The members are compared as a set, so a list changed in place is
+        picked up too. The index is only replaced when they differ, so
+        an unchanged result is the same object as before.
+        """
+        allocated = self.ble_allocations
+        members = frozenset(allocated)
+        # A reordered list keeps the cached strings; duplicates, which
+        # firmware never sends, still get a faithful string list.
+        if members != self._allocated_members or len(allocated) != len(
+            self._allocated_addresses
+        ):
+            self._allocated_members = members
+            self._allocated_addresses = intern_addresses(allocated)
+            self._reconcile_pending = True
+        return self._allocated_members
+
+    def async_lease_slot(self, address: int, timeout: float) -> None:
+        """
+        Claim a free slot for a connect to ``address``.
+
+        The lease lasts until :meth:`async_release_slot_lease`, until the
+        proxy reports ``address`` as allocated (its own count has then
+        taken the slot), or until ``timeout`` seconds pass, whichever
+        comes first.
+        """
+        if (handle := self._slot_leases.get(address)) is not None:
+            handle.cancel()
+        self._slot_leases[address] = self.loop.call_later(
+            timeout, self._async_expire_slot_lease, address
+        )
+
+    def async_release_slot_lease(self, address: int) -> None:
+        """Release the slot lease for ``address``, waking a waiter if one is free."""
+        if (handle := self._slot_leases.pop(address, None)) is None:
+            return
+        handle.cancel()
+        if free := self.unleased_slots:
+            self._async_wake_slot_waiters(free)
+
+    def _async_expire_slot_lease(self, address: int) -> None:
+        """Release a lease whose connect never reported back."""
+        _LOGGER.debug(
+            "%s [%s]: Slot lease for %s expired",
+            self.name,
+            self.mac_address,
+            intern_address(address),
+        )
+        self.async_release_slot_lease(address)
 
     def async_subscribe_connection_slots(
         self, callback: Callable[[Allocations], None]
     ) -> None:
         """Subscribe to connection slot changes."""
+        self._async_cancel_publish()
         self._connection_slots_callback = callback
         self._called_callback = False
+        self._published = None
+
+    def async_set_allocation_coalescing(
+        self, quiet_period: float, max_delay: float | None = None
+    ) -> None:
+        """
+        Coalesce bursts of slot reports into one allocation push.
+
+        With a ``quiet_period``, a changed report no longer pushes right
+        away: the latest snapshot is pushed once no report has arrived
+        for ``quiet_period`` seconds, and at most ``max_delay`` seconds
+        (four quiet periods by default) after the first report of the
+        burst, so a steady stream cannot hold it back. The push is
+        skipped when the snapshot matches the last one pushed. The first
+        push after subscribing, and the empty snapshot pushed when the
+        proxy becomes unavailable, still go out immediately. Zero pushes
+        every changed report immediately again.
+        """
+        if quiet_period < 0:
+            raise ValueError(f"Quiet period must not be negative, got {quiet_period}")
+        if max_delay is None:
+            max_delay = quiet_period * 4
+        elif max_delay < quiet_period:
+            raise ValueError(
+                f"Maximum delay must not be below the quiet period, got {max_delay}"
+            )
+        self.allocation_quiet_period = quiet_period
+        self.allocation_max_delay = max_delay
+        if not quiet_period and self._publish_handle is not None:
+            self._publish_handle.cancel()
+            self._async_flush_allocations()
 
     def async_track_client(
         self, address: int, on_ble_disconnected: Callable[[], None]
@@ -64,9 +210,10 @@ class ESPHomeBluetoothDevice:
                 "%s [%s]: Replacing tracked client for %s",
                 self.name,
                 self.mac_address,
-                int_to_bluetooth_address(address),
+                intern_address(address),
             )
         self._tracked_clients[address] = on_ble_disconnected
+        self._reconcile_pending = True
 
     def async_untrack_client(
         self, address: int, on_ble_disconnected: Callable[[], None]
@@ -106,9 +253,18 @@ class ESPHomeBluetoothDevice:
         # Clear the dead session's allocated list and free count so a
         # reused device cannot serve stale state; ``limit`` keeps the
         # last reported capacity.
-        had_state = bool(self.ble_allocations) or bool(self.ble_connections_free)
+        had_state = (
+            bool(self.ble_allocations)
+            or bool(self.ble_connections_free)
+            # A coalesced push still pending is superseded by this one.
+            or self._publish_handle is not None
+        )
+        self._async_cancel_publish()
         self.ble_allocations = []
         self.ble_connections_free = 0
+        for handle in self._slot_leases.values():
+            handle.cancel()
+        self._slot_leases.clear()
         if futures := self._ble_connection_free_futures:
             message = self._unavailable_message()
             for fut in futures:
@@ -142,8 +298,47 @@ class ESPHomeBluetoothDevice:
                 self.mac_address,
             )
             return False
+        self._published = (limit, free, allocated)
         return True
 
+    def _async_schedule_publish(self) -> None:
+        """Push the latest snapshot once the slot reports go quiet."""
+        loop = self.loop
+        now = loop.time()
+        if (handle := self._publish_handle) is None:
+            self._publish_deadline = now + self.allocation_max_delay
+        else:
+            handle.cancel()
+        self._pending_reports += 1
+        self._publish_handle = loop.call_at(
+            min(now + self.allocation_quiet_period, self._publish_deadline),
+            self._async_flush_allocations,
+        )
+
+    def _async_cancel_publish(self) -> None:
+        """Drop a pending coalesced push."""
+        if (handle := self._publish_handle) is not None:
+            handle.cancel()
+            self._publish_handle = None
+            self.allocation_pushes_coalesced += self._pending_reports
+            self._pending_reports = 0
+
+    def _async_flush_allocations(self) -> None:
+        """Push the latest snapshot of a coalesced burst, if it changed."""
+        self._publish_handle = None
+        reports = self._pending_reports
+        self._pending_reports = 0
+        snapshot = (
+            self.ble_connections_limit,
+            self.ble_connections_free,
+            self.allocated_addresses,
+        )
+        if snapshot == self._published:
+            # The burst settled back where it started.
+            self.allocation_pushes_coalesced += reports
+        elif self._async_publish_allocations(*snapshot):
+            self.allocation_pushes_coalesced += reports - 1
+
     def async_update_ble_connection_limits(
         self, free: int, limit: int, allocated: list[int]
     ) -> None:
@@ -161,35 +356,59 @@ class ESPHomeBluetoothDevice:
             limit,
             allocated,
         )
+        previous = self._allocated_members
+        self.ble_allocations = allocated
+        members = self._async_index_allocations()
+        members_changed = members is not previous
         changed = (
             free != self.ble_connections_free
             or limit != self.ble_connections_limit
-            or allocated != self.ble_allocations
+            or members_changed
         )
         self.ble_connections_free = free
         self.ble_connections_limit = limit
-        self.ble_allocations = allocated
-        if free:
-            for fut in self._ble_connection_free_futures:
-                # If wait_for_ble_connections_free gets cancelled, it will
-                # leave a future in the list. We need to check if it's done
-                # before setting the result.
-                if not fut.done():
-                    fut.set_result(free)
-            self._ble_connection_free_futures.clear()
+        if self._slot_leases and members:
+            # Slots the proxy now counts as allocated are no longer local
+            # claims on top of its free count.
+            for address in [a for a in self._slot_leases if a in members]:
+                self._slot_leases.pop(address).cancel()
+        if unleased := self.unleased_slots:
+            self._async_wake_slot_waiters(unleased)
         # Heal local client state before notifying subscribers so the
         # published allocation snapshot and the clients' connected state
         # are always consistent with each other.
         self._async_reconcile_connections()
-        if (changed or not self._called_callback) and self._async_publish_allocations(
+        if self._called_callback and self.allocation_quiet_period:
+            if changed:
+                self._async_schedule_publish()
+        elif (changed or not self._called_callback) and self._async_publish_allocations(
             limit,
             free,
-            [int_to_bluetooth_address(address) for address in allocated],
+            self._allocated_addresses,
         ):
             # Committed only when the push landed, so a raising
             # subscriber keeps the first snapshot forced-push armed.
             self._called_callback = True
 
+    def _async_wake_slot_waiters(self, free: int) -> None:
+        """
+        Wake up to ``free`` parked waiters, oldest first.
+
+        The rest stay parked for a later report instead of all waking to
+        race for the same slots. Each woken waiter gets the number of
+        slots still free when it was granted, its own included.
+        """
+        futures = self._ble_connection_free_futures
+        while free and futures:
+            fut = futures.popleft()
+            # A timed out waiter can leave a done future in the queue
+            # until its task runs; it does not use up a slot.
+            if fut.done():
+                continue
+            fut.set_result(free)
+            self._slot_grants += 1
+            free -= 1
+
     def _async_reconcile_connections(self) -> None:
         """
         Disconnect tracked clients absent from the proxy's allocated list.
@@ -202,7 +421,9 @@ class ESPHomeBluetoothDevice:
         tears down the client state and lets the consumer reconnect
         instead of holding a phantom connection forever.
 
-        Only trusted when the list length matches the used slot count.
+        Only runs when the allocated members or the tracked clients
+        changed since the last pass, and only trusted when the list
+        length matches the used slot count.
         Firmware maintains ``free`` and ``allocated`` as one fact (an
         address enters the list at slot reservation, before the link is
         even attempted), so the lengths always match on firmware that
@@ -211,6 +432,7 @@ class ESPHomeBluetoothDevice:
         mismatch skips reconciliation so nothing is torn down on it.
         """
         allocated = self.ble_allocations
+        members = self._async_index_allocations()
         used = self.ble_connections_limit - self.ble_connections_free
         if allocated:
             self._seen_allocated = True
@@ -244,9 +466,12 @@ class ESPHomeBluetoothDevice:
         # A matching update re-arms the anomaly warning so a recurring
         # inconsistency is visible again after a recovery.
         self._warned_untrusted = False
+        if not self._reconcile_pending:
+            return
+        self._reconcile_pending = False
         # Snapshot: handlers untrack themselves during the loop.
         for address, on_ble_disconnected in list(self._tracked_clients.items()):
-            if address in allocated:
+            if address in members:
                 continue
             # Warning: this means the proxy's connected=false notification
             # was lost (congested link, or an ESP-side link loss that
@@ -257,7 +482,7 @@ class ESPHomeBluetoothDevice:
                 "not in allocated list %s",
                 self.name,
                 self.mac_address,
-                int_to_bluetooth_address(address),
+                intern_address(address),
                 allocated,
             )
             # Untrack before invoking so the teardown is attempted exactly
@@ -274,7 +499,7 @@ class ESPHomeBluetoothDevice:
                     "%s [%s]: Error reconciling stale connection to %s",
                     self.name,
                     self.mac_address,
-                    int_to_bluetooth_address(address),
+                    intern_address(address),
                 )
 
     def _wait_for_ble_connections_free_timeout(self, fut: asyncio.Future[int]) -> None:
@@ -296,8 +521,10 @@ class ESPHomeBluetoothDevice:
         Wait until there are free BLE connection slots on this device.
 
         Returns immediately with the current free count if slots are already
-        available. Otherwise waits up to ``timeout`` seconds for the proxy to
-        report at least one free slot via ``async_update_ble_connection_limits``.
+        available and nobody is parked ahead. Otherwise joins the back of the
+        queue and waits up to ``timeout`` seconds; each slot report via
+        ``async_update_ble_connection_limits`` wakes at most as many waiters
+        as it reports free slots, in arrival order.
 
         Raises:
             TimeoutError: if no slot becomes free within ``timeout``
@@ -309,15 +536,35 @@ class ESPHomeBluetoothDevice:
             # Fail fast instead of parking the full timeout on a proxy
             # that is provably dead.
             raise TimeoutError(self._unavailable_message())
-        if self.ble_connections_free > 0:
-            return self.ble_connections_free
-        fut: asyncio.Future[int] = self.loop.create_future()
-        self._ble_connection_free_futures.add(fut)
-        cancel_timeout = self.loop.call_later(
+        futures = self._ble_connection_free_futures
+        if (free := self.unleased_slots) and not futures:
+            return free
+        loop = self.loop
+        fut: asyncio.Future[int] = loop.create_future()
+        futures.append(fut)
+        self.slot_waits += 1
+        parked_at = loop.time()
+        cancel_timeout = loop.call_later(
             timeout, self._wait_for_ble_connections_free_timeout, fut
         )
         try:
-            return await fut
+            granted = await fut
+        except asyncio.CancelledError:
+            if fut.done() and not fut.cancelled() and fut.exception() is None:
+                # Granted as the cancellation arrived; pass the turn on.
+                # A timed out or failed wait was never counted as a grant.
+                self._slot_grants -= 1
+                if free := self.unleased_slots:
+                    self._async_wake_slot_waiters(free)
+            raise
         finally:
             cancel_timeout.cancel()
-            self._ble_connection_free_futures.discard(fut)
+            if fut in futures:
+                futures.remove(fut)
+            waited = loop.time() - parked_at
+            self.slot_wait_seconds += waited
+            if waited > self.slot_wait_max_seconds:
+                self.slot_wait_max_seconds = waited
+        # The caller leases the granted slot without yielding.
+        self._slot_grants -= 1
+        return granted
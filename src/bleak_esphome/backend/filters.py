@@ -0,0 +1,153 @@
+"""Pushdown filters for esphome raw advertisements."""
+
+from __future__ import annotations
+
+import re
+from typing import TYPE_CHECKING
+
+from bluetooth_data_tools import mac_to_int
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Iterable
+
+# AD structure types carrying 16-bit service UUIDs or a company ID.
+_AD_INCOMPLETE_UUID16 = 0x02
+_AD_COMPLETE_UUID16 = 0x03
+_AD_SERVICE_DATA_UUID16 = 0x16
+_AD_MANUFACTURER_DATA = 0xFF
+
+
+def _identifier_index(
+    manufacturer_ids: frozenset[int], service_uuids: frozenset[int]
+) -> Callable[[bytes], object] | None:
+    """
+    Return a search for the bytes any wanted identifier is encoded as.
+
+    A company ID only matches right after a manufacturer data type byte,
+    and a 16-bit UUID is stored little endian wherever it matches, so a
+    payload without any of these byte strings cannot match.
+    """
+    patterns = [
+        bytes((_AD_MANUFACTURER_DATA, company_id & 0xFF, company_id >> 8))
+        for company_id in manufacturer_ids
+    ]
+    patterns.extend(bytes((uuid & 0xFF, uuid >> 8)) for uuid in service_uuids)
+    if not patterns:
+        return None
+    return re.compile(b"|".join(re.escape(pattern) for pattern in patterns)).search
+
+
+def _address_as_int(address: int | str) -> int:
+    """Accept a uint64 or a MAC string."""
+    return address if isinstance(address, int) else mac_to_int(address)
+
+
+class AdvertisementFilter:
+    """
+    Drop raw advertisements no consumer is interested in.
+
+    An advertisement from a ``deny_addresses`` entry is always dropped.
+    Otherwise, when no predicate is configured everything passes; when
+    any is, the advertisement passes if its address is in
+    ``allow_addresses`` or its payload carries one of the
+    ``manufacturer_ids`` (company ID of a manufacturer data structure) or
+    ``service_uuids`` (16-bit UUID in a UUID list or service data
+    structure). Addresses may be given as uint64 or MAC strings.
+
+    The wanted identifiers are indexed by the bytes they are encoded as,
+    so most unwanted payloads are rejected by one search in C. Only a
+    payload that holds those bytes somewhere has its AD structures
+    scanned, in a single pass, to confirm they sit in a structure of the
+    right type. Nothing is cached per payload, so beacons with rotating
+    counters or sensor values cost the same as repeated ones.
+    ``denied``, ``unmatched`` and ``passed`` count the decisions.
+    """
+
+    __slots__ = (
+        "_allow",
+        "_deny",
+        "_filter_content",
+        "_identifier_search",
+        "_manufacturer_ids",
+        "_service_uuids",
+        "denied",
+        "passed",
+        "unmatched",
+    )
+
+    def __init__(
+        self,
+        *,
+        manufacturer_ids: Iterable[int] = (),
+        service_uuids: Iterable[int] = (),
+        allow_addresses: Iterable[int | str] = (),
+        deny_addresses: Iterable[int | str] = (),
+    ) -> None:
+        self._manufacturer_ids = frozenset(manufacturer_ids)
+        self._service_uuids = frozenset(service_uuids)
+        self._allow = frozenset(_address_as_int(a) for a in allow_addresses)
+        self._deny = frozenset(_address_as_int(a) for a in deny_addresses)
+        self._filter_content = bool(
+            self._manufacturer_ids or self._service_uuids or self._allow
+        )
+        self._identifier_search = _identifier_index(
+            self._manufacturer_ids, self._service_uuids
+        )
+        self.denied = 0
+        self.passed = 0
+        self.unmatched = 0
+
+    def should_forward(self, address: int, rssi: int, data: bytes, now: float) -> bool:
+        """Return True if the advertisement should be forwarded."""
+        if address in self._deny:
+            self.denied += 1
+            return False
+        if not self._filter_content or address in self._allow:
+            self.passed += 1
+            return True
+        if (search := self._identifier_search) is not None and search(data) is not None:
+            verdict = self._payload_matches(data)
+        else:
+            verdict = False
+        if verdict:
+            self.passed += 1
+        else:
+            self.unmatched += 1
+        return verdict
+
+    def _payload_matches(self, data: bytes) -> bool:
+        """Scan the AD structures once for a wanted company ID or UUID."""
+        manufacturer_ids = self._manufacturer_ids
+        service_uuids = self._service_uuids
+        end = len(data)
+        pos = 0
+        while pos + 1 < end:
+            length = data[pos]
+            if not length:
+                break
+            ad_end = pos + 1 + length
+            if ad_end > end:
+                # Truncated structure; nothing after it can be trusted.
+                break
+            ad_type = data[pos + 1]
+            start = pos + 2
+            if ad_type == _AD_MANUFACTURER_DATA:
+                if (
+                    manufacturer_ids
+                    and length >= 3
+                    and (data[start] | data[start + 1] << 8) in manufacturer_ids
+                ):
+                    return True
+            elif service_uuids:
+                if ad_type == _AD_SERVICE_DATA_UUID16:
+                    if (
+                        length >= 3
+                        and (data[start] | data[start + 1] << 8) in service_uuids
+                    ):
+                        return True
+                elif ad_type in (_AD_INCOMPLETE_UUID16, _AD_COMPLETE_UUID16):
+                    for i in range(start, ad_end - 1, 2):
+                        if (data[i] | data[i + 1] << 8) in service_uuids:
+                            return True
+            pos = ad_end
+        return False
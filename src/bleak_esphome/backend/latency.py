@@ -0,0 +1,85 @@
+"""Delivery latency estimation for esphome proxy advertisements."""
+
+from __future__ import annotations
+
+from collections import deque
+
+DEFAULT_ROUND_TRIP_INTERVAL = 60.0
+
+# Smoothing gain for the round trip, 1/8 as in TCP's SRTT.
+_ROUND_TRIP_GAIN = 0.125
+
+# Round trips kept for the base transit time; ten minutes at the default
+# probe interval, as in the min-RTT window of LEDBAT (RFC 6817).
+_BASE_ROUND_TRIP_SAMPLES = 10
+
+
+class LatencyEstimator:
+    """
+    Estimate how old a proxy's advertisements are when they arrive.
+
+    Advertisements are stamped when their batch reaches the host. Over a
+    congested link a batch can sit in queues for hundreds of milliseconds,
+    which skews comparisons between proxies. The proxy does not stamp its
+    batches, so the delay is estimated from the round trips of the API
+    connection, fed by :meth:`record_round_trip`:
+
+    - half the lowest recent round trip for the base transit time, the
+      link with empty queues;
+    - the smoothed round trip's excess over that minimum for the
+      queueing on top, taken as all on the way in.
+
+    The timing of the batches themselves is not used: proxies flush on
+    their own schedule, so uneven gaps say nothing about queueing.
+
+    With ``correct`` set, :meth:`record_arrival` returns the arrival time
+    minus the estimate so that advertisements carry the corrected time.
+    The corrected times never go backwards, even when the estimate grows
+    between two batches.
+    """
+
+    __slots__ = (
+        "_base_round_trips",
+        "_last_stamp",
+        "correct",
+        "round_trip",
+    )
+
+    def __init__(self, correct: bool = False) -> None:
+        self.correct = correct
+        self.round_trip = 0.0
+        self._base_round_trips: deque[float] = deque(maxlen=_BASE_ROUND_TRIP_SAMPLES)
+        self._last_stamp = 0.0
+
+    @property
+    def base_round_trip(self) -> float:
+        """Return the lowest recent round trip in seconds."""
+        return min(self._base_round_trips, default=0.0)
+
+    @property
+    def delay(self) -> float:
+        """Return the estimated delivery delay in seconds."""
+        base = self.base_round_trip
+        return base / 2 + max(self.round_trip - base, 0.0)
+
+    def record_round_trip(self, seconds: float) -> None:
+        """Fold in one round trip time of the API connection."""
+        self._base_round_trips.append(seconds)
+        if self.round_trip:
+            self.round_trip += (seconds - self.round_trip) * _ROUND_TRIP_GAIN
+        else:
+            self.round_trip = seconds
+
+    def record_arrival(self, now: float) -> float:
+        """
+        Return the time to stamp a batch arriving at ``now`` with.
+
+        Called once per batch on the ingest path.
+        """
+        if not self.correct:
+            return now
+        stamp = now - self.delay
+        if stamp < self._last_stamp:
+            return self._last_stamp
+        self._last_stamp = stamp
+        return stamp
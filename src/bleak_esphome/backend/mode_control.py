@@ -0,0 +1,250 @@
+"""Load-adaptive scanner mode control for esphome proxies."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from bluetooth_data_tools import monotonic_time_coarse as MONOTONIC_TIME
+from habluetooth import BluetoothScanningMode
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+    from .metrics import IngestMetricsSnapshot
+    from .scanner import ESPHomeScanner
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_CPU_TARGET = 0.25
+DEFAULT_RECOVER_RATIO = 0.6
+DEFAULT_CONTROL_INTERVAL = 30.0
+DEFAULT_MIN_DWELL = 300.0
+
+# Modes that ask the proxy for scan responses and can be stepped down.
+_DEMOTABLE_MODES = (BluetoothScanningMode.ACTIVE, BluetoothScanningMode.AUTO)
+
+
+class ScanModeController:
+    """
+    Step proxies down to PASSIVE while ad processing costs too much CPU.
+
+    Active scanning roughly doubles what a proxy sends: every scan
+    request draws a scan response. This controller watches the host CPU
+    spent in each bound proxy's advertisement callbacks (it turns on
+    ingest timing for them) and the proxy's ingest rate. Every
+    ``interval`` seconds:
+
+    - if the fleet spent more than ``cpu_target`` of one core, the most
+      expensive ACTIVE or AUTO proxy is pinned to PASSIVE;
+    - once the cost falls below ``cpu_target * recover_ratio``, the proxy
+      demoted first is given back the mode it had.
+
+    One proxy moves per step so the effect of each switch is measured
+    before the next. Operator bounds: at most ``max_demoted`` proxies are
+    held down at once (``None`` for no limit), a proxy stays in a mode
+    for at least ``min_dwell`` seconds, and :meth:`async_add_scanner`
+    can exempt a proxy. Switches go through
+    :meth:`ESPHomeScanner.async_set_scanning_mode`, so the proxy's
+    intent is pinned as if set by hand; if the operator repins a demoted
+    proxy, the controller lets go of it.
+    """
+
+    __slots__ = (
+        "_demoted",
+        "_exempt",
+        "_previous",
+        "_scanners",
+        "_switched_at",
+        "cpu_target",
+        "demotions",
+        "load",
+        "max_demoted",
+        "min_dwell",
+        "promotions",
+        "recover_ratio",
+    )
+
+    def __init__(
+        self,
+        cpu_target: float = DEFAULT_CPU_TARGET,
+        recover_ratio: float = DEFAULT_RECOVER_RATIO,
+        max_demoted: int | None = None,
+        min_dwell: float = DEFAULT_MIN_DWELL,
+    ) -> None:
+        if cpu_target <= 0:
+            raise ValueError(f"CPU target must be positive, got {cpu_target}")
+        if not 0 < recover_ratio < 1:
+            raise ValueError(f"Recover ratio must be in (0, 1), got {recover_ratio}")
+        if max_demoted is not None and max_demoted < 0:
+            raise ValueError(
+                f"Demoted proxy limit must not be negative, got {max_demoted}"
+            )
+        self.cpu_target = cpu_target
+        self.recover_ratio = recover_ratio
+        self.max_demoted = max_demoted
+        self.min_dwell = min_dwell
+        self.load = 0.0
+        self.demotions = 0
+        self.promotions = 0
+        # source -> mode to give back, in demotion order.
+        self._demoted: dict[str, BluetoothScanningMode] = {}
+        self._exempt: set[str] = set()
+        # source -> (when measured, snapshot) from the previous step.
+        self._previous: dict[str, tuple[float, IngestMetricsSnapshot]] = {}
+        self._scanners: dict[str, ESPHomeScanner] = {}
+        self._switched_at: dict[str, float] = {}
+
+    @property
+    def demoted_sources(self) -> list[str]:
+        """Return the proxies currently held at PASSIVE, oldest first."""
+        return list(self._demoted)
+
+    def async_add_scanner(self, scanner: ESPHomeScanner, exempt: bool = False) -> None:
+        """Manage ``scanner``; an ``exempt`` one is measured but never moved."""
+        source = scanner.source
+        self._scanners[source] = scanner
+        if exempt:
+            self._exempt.add(source)
+        scanner.set_ingest_timing(True)
+        self._previous[source] = (MONOTONIC_TIME(), scanner.async_get_ingest_metrics())
+
+    def async_remove_scanner(self, scanner: ESPHomeScanner) -> None:
+        """Stop managing ``scanner``, giving back its mode if it was demoted."""
+        source = scanner.source
+        if self._scanners.get(source) is not scanner:
+            return
+        if (restore := self._demoted.pop(source, None)) is not None:
+            scanner.async_set_scanning_mode(restore)
+        del self._scanners[source]
+        self._exempt.discard(source)
+        self._previous.pop(source, None)
+        self._switched_at.pop(source, None)
+
+    def async_start(
+        self, interval: float = DEFAULT_CONTROL_INTERVAL
+    ) -> Callable[[], None]:
+        """
+        Evaluate the fleet every ``interval`` seconds.
+
+        Returns a callable that stops evaluating; demoted proxies stay
+        demoted until removed.
+        """
+        loop = asyncio.get_running_loop()
+        handle: asyncio.TimerHandle
+
+        def _tick() -> None:
+            nonlocal handle
+            self.async_evaluate()
+            handle = loop.call_later(interval, _tick)
+
+        handle = loop.call_later(interval, _tick)
+
+        def _stop() -> None:
+            handle.cancel()
+
+        return _stop
+
+    def async_evaluate(self) -> None:
+        """Measure the cost since the last step and move at most one proxy."""
+        costs: dict[str, float] = {}
+        rates: dict[str, float] = {}
+        now = MONOTONIC_TIME()
+        for source, scanner in self._scanners.items():
+            measured_at, previous = self._previous[source]
+            elapsed = now - measured_at
+            if elapsed <= 0:
+                continue
+            snapshot = scanner.async_get_ingest_metrics()
+            self._previous[source] = (now, snapshot)
+            spent = (snapshot.raw_seconds + snapshot.decoded_seconds) - (
+                previous.raw_seconds + previous.decoded_seconds
+            )
+            costs[source] = spent / elapsed
+            rates[source] = (
+                snapshot.advertisements - previous.advertisements
+            ) / elapsed
+        if not costs:
+            return
+        self._release_repinned()
+        self.load = load = sum(costs.values())
+        if load > self.cpu_target:
+            self._demote_costliest(costs, rates, now)
+        elif load < self.cpu_target * self.recover_ratio:
+            self._promote_oldest(now)
+
+    def _release_repinned(self) -> None:
+        """Forget demoted proxies the operator has since repinned."""
+        for source in [
+            source
+            for source in self._demoted
+            if self._scanners[source].scanning_intent
+            is not BluetoothScanningMode.PASSIVE
+        ]:
+            del self._demoted[source]
+
+    def _dwelled(self, source: str, now: float) -> bool:
+        """Return True if ``source`` may switch mode again."""
+        switched_at = self._switched_at.get(source)
+        return switched_at is None or now - switched_at >= self.min_dwell
+
+    def _demote_costliest(
+        self, costs: dict[str, float], rates: dict[str, float], now: float
+    ) -> None:
+        """Pin the most expensive demotable proxy to PASSIVE."""
+        if self.max_demoted is not None and len(self._demoted) >= self.max_demoted:
+            return
+        candidates = [
+            source
+            for source in costs
+            if source not in self._demoted
+            and source not in self._exempt
+            and self._mode(self._scanners[source]) in _DEMOTABLE_MODES
+            and self._dwelled(source, now)
+        ]
+        if not candidates:
+            return
+        # Cost first; the ingest rate breaks ties while timing warms up.
+        source = max(candidates, key=lambda source: (costs[source], rates[source]))
+        scanner = self._scanners[source]
+        restore = self._mode(scanner)
+        if TYPE_CHECKING:
+            assert restore is not None
+        _LOGGER.warning(
+            "%s: Advertisement processing is using %.0f%% of a CPU (target "
+            "%.0f%%); switching from %s to PASSIVE scanning",
+            scanner.name,
+            self.load * 100,
+            self.cpu_target * 100,
+            restore.name,
+        )
+        self._demoted[source] = restore
+        self._switched_at[source] = now
+        self.demotions += 1
+        scanner.async_set_scanning_mode(BluetoothScanningMode.PASSIVE)
+
+    def _promote_oldest(self, now: float) -> None:
+        """Give the longest demoted proxy its mode back."""
+        for source, restore in self._demoted.items():
+            if not self._dwelled(source, now):
+                continue
+            scanner = self._scanners[source]
+            _LOGGER.warning(
+                "%s: Advertisement processing is down to %.0f%% of a CPU; "
+                "restoring %s scanning",
+                scanner.name,
+                self.load * 100,
+                restore.name,
+            )
+            del self._demoted[source]
+            self._switched_at[source] = now
+            self.promotions += 1
+            scanner.async_set_scanning_mode(restore)
+            return
+
+    @staticmethod
+    def _mode(scanner: ESPHomeScanner) -> BluetoothScanningMode | None:
+        """Return the mode the proxy is meant to scan in."""
+        intent = scanner.scanning_intent
+        return intent if intent is not None else scanner.requested_mode
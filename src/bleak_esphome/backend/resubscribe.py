@@ -0,0 +1,181 @@
+"""Fleet-wide coordination of advertisement resubscription retries."""
+
+from __future__ import annotations
+
+import asyncio
+import random
+from collections import deque
+from dataclasses import dataclass
+
+from bluetooth_data_tools import monotonic_time_coarse as MONOTONIC_TIME
+
+DEFAULT_RETRY_JITTER = 0.5
+DEFAULT_MAX_CONCURRENT_RESUBSCRIBES = 4
+DEFAULT_RESUBSCRIBE_SETTLE = 5.0
+
+
+@dataclass(slots=True)
+class ResubscribeRetryState:
+    """Retry state of one proxy's subscription watchdog."""
+
+    source: str
+    attempts: int = 0
+    next_attempt_at: float | None = None
+    waiting_for_slot: bool = False
+    in_flight: bool = False
+    last_error: str | None = None
+
+
+class ResubscribeScheduler:
+    """
+    Spread advertisement resubscriptions across a fleet of proxies.
+
+    Without coordination every proxy's subscription watchdog retries on
+    the same fixed schedule, so after a host restart the whole fleet
+    resubscribes in lockstep and hits the API links and the event loop
+    at the same instant. Bind one scheduler to every scanner with
+    :meth:`ESPHomeScanner.set_resubscribe_scheduler`:
+
+    - each retry delay is scaled by a random factor in
+      ``1 ± jitter`` so the watchdogs drift apart;
+    - at most ``max_concurrent`` resubscriptions are in flight; the rest
+      wait in arrival order. A resubscription stays in flight until the
+      proxy reports scanner state (the subscription landed) or
+      ``settle`` seconds pass, which covers the burst of advertisements
+      a freshly subscribed proxy sends.
+
+    :meth:`async_get_retry_states` returns each retrying proxy's state
+    for monitoring; a proxy drops out once its watchdog ends.
+    """
+
+    __slots__ = (
+        "_in_flight",
+        "_random",
+        "_states",
+        "_waiters",
+        "jitter",
+        "max_concurrent",
+        "settle",
+    )
+
+    def __init__(
+        self,
+        jitter: float = DEFAULT_RETRY_JITTER,
+        max_concurrent: int = DEFAULT_MAX_CONCURRENT_RESUBSCRIBES,
+        settle: float = DEFAULT_RESUBSCRIBE_SETTLE,
+    ) -> None:
+        if not 0 <= jitter < 1:
+            raise ValueError(f"Retry jitter must be in [0, 1), got {jitter}")
+        if max_concurrent <= 0:
+            raise ValueError(
+                f"Concurrent resubscribe limit must be positive, got {max_concurrent}"
+            )
+        if settle <= 0:
+            raise ValueError(f"Settle time must be positive, got {settle}")
+        self.jitter = jitter
+        self.max_concurrent = max_concurrent
+        self.settle = settle
+        # Jitter only spreads load; it needs no cryptographic strength.
+        self._random = random.Random()  # noqa: S311
+        self._states: dict[str, ResubscribeRetryState] = {}
+        self._in_flight: dict[str, asyncio.TimerHandle] = {}
+        self._waiters: deque[tuple[str, asyncio.Future[None]]] = deque()
+
+    @property
+    def in_flight(self) -> int:
+        """Return the number of resubscriptions in flight."""
+        return len(self._in_flight)
+
+    def async_get_retry_states(self) -> dict[str, ResubscribeRetryState]:
+        """Return a copy of the retry state of every retrying proxy."""
+        return {
+            source: ResubscribeRetryState(
+                state.source,
+                state.attempts,
+                state.next_attempt_at,
+                state.waiting_for_slot,
+                state.in_flight,
+                state.last_error,
+            )
+            for source, state in self._states.items()
+        }
+
+    def async_schedule(self, source: str, delay: float) -> float:
+        """Return ``delay`` with jitter applied and record when it is due."""
+        if self.jitter:
+            delay *= self._random.uniform(1 - self.jitter, 1 + self.jitter)
+        self._state(source).next_attempt_at = MONOTONIC_TIME() + delay
+        return delay
+
+    async def async_acquire(self, source: str) -> None:
+        """
+        Wait for a free resubscription slot for ``source``.
+
+        The slot is held until :meth:`async_release` or ``settle``
+        seconds, whichever comes first. A source retrying before its slot
+        settled keeps the slot, with ``settle`` restarted.
+        """
+        state = self._state(source)
+        state.next_attempt_at = None
+        if source in self._in_flight:
+            self._grant(source)
+            return
+        if len(self._in_flight) >= self.max_concurrent or self._waiters:
+            fut: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+            waiter = (source, fut)
+            self._waiters.append(waiter)
+            state.waiting_for_slot = True
+            try:
+                await fut
+            except asyncio.CancelledError:
+                if fut.done() and not fut.cancelled():
+                    # Granted as the cancellation arrived; pass it on.
+                    self.async_release(source)
+                elif waiter in self._waiters:
+                    self._waiters.remove(waiter)
+                raise
+            finally:
+                state.waiting_for_slot = False
+            # async_release handed the slot over and armed its timer.
+            return
+        self._grant(source)
+
+    def async_record_attempt(self, source: str, error: str | None = None) -> None:
+        """Count a resubscription attempt and the error it raised, if any."""
+        state = self._state(source)
+        state.attempts += 1
+        state.last_error = error
+
+    def async_release(self, source: str) -> None:
+        """Release the slot held by ``source`` and wake the next waiter."""
+        if (handle := self._in_flight.pop(source, None)) is None:
+            return
+        handle.cancel()
+        if (state := self._states.get(source)) is not None:
+            state.in_flight = False
+        while self._waiters and len(self._in_flight) < self.max_concurrent:
+            next_source, fut = self._waiters.popleft()
+            if fut.done():
+                continue
+            self._grant(next_source)
+            fut.set_result(None)
+
+    def async_forget(self, source: str) -> None:
+        """Drop ``source`` once its watchdog ended, releasing any slot."""
+        self.async_release(source)
+        self._states.pop(source, None)
+
+    def _grant(self, source: str) -> None:
+        """Mark ``source`` in flight until released or settled."""
+        if (handle := self._in_flight.get(source)) is not None:
+            handle.cancel()
+        self._in_flight[source] = asyncio.get_running_loop().call_later(
+            self.settle, self.async_release, source
+        )
+        self._state(source).in_flight = True
+
+    def _state(self, source: str) -> ResubscribeRetryState:
+        """Return the retry state of ``source``, creating it if needed."""
+        if (state := self._states.get(source)) is None:
+            state = self._states[source] = ResubscribeRetryState(source)
+        return state
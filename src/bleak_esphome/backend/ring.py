@@ -0,0 +1,337 @@
+"""Shared-memory ring buffer for fanning esphome advertisements out."""
+
+from __future__ import annotations
+
+import logging
+import struct
+import sys
+from multiprocessing import resource_tracker
+from multiprocessing.shared_memory import SharedMemory
+from typing import TYPE_CHECKING, Any, NamedTuple
+
+from .capture import encode_advertisement_data
+
+if TYPE_CHECKING:
+    from aioesphomeapi import BluetoothLEAdvertisement
+
+_LOGGER = logging.getLogger(__name__)
+
+# Segment layout: a fixed header, a table of source names and the ring
+# itself. Header words are 8-byte aligned:
+#
+#   0  magic
+#   8  ring capacity in bytes
+#   16 committed write position
+#   24 reserved write position (>= committed while a batch is written)
+#   32 advertisements published
+#
+# Positions count bytes since the ring was created and never wrap; the
+# physical offset is ``position % capacity``. A record never straddles
+# the end of the ring: the writer leaves a zero length marker (or, with
+# fewer than two bytes left, nothing) and continues at the next lap.
+RING_MAGIC = b"BLERNG\x00\x01"
+
+_HEADER = struct.Struct("<8sQQQQ")
+_POSITIONS = struct.Struct("<QQQ")
+_POSITIONS_OFFSET = 16
+_HEADER_SIZE = 64
+
+MAX_RING_SOURCES = 1024
+_SOURCE_SLOT = 32
+_SOURCE_TABLE_SIZE = MAX_RING_SOURCES * _SOURCE_SLOT
+_DATA_OFFSET = _HEADER_SIZE + _SOURCE_TABLE_SIZE
+
+# ``<H length><H source id><d time><Q address><B address type><b rssi>``
+# followed by the payload; ``length`` covers the whole record.
+_RECORD = struct.Struct("<HHdQBb")
+_LENGTH = struct.Struct("<H")
+_MAX_RECORD = _RECORD.size + 255
+
+DEFAULT_RING_SIZE = 4 << 20
+MIN_RING_SIZE = 4096
+
+# Segments created by publishers in this process; see _attach.
+_OWNED_SEGMENTS: set[str] = set()
+
+
+class RingRecord(NamedTuple):
+    """One advertisement read from the ring."""
+
+    source: str
+    time: float
+    address: int
+    address_type: int
+    rssi: int
+    data: bytes
+
+
+class RingPublisher:
+    """
+    Publish proxy advertisements into a shared-memory ring buffer.
+
+    Bind to one or more scanners with
+    :meth:`ESPHomeScanner.set_ring_publisher`; every batch is published
+    as received, before filtering or suppression, and decoded
+    advertisements are re-encoded as raw AD structures. Any number of
+    :class:`RingReader` instances, in any process on the host, attach to
+    the segment by :attr:`name` and read it without a socket or pickle
+    in between.
+
+    There is exactly one writer and it never waits for readers: a reader
+    that falls more than ``size`` bytes behind loses the overwritten
+    records and counts an overrun. Times are the scanners' monotonic
+    clock, which is shared by every process on the host.
+    """
+
+    __slots__ = (
+        "_buf",
+        "_capacity",
+        "_data",
+        "_shm",
+        "_sources",
+        "_write_pos",
+        "records",
+    )
+
+    def __init__(self, name: str | None = None, size: int = DEFAULT_RING_SIZE) -> None:
+        if size < MIN_RING_SIZE:
+            raise ValueError(
+                f"Ring size must be at least {MIN_RING_SIZE} bytes, got {size}"
+            )
+        self._shm = SharedMemory(name, create=True, size=_DATA_OFFSET + size)
+        self._buf = _buffer(self._shm)
+        _OWNED_SEGMENTS.add(self._shm.name)
+        self._capacity = size
+        self._write_pos = 0
+        self._sources: dict[str, int] = {}
+        self.records = 0
+        _HEADER.pack_into(self._buf, 0, RING_MAGIC, size, 0, 0, 0)
+        self._data = self._buf[_DATA_OFFSET:]
+
+    @property
+    def name(self) -> str:
+        """The shared-memory segment name readers attach to."""
+        return self._shm.name
+
+    def _source_id(self, source: str) -> int | None:
+        """Return the id for ``source``, writing its table slot once."""
+        if (source_id := self._sources.get(source)) is None:
+            if len(self._sources) >= MAX_RING_SOURCES:
+                _LOGGER.warning(
+                    "Ring %s is out of source slots; not publishing %s",
+                    self.name,
+                    source,
+                )
+                return None
+            encoded = source.encode()[: _SOURCE_SLOT - 1]
+            source_id = self._sources[source] = len(self._sources)
+            offset = _HEADER_SIZE + source_id * _SOURCE_SLOT
+            self._buf[offset : offset + 1 + len(encoded)] = (
+                bytes((len(encoded),)) + encoded
+            )
+        return source_id
+
+    def publish_raw_advertisements(
+        self, source: str, time: float, advertisements: Any
+    ) -> None:
+        """Publish a repeated ``BluetoothLERawAdvertisement`` field."""
+        if (source_id := self._source_id(source)) is None:
+            return
+        count = len(advertisements)
+        data_view = self._data
+        capacity = self._capacity
+        pack = _RECORD.pack_into
+        record_size = _RECORD.size
+        pos = self._write_pos
+        # Claim the span first so readers can tell which records a
+        # partially written batch may have overwritten.
+        self._publish_positions(pos, pos + count * _MAX_RECORD + _MAX_RECORD)
+        # Subscript rather than iterate; see async_on_raw_advertisements.
+        for i in range(count):
+            adv = advertisements[i]
+            data = adv.data
+            length = record_size + len(data)
+            offset = pos % capacity
+            if offset + length > capacity:
+                if capacity - offset >= _LENGTH.size:
+                    _LENGTH.pack_into(data_view, offset, 0)
+                pos += capacity - offset
+                offset = 0
+            pack(
+                data_view,
+                offset,
+                length,
+                source_id,
+                time,
+                adv.address,
+                adv.address_type,
+                adv.rssi,
+            )
+            data_view[offset + record_size : offset + length] = data
+            pos += length
+        self.records += count
+        self._write_pos = pos
+        self._publish_positions(pos, pos)
+
+    def publish_advertisement(
+        self, source: str, time: float, adv: BluetoothLEAdvertisement
+    ) -> None:
+        """Publish a decoded advertisement as a batch of one."""
+        self.publish_raw_advertisements(
+            source, time, (_EncodedAdvertisement(adv, encode_advertisement_data(adv)),)
+        )
+
+    def _publish_positions(self, committed: int, reserved: int) -> None:
+        _POSITIONS.pack_into(
+            self._buf, _POSITIONS_OFFSET, committed, reserved, self.records
+        )
+
+    def close(self) -> None:
+        """Detach from and destroy the segment."""
+        self._data.release()
+        self._shm.close()
+        self._shm.unlink()
+        _OWNED_SEGMENTS.discard(self._shm.name)
+
+
+class _EncodedAdvertisement(NamedTuple):
+    """A decoded advertisement with the raw-advertisement field names."""
+
+    adv: BluetoothLEAdvertisement
+    data: bytes
+
+    @property
+    def address(self) -> int:
+        return self.adv.address
+
+    @property
+    def address_type(self) -> int:
+        return self.adv.address_type
+
+    @property
+    def rssi(self) -> int:
+        return self.adv.rssi
+
+
+def _buffer(shm: SharedMemory) -> memoryview:
+    """Return the mapped buffer of an open segment."""
+    if TYPE_CHECKING:
+        assert shm.buf is not None
+    return shm.buf
+
+
+def _attach(name: str) -> SharedMemory:
+    """Attach to an existing segment without adopting its lifetime."""
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name, track=False)
+    shm = SharedMemory(name)
+    # Before 3.13 attaching registers the segment with this process's
+    # resource tracker, which would unlink it when the reader exits. The
+    # tracker keeps one entry per name, so leave a segment published from
+    # this same process registered for its publisher.
+    if shm.name not in _OWNED_SEGMENTS:
+        resource_tracker.unregister(shm._name, "shared_memory")  # type: ignore[attr-defined]
+    return shm
+
+
+class RingReader:
+    """
+    Read advertisements from a :class:`RingPublisher` segment.
+
+    The segment is mapped directly and records are parsed in place; only
+    each payload is copied out. A reader starts at the publisher's
+    current position and sees advertisements published after it
+    attached. ``overruns`` counts the times the publisher lapped this
+    reader and records were lost.
+    """
+
+    __slots__ = (
+        "_buf",
+        "_capacity",
+        "_data",
+        "_read_pos",
+        "_shm",
+        "_sources",
+        "overruns",
+    )
+
+    def __init__(self, name: str) -> None:
+        self._shm = _attach(name)
+        self._buf = _buffer(self._shm)
+        magic, capacity, committed, _, _ = _HEADER.unpack_from(self._buf, 0)
+        if magic != RING_MAGIC:
+            self._shm.close()
+            raise ValueError(f"{name} is not an advertisement ring")
+        self._capacity: int = capacity
+        self._read_pos: int = committed
+        self._sources: dict[int, str] = {}
+        self._data = self._buf[_DATA_OFFSET:]
+        self.overruns = 0
+
+    @property
+    def published(self) -> int:
+        """Advertisements published since the ring was created."""
+        return _POSITIONS.unpack_from(self._buf, _POSITIONS_OFFSET)[2]
+
+    def _source(self, source_id: int) -> str:
+        """Return the source name for ``source_id``."""
+        if (source := self._sources.get(source_id)) is None:
+            offset = _HEADER_SIZE + source_id * _SOURCE_SLOT
+            length = self._buf[offset]
+            source = self._sources[source_id] = bytes(
+                self._buf[offset + 1 : offset + 1 + length]
+            ).decode()
+        return source
+
+    def read(self) -> list[RingRecord]:
+        """Return every complete record published since the last read."""
+        buf = self._buf
+        committed = _POSITIONS.unpack_from(buf, _POSITIONS_OFFSET)[0]
+        capacity = self._capacity
+        pos = self._read_pos
+        if committed - pos > capacity:
+            return self._overrun(committed)
+        data_view = self._data
+        unpack = _RECORD.unpack_from
+        record_size = _RECORD.size
+        start = pos
+        records: list[RingRecord] = []
+        while pos < committed:
+            offset = pos % capacity
+            if capacity - offset < record_size or not (
+                length := _LENGTH.unpack_from(data_view, offset)[0]
+            ):
+                pos += capacity - offset
+                continue
+            if length < record_size or offset + length > capacity:
+                # Only a record overwritten mid-read can look like this.
+                return self._overrun(committed)
+            _, source_id, time, address, address_type, rssi = unpack(data_view, offset)
+            records.append(
+                RingRecord(
+                    self._source(source_id),
+                    time,
+                    address,
+                    address_type,
+                    rssi,
+                    bytes(data_view[offset + record_size : offset + length]),
+                )
+            )
+            pos += length
+        # Anything more than a lap behind the writer's claim may have been
+        # overwritten while it was copied.
+        if start < _POSITIONS.unpack_from(buf, _POSITIONS_OFFSET)[1] - capacity:
+            return self._overrun(committed)
+        self._read_pos = pos
+        return records
+
+    def _overrun(self, committed: int) -> list[RingRecord]:
+        """Count lost records and resume at a known record boundary."""
+        self.overruns += 1
+        self._read_pos = committed
+        return []
+
+    def close(self) -> None:
+        """Detach from the segment, leaving it to the publisher."""
+        self._data.release()
+        self._shm.close()
@@ -0,0 +1,202 @@
+"""Slot-aware connection routing across esphome proxies."""
+
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING
+
+from bleak_retry_connector import NO_RSSI_VALUE
+from habluetooth import BluetoothScannerDevice
+
+if TYPE_CHECKING:
+    from .scanner import ESPHomeScanner
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_FREE_SLOT_BONUS = 3.0
+DEFAULT_WAITER_PENALTY = 10.0
+DEFAULT_FAILURE_PENALTY = 20.0
+
+# Weight of each connect outcome in a proxy's recent success rate.
+_OUTCOME_SMOOTHING = 0.2
+
+
+class ConnectionRouter:
+    """
+    Steer connections to the proxy that can take them soonest.
+
+    habluetooth ranks the proxies that hear a device mostly by RSSI, so a
+    few well-placed proxies saturate while others sit idle. Bind one
+    router to every scanner with :meth:`ESPHomeScanner.set_connection_router`
+    and habluetooth's own score for each path gets, in dB:
+
+    - ``free_slot_bonus`` for each unleased slot past the first; a proxy
+      with none left cannot take the connection at all;
+    - minus ``waiter_penalty`` for each connect already queued for a slot;
+    - minus ``failure_penalty`` scaled by the proxy's recent failure rate,
+      smoothed over its last few connects of any device.
+
+    The router also re-routes: a connect that would have to queue on a
+    full proxy is refused up front by :meth:`async_reroute` when another
+    proxy hears the device and scores better, so the retry lands there
+    instead of waiting. Refusals are counted in ``reroutes`` and are not
+    held against the proxy's success rate. habluetooth still records each
+    one as a failed connect of that device on the full proxy, which
+    steers its own ranking of the retry the same way.
+    """
+
+    __slots__ = (
+        "_outcomes",
+        "_rerouted",
+        "_scanners",
+        "_success_rates",
+        "failure_penalty",
+        "free_slot_bonus",
+        "reroutes",
+        "waiter_penalty",
+    )
+
+    def __init__(
+        self,
+        free_slot_bonus: float = DEFAULT_FREE_SLOT_BONUS,
+        waiter_penalty: float = DEFAULT_WAITER_PENALTY,
+        failure_penalty: float = DEFAULT_FAILURE_PENALTY,
+    ) -> None:
+        if free_slot_bonus < 0:
+            raise ValueError(
+                f"Free slot bonus must not be negative, got {free_slot_bonus}"
+            )
+        if waiter_penalty < 0:
+            raise ValueError(
+                f"Waiter penalty must not be negative, got {waiter_penalty}"
+            )
+        if failure_penalty < 0:
+            raise ValueError(
+                f"Failure penalty must not be negative, got {failure_penalty}"
+            )
+        self.free_slot_bonus = free_slot_bonus
+        self.waiter_penalty = waiter_penalty
+        self.failure_penalty = failure_penalty
+        self.reroutes = 0
+        # source -> (completed, failed) connect totals already folded in.
+        self._outcomes: dict[str, tuple[int, int]] = {}
+        # source -> refusals not yet folded in, to skip in the failures.
+        self._rerouted: dict[str, int] = {}
+        self._scanners: dict[str, ESPHomeScanner] = {}
+        self._success_rates: dict[str, float] = {}
+
+    def async_register(self, scanner: ESPHomeScanner) -> None:
+        """Consider ``scanner`` when routing connections."""
+        self._scanners[scanner.source] = scanner
+
+    def async_unregister(self, scanner: ESPHomeScanner) -> None:
+        """Stop considering ``scanner``, forgetting its history."""
+        source = scanner.source
+        if self._scanners.get(source) is scanner:
+            del self._scanners[source]
+            self._outcomes.pop(source, None)
+            self._rerouted.pop(source, None)
+            self._success_rates.pop(source, None)
+
+    def async_success_rate(self, scanner: ESPHomeScanner) -> float:
+        """Return the recent connect success rate of ``scanner``, 1.0 if unknown."""
+        source = scanner.source
+        completed = scanner._connect_completed_total
+        failed = scanner._connect_failed_total
+        seen_completed, seen_failed = self._outcomes.get(source, (0, 0))
+        if completed < seen_completed or failed < seen_failed:
+            # habluetooth cleared the history when the scanner restarted.
+            seen_completed = seen_failed = 0
+        self._outcomes[source] = (completed, failed)
+        successes = completed - seen_completed
+        failures = failed - seen_failed
+        if rerouted := self._rerouted.pop(source, 0):
+            failures = max(failures - rerouted, 0)
+        rate = self._success_rates.get(source, 1.0)
+        if outcomes := successes + failures:
+            # The same as folding the outcomes in one by one, in any order.
+            weight = 1 - (1 - _OUTCOME_SMOOTHING) ** outcomes
+            rate += (successes / outcomes - rate) * weight
+            self._success_rates[source] = rate
+        return rate
+
+    def async_score(
+        self, scanner: ESPHomeScanner, address: str, rssi_diff: int = 0
+    ) -> float:
+        """
+        Score connecting to ``address`` through ``scanner``; higher is better.
+
+        This is habluetooth's score for the connection path, so ``scanner``
+        must be bound to this router for the router's terms to apply.
+        ``rssi_diff`` is habluetooth's spread of RSSI across the candidate
+        paths, which scales its penalties.
+        """
+        if (info := scanner._previous_service_info.get(address)) is None:
+            return NO_RSSI_VALUE
+        return BluetoothScannerDevice(
+            scanner, info.device, info.advertisement
+        ).score_connection_path(rssi_diff)
+
+    def async_score_connection_path(
+        self, scanner: ESPHomeScanner, score: float
+    ) -> float:
+        """Add the router's terms to habluetooth's ``score`` for ``scanner``."""
+        if (
+            device := scanner._bluetooth_device
+        ) is not None and device.ble_connections_limit:
+            if not (device.available and (free := device.unleased_slots)):
+                return NO_RSSI_VALUE
+            score += self.free_slot_bonus * (free - 1)
+            score -= self.waiter_penalty * device.slot_waiters
+        return score - self.failure_penalty * (1 - self.async_success_rate(scanner))
+
+    def async_route(
+        self, address: str, exclude: ESPHomeScanner | None = None
+    ) -> ESPHomeScanner | None:
+        """
+        Return the best registered proxy to connect to ``address`` now.
+
+        Only available proxies that hear the device and have an unleased
+        slot with nobody queued for it qualify; ``exclude`` is skipped.
+        """
+        best: ESPHomeScanner | None = None
+        best_score = 0.0
+        for scanner in self._scanners.values():
+            if scanner is exclude or not scanner.connectable:
+                continue
+            if address not in scanner._previous_service_info:
+                continue
+            device = scanner._bluetooth_device
+            if device is None or not device.available:
+                continue
+            if not device.unleased_slots or device.slot_waiters:
+                continue
+            score = self.async_score(scanner, address)
+            if best is None or score > best_score:
+                best, best_score = scanner, score
+        return best
+
+    def async_reroute(
+        self, scanner: ESPHomeScanner, address: str
+    ) -> ESPHomeScanner | None:
+        """
+        Return a better proxy for a connect that would queue on ``scanner``.
+
+        Called when ``scanner`` has no slot to give right away. The
+        alternative must beat ``scanner`` counting the caller as one more
+        waiter. When one is returned the caller should fail the connect
+        so it is retried there.
+        """
+        if (better := self.async_route(address, exclude=scanner)) is None:
+            return None
+        # Counting the caller as one more waiter; a full proxy already
+        # scores lowest.
+        score = self.async_score(scanner, address) - self.waiter_penalty
+        if self.async_score(better, address) <= score:
+            return None
+        _LOGGER.debug(
+            "%s: Re-routing connect to %s via %s", scanner.name, address, better.name
+        )
+        self.reroutes += 1
+        self._rerouted[scanner.source] = self._rerouted.get(scanner.source, 0) + 1
+        return better
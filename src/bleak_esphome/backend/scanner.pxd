@@ -1,5 +1,7 @@
 
 
 cdef object MONOTONIC_TIME
-cdef object int_to_bluetooth_address
+cdef object intern_address
+cdef object _intern_miss
+cdef object INTERNED_ADDRESSES
 cdef object parse_advertisement_data_tuple
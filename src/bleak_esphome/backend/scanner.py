@@ -5,6 +5,7 @@ from __future__ import annotations
 import asyncio
 import logging
 import math
+from time import perf_counter
 from typing import TYPE_CHECKING, Any
 
 from aioesphomeapi import (
@@ -16,19 +17,44 @@ from aioesphomeapi import (
     BluetoothScannerState,
     BluetoothScannerStateResponse,
 )
-from bluetooth_data_tools import (
-    int_to_bluetooth_address,
-)
 from bluetooth_data_tools import (
     monotonic_time_coarse as MONOTONIC_TIME,
 )
 from habluetooth import Allocations, BluetoothScanningMode
 from habluetooth.base_scanner import BaseHaRemoteScanner
 
+from .address import INTERNED_ADDRESSES, _intern_miss, intern_address
+from .batch import RawAdvertisementBatch
+from .latency import DEFAULT_ROUND_TRIP_INTERVAL
+from .metrics import (
+    BATCH_SIZE_BUCKET,
+    DEFAULT_METRICS_INTERVAL,
+    LAST_BATCH_SIZE_BUCKET,
+    IngestMetrics,
+    IngestMetricsSnapshot,
+)
+from .stall import DEFAULT_STALL_CHECK_INTERVAL, StallDetector
+
 if TYPE_CHECKING:
-    from collections.abc import Callable
+    from collections.abc import Callable, Iterable
+
+    from habluetooth import BluetoothScannerDevice
 
+    from .active_budget import ActiveScanBudget
+    from .capture import AdvertisementRecorder
     from .device import ESPHomeBluetoothDevice
+    from .filters import AdvertisementFilter
+    from .latency import LatencyEstimator
+    from .resubscribe import ResubscribeScheduler
+    from .ring import RingPublisher
+    from .router import ConnectionRouter
+    from .shedding import LoadShedder
+    from .stall import StallEvent
+    from .suppression import PayloadSuppressor
+    from .worker import IngestWorker
+
+    # Per-advertisement ingest stage: (address, rssi, data, now) -> forward?
+    _AdvertisementGate = Callable[[int, int, bytes, float], bool]
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -62,31 +88,102 @@ _HA_TO_FIRMWARE_MODE: dict[BluetoothScanningMode, BluetoothScannerMode] = {
 }
 
 
+# One shared details dict per address type. habluetooth only reads it (it
+# merges into a fresh dict when it builds a BLEDevice), so the ingest loop
+# hands out the same instance instead of allocating one per advertisement.
+# These must never be mutated.
+_ADDRESS_TYPE_DETAILS: dict[int, dict[str, Any]] = {
+    address_type: {"address_type": address_type} for address_type in (0, 1)
+}
+
+
+def _details_for_address_type(address_type: int) -> dict[str, Any]:
+    """Return the shared details dict for ``address_type``."""
+    if (details := _ADDRESS_TYPE_DETAILS.get(address_type)) is None:
+        details = _ADDRESS_TYPE_DETAILS[address_type] = {"address_type": address_type}
+    return details
+
+
+class _ActiveWindow:
+    """An open ACTIVE window that later requests extend instead of reopen."""
+
+    __slots__ = ("done", "end", "merged")
+
+    def __init__(self, end: float, done: asyncio.Future[bool]) -> None:
+        self.end = end
+        self.done = done
+        self.merged = 0
+
+
 class ESPHomeScanner(BaseHaRemoteScanner):
     """Scanner for esphome."""
 
     __slots__ = (
-        "_active_window_lock",
+        "_active_scan_budget",
+        "_active_window",
+        "_advertisement_filter",
+        "_advertisements_paused",
         "_bluetooth_device",
+        "_capture_recorder",
         "_client",
         "_configured_mode",
+        "_connection_router",
+        "_gates",
+        "_ingest_worker",
         "_intent",
+        "_load_shedder",
+        "_merged_active_windows",
+        "_metrics",
+        "_payload_suppressor",
+        "_raw_batch_handler",
         "_resubscribe_advertisements",
+        "_resubscribe_scheduler",
+        "_ring_publisher",
         "_scanner_state_seen",
+        "_subscribe_advertisements",
         "_subscription_watchdog_task",
+        "_unsubscribe_advertisements",
+        "_watchdog_armed",
     )
 
     def __init__(self, *args: Any, **kwargs: Any):
         """Initialize the scanner."""
         super().__init__(*args, **kwargs)
         self._bluetooth_device: ESPHomeBluetoothDevice | None = None
+        self._capture_recorder: AdvertisementRecorder | None = None
         self._client: APIClient | None = None
-        self._active_window_lock = asyncio.Lock()
+        self._active_scan_budget: ActiveScanBudget | None = None
+        self._active_window: _ActiveWindow | None = None
+        self._advertisement_filter: AdvertisementFilter | None = None
+        self._advertisements_paused = False
         self._configured_mode: BluetoothScanningMode | None = None
+        self._connection_router: ConnectionRouter | None = None
         self._intent: BluetoothScanningMode | None = None
+        self._gates: tuple[_AdvertisementGate, ...] = ()
+        self._ingest_worker: IngestWorker | None = None
+        self._load_shedder: LoadShedder | None = None
+        self._merged_active_windows = 0
+        self._metrics = IngestMetrics(MONOTONIC_TIME())
+        self._payload_suppressor: PayloadSuppressor | None = None
+        self._raw_batch_handler: Callable[[RawAdvertisementBatch], None] | None = None
         self._resubscribe_advertisements: Callable[[], object] | None = None
+        self._resubscribe_scheduler: ResubscribeScheduler | None = None
+        self._ring_publisher: RingPublisher | None = None
         self._scanner_state_seen = False
+        self._subscribe_advertisements: Callable[[], Callable[[], None]] | None = None
         self._subscription_watchdog_task: asyncio.Task[None] | None = None
+        self._unsubscribe_advertisements: Callable[[], None] | None = None
+        self._watchdog_armed = False
+
+    @property
+    def scanning_intent(self) -> BluetoothScanningMode | None:
+        """The mode last pinned with :meth:`async_set_scanning_mode`, if any."""
+        return self._intent
+
+    @property
+    def merged_active_windows(self) -> int:
+        """Return how many window requests were merged into an open window."""
+        return self._merged_active_windows
 
     @property
     def configured_mode(self) -> BluetoothScanningMode | None:
@@ -135,6 +232,236 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         except APIConnectionError as ex:
             _LOGGER.debug("%s: failed to set scan mode: %s", self.name, ex)
 
+    def set_active_scan_budget(self, budget: ActiveScanBudget | None) -> None:
+        """
+        Share a fleet-wide active scanning budget with other proxies.
+
+        New active windows then only open when ``budget`` grants them,
+        possibly shortened; ``None`` lifts the budget.
+        """
+        if self._active_scan_budget is not None:
+            self._active_scan_budget.async_unregister(self)
+        self._active_scan_budget = budget
+        if budget is not None:
+            budget.async_register(self)
+
+    @property
+    def connection_router(self) -> ConnectionRouter | None:
+        """The router shared with other proxies, if any."""
+        return self._connection_router
+
+    def set_connection_router(self, router: ConnectionRouter | None) -> None:
+        """
+        Share a slot-aware connection router with other proxies.
+
+        habluetooth then ranks this proxy by its free slots, queued
+        waiters and recent success rate as well as RSSI; ``None`` goes
+        back to habluetooth's own ranking.
+        """
+        if self._connection_router is not None:
+            self._connection_router.async_unregister(self)
+        self._connection_router = router
+        if router is not None:
+            router.async_register(self)
+
+    def _score_connection_paths(
+        self, rssi_diff: int, scanner_device: BluetoothScannerDevice
+    ) -> float:
+        """Score a connection path, adjusted by the connection router if bound."""
+        score = super()._score_connection_paths(rssi_diff, scanner_device)
+        if (router := self._connection_router) is None:
+            return score
+        return router.async_score_connection_path(self, score)
+
+    def async_count_heard(self, addresses: Iterable[str]) -> int:
+        """Return how many of ``addresses`` this proxy currently hears."""
+        heard = self._previous_service_info
+        return sum(1 for address in addresses if address in heard)
+
+    def async_get_ingest_metrics(self) -> IngestMetricsSnapshot:
+        """Return this proxy's ingestion counters, rated since setup."""
+        return self._metrics.snapshot(self.source, MONOTONIC_TIME())
+
+    def set_ingest_timing(self, enabled: bool) -> None:
+        """Measure the time spent in the advertisement callbacks."""
+        self._metrics.timing = enabled
+
+    def async_subscribe_ingest_metrics(
+        self,
+        callback: Callable[[IngestMetricsSnapshot], None],
+        interval: float = DEFAULT_METRICS_INTERVAL,
+    ) -> Callable[[], None]:
+        """
+        Push an ingestion snapshot to ``callback`` every ``interval`` seconds.
+
+        Each snapshot's rate covers the span since the previous push.
+        Returns a callable that cancels the subscription.
+        """
+        loop = asyncio.get_running_loop()
+        previous = self.async_get_ingest_metrics()
+        handle: asyncio.TimerHandle
+
+        def _report() -> None:
+            nonlocal handle, previous
+            previous = snapshot = self._metrics.snapshot(
+                self.source, MONOTONIC_TIME(), previous
+            )
+            handle = loop.call_later(interval, _report)
+            try:
+                callback(snapshot)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: Error pushing ingest metrics", self.name)
+
+        handle = loop.call_later(interval, _report)
+
+        def _unsubscribe() -> None:
+            handle.cancel()
+
+        return _unsubscribe
+
+    def set_latency_estimator(self, estimator: LatencyEstimator | None) -> None:
+        """
+        Estimate how old this proxy's batches are when they arrive.
+
+        Every batch arrival is fed to ``estimator``; its estimate shows up
+        as ``delivery_delay`` in the ingest metrics, and with
+        ``estimator.correct`` set advertisements are stamped with the
+        corrected time. Captures and published rings keep the arrival
+        time. Feed round trips with :meth:`async_probe_round_trip`.
+        """
+        self._metrics.latency = estimator
+
+    async def async_measure_round_trip(self, cli: APIClient) -> float:
+        """
+        Time one request/response exchange with the proxy.
+
+        The result is fed to the bound latency estimator, if any, and
+        returned in seconds.
+        """
+        start = perf_counter()
+        await cli.device_info()
+        round_trip = perf_counter() - start
+        if (latency := self._metrics.latency) is not None:
+            latency.record_round_trip(round_trip)
+        return round_trip
+
+    def async_probe_round_trip(
+        self, cli: APIClient, interval: float = DEFAULT_ROUND_TRIP_INTERVAL
+    ) -> Callable[[], None]:
+        """
+        Measure the round trip every ``interval`` seconds.
+
+        Probing stops by itself when the connection is lost. Returns a
+        callable that stops probing.
+        """
+        task = asyncio.create_task(self._async_probe_round_trip(cli, interval))
+
+        def _stop() -> None:
+            task.cancel()
+
+        return _stop
+
+    async def _async_probe_round_trip(self, cli: APIClient, interval: float) -> None:
+        """Run the round trip probe loop."""
+        while True:
+            try:
+                await self.async_measure_round_trip(cli)
+            except APIConnectionError as ex:
+                _LOGGER.debug("%s: stopped probing round trip: %s", self.name, ex)
+                return
+            await asyncio.sleep(interval)
+
+    def async_watch_for_stalls(
+        self,
+        callback: Callable[[StallEvent], None] | None = None,
+        detector: StallDetector | None = None,
+        interval: float = DEFAULT_STALL_CHECK_INTERVAL,
+        resubscribe: bool = False,
+    ) -> Callable[[], None]:
+        """
+        Check every ``interval`` seconds that advertisements still arrive.
+
+        ``detector`` (a default :class:`StallDetector` if omitted) learns
+        this proxy's usual rate and decides when a silence is a stall.
+        Each stall is logged and passed to ``callback``; with
+        ``resubscribe`` the advertisement subscription is also re-sent
+        through the callable bound by
+        :meth:`set_resubscribe_advertisements`. While the subscription is
+        paused the silence is expected and not counted. Returns a
+        callable that stops watching.
+        """
+        loop = asyncio.get_running_loop()
+        if detector is None:
+            detector = StallDetector()
+        metrics = self._metrics
+        handle: asyncio.TimerHandle
+
+        def _check() -> None:
+            nonlocal handle
+            handle = loop.call_later(interval, _check)
+            now = MONOTONIC_TIME()
+            if self._advertisements_paused:
+                detector.async_reset(now, metrics.advertisements)
+                return
+            event = detector.async_sample(self.source, now, metrics.advertisements)
+            if event is not None:
+                self._async_on_stall(event, callback, resubscribe)
+
+        handle = loop.call_later(interval, _check)
+
+        def _unwatch() -> None:
+            handle.cancel()
+
+        return _unwatch
+
+    def _async_on_stall(
+        self,
+        event: StallEvent,
+        callback: Callable[[StallEvent], None] | None,
+        resubscribe: bool,
+    ) -> None:
+        """Report a stall and run the requested recovery."""
+        _LOGGER.warning(
+            "%s: No advertisements for %.0fs while the API connection is up "
+            "(usually %.1f/s); the proxy's radio may be stuck",
+            self.name,
+            event.gap,
+            event.baseline_rate,
+        )
+        if callback is not None:
+            try:
+                callback(event)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: Error in stall callback", self.name)
+        if resubscribe and self._resubscribe_advertisements is not None:
+            try:
+                self._resubscribe_advertisements()
+            except Exception as ex:  # pylint: disable=broad-except
+                _LOGGER.debug(
+                    "%s: failed to resubscribe after stall: %s", self.name, ex
+                )
+
+    def set_capture_recorder(self, recorder: AdvertisementRecorder | None) -> None:
+        """
+        Record every advertisement batch this proxy delivers.
+
+        Batches are recorded as received, before filtering or
+        suppression. ``None`` stops recording; closing the recorder is
+        left to the caller since one may be shared by many scanners.
+        """
+        self._capture_recorder = recorder
+
+    def set_ring_publisher(self, publisher: RingPublisher | None) -> None:
+        """
+        Publish every advertisement batch into a shared-memory ring.
+
+        Like the capture recorder, batches are published as received,
+        before filtering or suppression. ``None`` stops publishing;
+        closing the publisher is left to the caller since one may be
+        shared by many scanners.
+        """
+        self._ring_publisher = publisher
+
     def set_bluetooth_device(self, device: ESPHomeBluetoothDevice) -> None:
         """Set the bluetooth device for this scanner."""
         self._bluetooth_device = device
@@ -149,6 +476,92 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         """
         self._client = client
 
+    def set_raw_batch_handler(
+        self, handler: Callable[[RawAdvertisementBatch], None] | None
+    ) -> None:
+        """
+        Deliver each raw advertisement batch to ``handler`` in one call.
+
+        While a handler is bound, ``async_on_raw_advertisements`` converts
+        the protobuf batch into a :class:`RawAdvertisementBatch` and hands
+        it over instead of feeding habluetooth one advertisement at a
+        time; the handler owns ingestion and may pass the batch back
+        through :meth:`async_ingest_raw_batch`. ``None`` restores the
+        per-advertisement path.
+        """
+        self._raw_batch_handler = handler
+
+    @property
+    def advertisement_filter(self) -> AdvertisementFilter | None:
+        """The bound pushdown filter stage, if any."""
+        return self._advertisement_filter
+
+    def set_advertisement_filter(
+        self, advertisement_filter: AdvertisementFilter | None
+    ) -> None:
+        """
+        Drop unwanted raw advertisements before they reach habluetooth.
+
+        The filter runs before payload suppression so rejected devices
+        never occupy a suppression table slot. Applies to raw
+        advertisements only. ``None`` removes the stage.
+        """
+        self._advertisement_filter = advertisement_filter
+        self._rebuild_gates()
+
+    @property
+    def payload_suppressor(self) -> PayloadSuppressor | None:
+        """The bound identical-payload suppression stage, if any."""
+        return self._payload_suppressor
+
+    def set_payload_suppressor(self, suppressor: PayloadSuppressor | None) -> None:
+        """
+        Drop repeated identical payloads before they reach habluetooth.
+
+        Applies to raw advertisements only; decoded advertisements from
+        firmware without ``RAW_ADVERTISEMENTS`` carry no raw payload to
+        compare. ``None`` removes the stage.
+        """
+        self._payload_suppressor = suppressor
+        self._rebuild_gates()
+
+    @property
+    def load_shedder(self) -> LoadShedder | None:
+        """The bound load shedding stage, if any."""
+        return self._load_shedder
+
+    def set_load_shedder(self, shedder: LoadShedder | None) -> None:
+        """
+        Shed raw advertisements while the event loop is lagging.
+
+        The shedder runs after the filter and suppression stages and
+        costs one flag check per batch until its monitor reports lag.
+        Applies to raw advertisements only. ``None`` removes the stage;
+        advertisements it still holds are dropped.
+        """
+        self._load_shedder = shedder
+
+    def set_ingest_worker(self, worker: IngestWorker | None) -> None:
+        """
+        Convert raw advertisement batches on ``worker``'s thread.
+
+        The loop then only enqueues each protobuf batch; interning,
+        filtering and suppression run on the worker, which hands the
+        results back in coalesced chunks. While the worker is not
+        running, batches are ingested inline. ``None`` restores inline
+        ingestion; batches already queued are still delivered.
+        """
+        self._ingest_worker = worker
+
+    def _rebuild_gates(self) -> None:
+        """Collect the bound per-advertisement stages in evaluation order."""
+        gates: list[_AdvertisementGate] = []
+        if self._advertisement_filter is not None:
+            gates.append(self._advertisement_filter.should_forward)
+        if self._payload_suppressor is not None:
+            gates.append(self._payload_suppressor.should_forward)
+        self._gates = tuple(gates)
+
     def set_resubscribe_advertisements(self, callback: Callable[[], object]) -> None:
         """
         Bind the callable that re-sends the advertisement subscription.
@@ -165,32 +578,142 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         """
         self._resubscribe_advertisements = callback
 
+    def set_resubscribe_scheduler(self, scheduler: ResubscribeScheduler | None) -> None:
+        """
+        Coordinate this proxy's resubscribe retries with the rest of the fleet.
+
+        Bind the same scheduler to every scanner before
+        :meth:`async_setup`; it jitters the watchdog's retry delays and
+        caps how many proxies resubscribe at once. ``None`` restores the
+        fixed retry schedule.
+        """
+        self._resubscribe_scheduler = scheduler
+
+    def set_advertisement_subscription(
+        self,
+        subscribe: Callable[[], Callable[[], None]],
+        unsubscribe: Callable[[], None],
+    ) -> None:
+        """
+        Bind the advertisement subscription so it can be paused and resumed.
+
+        ``subscribe`` sends the subscription request and returns the
+        callable that cancels it; ``unsubscribe`` cancels the subscription
+        already in place.
+        """
+        self._subscribe_advertisements = subscribe
+        self._unsubscribe_advertisements = unsubscribe
+
+    @property
+    def advertisements_paused(self) -> bool:
+        """Return True while the advertisement subscription is paused."""
+        return self._advertisements_paused
+
+    def async_pause_advertisements(self) -> None:
+        """
+        Stop the proxy sending advertisements to this host.
+
+        For proxies kept only for active connections this saves the API
+        bandwidth and the host CPU spent ingesting advertisements nobody
+        reads. The subscription watchdog is stopped with it: the proxy
+        only reports scanner state to its advertisement subscriber, so the
+        watchdog would otherwise resubscribe behind the caller's back.
+        Does nothing if no subscription is bound or it is already paused.
+        """
+        if (
+            self._advertisements_paused
+            or (unsubscribe := self._unsubscribe_advertisements) is None
+        ):
+            return
+        self._advertisements_paused = True
+        self._unsubscribe_advertisements = None
+        self._cancel_subscription_watchdog()
+        try:
+            unsubscribe()
+        except APIConnectionError as ex:
+            # The connection is gone, and the subscription with it.
+            _LOGGER.debug("%s: failed to pause advertisements: %s", self.name, ex)
+            return
+        _LOGGER.debug("%s: advertisement subscription paused", self.name)
+
+    def async_resume_advertisements(self) -> None:
+        """
+        Subscribe to advertisements again after a pause.
+
+        The subscription watchdog is re-armed as after connecting, since
+        another connection may have taken the device's single subscriber
+        slot in the meantime.
+        """
+        if not self._advertisements_paused:
+            return
+        if TYPE_CHECKING:
+            assert self._subscribe_advertisements is not None
+        self._scanner_state_seen = False
+        try:
+            self._unsubscribe_advertisements = self._subscribe_advertisements()
+        except APIConnectionError as ex:
+            # Stay paused; the reconnect flow builds a new scanner.
+            _LOGGER.debug("%s: failed to resume advertisements: %s", self.name, ex)
+            return
+        self._advertisements_paused = False
+        _LOGGER.debug("%s: advertisement subscription resumed", self.name)
+        if self._watchdog_armed:
+            self._start_subscription_watchdog()
+
     def async_setup(self) -> Callable[[], None]:
         """Set up the scanner and start the subscription watchdog if armed."""
         unsetup = super().async_setup()
-        if self._resubscribe_advertisements is not None:
-            self._subscription_watchdog_task = asyncio.create_task(
-                self._subscription_watchdog()
-            )
+        self._watchdog_armed = self._resubscribe_advertisements is not None
+        if self._watchdog_armed and not self._advertisements_paused:
+            self._start_subscription_watchdog()
 
         def _unsetup() -> None:
-            if self._subscription_watchdog_task is not None:
-                self._subscription_watchdog_task.cancel()
-                self._subscription_watchdog_task = None
+            self._watchdog_armed = False
+            self._cancel_subscription_watchdog()
             unsetup()
 
         return _unsetup
 
+    def _start_subscription_watchdog(self) -> None:
+        """Start the subscription watchdog, replacing any running one."""
+        self._cancel_subscription_watchdog()
+        self._subscription_watchdog_task = asyncio.create_task(
+            self._subscription_watchdog()
+        )
+
+    def _cancel_subscription_watchdog(self) -> None:
+        """Cancel the subscription watchdog if it is running."""
+        if self._subscription_watchdog_task is not None:
+            self._subscription_watchdog_task.cancel()
+            self._subscription_watchdog_task = None
+
     async def _subscription_watchdog(self) -> None:
         """Resubscribe advertisements until the proxy reports scanner state."""
+        scheduler = self._resubscribe_scheduler
+        try:
+            await self._async_resubscribe_until_state_seen(scheduler)
+        finally:
+            if scheduler is not None:
+                scheduler.async_forget(self.source)
+
+    async def _async_resubscribe_until_state_seen(
+        self, scheduler: ResubscribeScheduler | None
+    ) -> None:
+        """Run the watchdog's retry loop, paced by ``scheduler`` if bound."""
         if TYPE_CHECKING:
             assert self._resubscribe_advertisements is not None
+        source = self.source
         attempt = 0
         while True:
             delay = _SUBSCRIPTION_RETRY_DELAYS[
                 min(attempt, len(_SUBSCRIPTION_RETRY_DELAYS) - 1)
             ]
+            if scheduler is not None:
+                delay = scheduler.async_schedule(source, delay)
             await asyncio.sleep(delay)
+            if scheduler is not None and not self._scanner_state_seen:
+                await scheduler.async_acquire(source)
+            # State may also have landed while queued for a slot.
             if self._scanner_state_seen:
                 return
             # Warn while a stale subscriber is expected to still hold the slot
@@ -204,7 +727,7 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                 else _LOGGER.debug
             )
             log(
-                "%s: No scanner state received %ss after subscribing; the device "
+                "%s: No scanner state received %.0fs after subscribing; the device "
                 "likely still has a stale advertisement subscriber from a "
                 "previous connection; resubscribing",
                 self.name,
@@ -217,7 +740,9 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                 # scanner with its own watchdog.
                 _LOGGER.debug("%s: failed to resubscribe: %s", self.name, ex)
                 return
-            except Exception:
+            except Exception as ex:
+                if scheduler is not None:
+                    scheduler.async_record_attempt(source, repr(ex))
                 # Keep retrying: the connection is still alive and nothing
                 # else re-arms the watchdog, so giving up here would leave
                 # the subscription silently unrecovered. Logging is throttled
@@ -229,6 +754,9 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                     self.name,
                     exc_info=True,
                 )
+            else:
+                if scheduler is not None:
+                    scheduler.async_record_attempt(source)
             attempt += 1
 
     def get_allocations(self) -> Allocations | None:
@@ -248,10 +776,7 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                 adapter=self.source,
                 slots=self._bluetooth_device.ble_connections_limit,
                 free=self._bluetooth_device.ble_connections_free,
-                allocated=[
-                    int_to_bluetooth_address(address)
-                    for address in self._bluetooth_device.ble_allocations
-                ],
+                allocated=self._bluetooth_device.allocated_addresses,
             )
         return None
 
@@ -274,6 +799,9 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         # and sends nothing. Reaching this line therefore proves the
         # advertisement subscription landed.
         self._scanner_state_seen = True
+        if self._resubscribe_scheduler is not None:
+            # The subscription landed; free the fleet-wide slot early.
+            self._resubscribe_scheduler.async_release(self.source)
         configured_pb = state.configured_mode
         self._configured_mode = (
             _FIRMWARE_TO_HA_MODE.get(configured_pb)
@@ -299,10 +827,15 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         the firmware even though ``requested_mode`` stays AUTO — and
         falls back to the last firmware-reported ``requested_mode`` when
         no intent has been pinned. If no prior mode is known the proxy
-        is returned to PASSIVE. Only one window may be open at a time;
-        a request that arrives while another window is in flight
-        returns ``False`` immediately so the caller can decide whether
-        to retry.
+        is returned to PASSIVE.
+
+        A request that arrives while a window is open, up to the moment
+        it restores, is merged into it: the window is extended to cover
+        the later end time and the proxy sees one ACTIVE flip and one
+        restore for the lot. Every merged request returns once the
+        extended window closes, ``True`` if it ran to its end and
+        ``False`` if it was cut short by cancelling the request that
+        opened it. :attr:`merged_active_windows` counts merged requests.
         """
         client = self._client
         if client is None:
@@ -312,13 +845,31 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         # would otherwise propagate into a confusing scheduler error.
         if not math.isfinite(duration) or duration < 0:
             return False
-        # Safe: no await between the .locked() check and the acquire
-        # inside `async with`, so asyncio cannot schedule another
-        # coroutine in between and the check / acquire is effectively
-        # atomic on this lock.
-        if self._active_window_lock.locked():
-            return False
-        async with self._active_window_lock:
+        loop = asyncio.get_running_loop()
+        end = loop.time() + duration
+        budget = self._active_scan_budget
+        if (window := self._active_window) is not None:
+            window.merged += 1
+            self._merged_active_windows += 1
+            if end > window.end:
+                window.end += (
+                    end - window.end
+                    if budget is None
+                    else budget.async_extend(self, end - window.end)
+                )
+            # Shielded: a merged request giving up must not end the
+            # window for the request that opened it or the others.
+            return await asyncio.shield(window.done)
+        if budget is not None:
+            if (granted := budget.async_request(self, duration)) is None:
+                return False
+            duration = granted
+            end = loop.time() + duration
+        # No await between the check above and claiming the window, so
+        # no other request can open a second one in between.
+        window = self._active_window = _ActiveWindow(end, loop.create_future())
+        completed = False
+        try:
             prior = self._intent if self._intent is not None else self.requested_mode
             try:
                 client.bluetooth_scanner_set_mode(BluetoothScannerMode.ACTIVE)
@@ -326,10 +877,19 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                 _LOGGER.debug(
                     "%s: failed to enter active scan window: %s", self.name, ex
                 )
+                if budget is not None:
+                    budget.async_release(self)
                 return False
             try:
                 await asyncio.sleep(duration)
+                # Merged requests may have pushed the end out meanwhile.
+                while (remaining := window.end - loop.time()) > 0:
+                    await asyncio.sleep(remaining)
+                completed = True
             finally:
+                # Closed before the restore so a request arriving from
+                # here on opens a fresh window instead of joining this one.
+                self._active_window = None
                 # Honor a live repin (async_set_scanning_mode is sync and
                 # lock-free, so it can land mid-window) over the snapshot
                 # taken when the window opened. Fall back to the open-time
@@ -355,29 +915,100 @@ class ESPHomeScanner(BaseHaRemoteScanner):
                         self.name,
                         ex,
                     )
+                if budget is not None:
+                    budget.async_release(self)
+                if window.merged:
+                    _LOGGER.debug(
+                        "%s: active window merged %s overlapping requests",
+                        self.name,
+                        window.merged,
+                    )
+        finally:
+            self._active_window = None
+            window.done.set_result(completed)
         return True
 
     def async_on_advertisement(self, adv: BluetoothLEAdvertisement) -> None:
         """Call the registered callback."""
+        metrics = self._metrics
+        metrics.batches += 1
+        metrics.advertisements += 1
+        metrics.batch_sizes[1] += 1
+        if metrics.timing:
+            start = perf_counter()
+            self._async_ingest_advertisement(adv)
+            metrics.decoded_seconds += perf_counter() - start
+        else:
+            self._async_ingest_advertisement(adv)
+
+    def _async_ingest_advertisement(self, adv: BluetoothLEAdvertisement) -> None:
+        """Feed one decoded advertisement to habluetooth."""
+        now = MONOTONIC_TIME()
+        if self._capture_recorder is not None:
+            self._capture_recorder.record_advertisement(self.source, now, adv)
+        if self._ring_publisher is not None:
+            self._ring_publisher.publish_advertisement(self.source, now, adv)
+        if (latency := self._metrics.latency) is not None:
+            now = latency.record_arrival(now)
         # The mac address is a uint64, but we need a string
         self._async_on_advertisement(
-            int_to_bluetooth_address(adv.address),
+            intern_address(adv.address),
             adv.rssi,
             adv.name,
             adv.service_uuids,
             adv.service_data,
             adv.manufacturer_data,
             None,
-            {"address_type": adv.address_type},
-            MONOTONIC_TIME(),
+            _details_for_address_type(adv.address_type),
+            now,
         )
 
     def async_on_raw_advertisements(
         self, raw: BluetoothLERawAdvertisementsResponse
     ) -> None:
         """Call the registered callback."""
+        metrics = self._metrics
+        if metrics.timing:
+            start = perf_counter()
+            self._async_ingest_raw_advertisements(raw)
+            metrics.raw_seconds += perf_counter() - start
+        else:
+            self._async_ingest_raw_advertisements(raw)
+
+    def _async_ingest_raw_advertisements(
+        self, raw: BluetoothLERawAdvertisementsResponse
+    ) -> None:
+        """Feed one raw advertisement batch through the ingest stages."""
         now = MONOTONIC_TIME()
         advertisements = raw.advertisements
+        count = len(advertisements)
+        metrics = self._metrics
+        metrics.batches += 1
+        metrics.advertisements += count
+        metrics.batch_sizes[
+            BATCH_SIZE_BUCKET[count] if count < 32 else LAST_BATCH_SIZE_BUCKET
+        ] += 1
+        if self._capture_recorder is not None:
+            self._capture_recorder.record_raw_advertisements(
+                self.source, now, advertisements
+            )
+        if self._ring_publisher is not None:
+            self._ring_publisher.publish_raw_advertisements(
+                self.source, now, advertisements
+            )
+        if (latency := metrics.latency) is not None:
+            now = latency.record_arrival(now)
+        if (worker := self._ingest_worker) is not None and worker.submit(
+            self, advertisements, now
+        ):
+            return
+        if (
+            self._gates
+            or self._raw_batch_handler is not None
+            or (self._load_shedder is not None and self._load_shedder.engaged)
+        ):
+            self._async_forward_raw_batch(*self._build_raw_batch(advertisements, now))
+            return
         # We avoid __iter__ on the protobuf object because
         # the the protobuf library has an expensive internal
         # debug logging when it reaches the end of a repeated field.
@@ -385,13 +1016,118 @@ class ESPHomeScanner(BaseHaRemoteScanner):
         # To work around this we use a for loop to iterate over
         # the repeated field since `PyUpb_RepeatedContainer_Subscript`
         # does not trigger the debug logging.
+        #
+        # The steady state allocates nothing per advertisement beyond what
+        # the protobuf accessors return: MAC strings come from the intern
+        # table and details dicts are shared per address type, with the
+        # lookups inlined to avoid a call per advertisement.
         on_raw = self._async_on_raw_advertisement
-        for i in range(len(advertisements)):
+        interned_get = INTERNED_ADDRESSES.get
+        details_get = _ADDRESS_TYPE_DETAILS.get
+        received = 0
+        for i in range(count):
             adv = advertisements[i]
-            on_raw(
-                int_to_bluetooth_address(adv.address),
-                adv.rssi,
-                adv.data,
-                {"address_type": adv.address_type},
-                now,
+            address = adv.address
+            if (mac := interned_get(address)) is None:
+                mac = _intern_miss(address)
+            address_type = adv.address_type
+            if (details := details_get(address_type)) is None:
+                details = _details_for_address_type(address_type)
+            data = adv.data
+            received += len(data)
+            on_raw(mac, adv.rssi, data, details, now)
+        metrics.bytes_received += received
+
+    def _build_raw_batch(
+        self, advertisements: Any, now: float
+    ) -> tuple[RawAdvertisementBatch, int]:
+        """
+        Convert a repeated protobuf field into parallel arrays.
+
+        Advertisements rejected by any bound stage are left out. Returns
+        the batch and the payload bytes received. This may run on an
+        ingest worker thread, so it leaves the metrics to the caller.
+        """
+        interned_get = INTERNED_ADDRESSES.get
+        received = 0
+        # Subscript rather than iterate; see async_on_raw_advertisements.
+        if not (gates := self._gates):
+            count = len(advertisements)
+            addresses: list[str] = [""] * count
+            rssis: list[int] = [0] * count
+            payloads: list[bytes] = [b""] * count
+            address_types: list[int] = [0] * count
+            for i in range(count):
+                adv = advertisements[i]
+                address = adv.address
+                if (mac := interned_get(address)) is None:
+                    mac = _intern_miss(address)
+                addresses[i] = mac
+                rssis[i] = adv.rssi
+                data = adv.data
+                received += len(data)
+                payloads[i] = data
+                address_types[i] = adv.address_type
+            return (
+                RawAdvertisementBatch(
+                    self.source, now, addresses, rssis, payloads, address_types
+                ),
+                received,
             )
+        addresses = []
+        rssis = []
+        payloads = []
+        address_types = []
+        for i in range(len(advertisements)):
+            adv = advertisements[i]
+            address = adv.address
+            rssi = adv.rssi
+            data = adv.data
+            received += len(data)
+            for gate in gates:
+                if not gate(address, rssi, data, now):
+                    break
+            else:
+                if (mac := interned_get(address)) is None:
+                    mac = _intern_miss(address)
+                addresses.append(mac)
+                rssis.append(rssi)
+                payloads.append(data)
+                address_types.append(adv.address_type)
+        return (
+            RawAdvertisementBatch(
+                self.source, now, addresses, rssis, payloads, address_types
+            ),
+            received,
+        )
+
+    def _async_forward_raw_batch(
+        self, batch: RawAdvertisementBatch, received: int
+    ) -> None:
+        """Count ``received`` bytes, shed, then hand ``batch`` on."""
+        self._metrics.bytes_received += received
+        if not batch.addresses:
+            return
+        if (shedder := self._load_shedder) is not None and shedder.engaged:
+            batch = shedder.shed_batch(batch)
+            if not batch.addresses:
+                return
+        if self._raw_batch_handler is not None:
+            self._raw_batch_handler(batch)
+        else:
+            self.async_ingest_raw_batch(batch)
+
+    def async_ingest_raw_batch(self, batch: RawAdvertisementBatch) -> None:
+        """Feed a :class:`RawAdvertisementBatch` to habluetooth."""
+        on_raw = self._async_on_raw_advertisement
+        details_get = _ADDRESS_TYPE_DETAILS.get
+        addresses = batch.addresses
+        rssis = batch.rssis
+        payloads = batch.payloads
+        address_types = batch.address_types
+        now = batch.time
+        for i in range(len(addresses)):
+            address_type = address_types[i]
+            if (details := details_get(address_type)) is None:
+                details = _details_for_address_type(address_type)
+            on_raw(addresses[i], rssis[i], payloads[i], details, now)
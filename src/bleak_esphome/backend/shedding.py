@@ -0,0 +1,271 @@
+"""Event-loop-lag-aware advertisement load shedding for esphome."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+from typing import TYPE_CHECKING
+
+from bluetooth_data_tools import monotonic_time_coarse as MONOTONIC_TIME
+from lru import LRU  # pylint: disable=no-name-in-module
+
+from .batch import RawAdvertisementBatch
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_LAG_INTERVAL = 0.25
+DEFAULT_SHED_THRESHOLD = 0.1
+DEFAULT_RECOVER_THRESHOLD = 0.025
+DEFAULT_SHED_INTERVAL = 1.0
+DEFAULT_MAX_SHED_ADDRESSES = 4096
+
+# Weight of a new lag sample in the smoothed lag; one late tick from a
+# single slow callback should not flip the fleet into degraded mode.
+_LAG_SMOOTHING = 0.3
+
+# Shedding policies.
+SHED_NEWEST = "newest"
+SHED_SAMPLE = "sample"
+SHED_DROP = "drop"
+SHED_POLICIES = (SHED_NEWEST, SHED_SAMPLE, SHED_DROP)
+
+
+class LoopLagMonitor:
+    """
+    Measure event loop lag and decide when advertisements must be shed.
+
+    A timer scheduled every ``interval`` seconds records how late it
+    fires; the smoothed lateness is the loop lag. Shedding starts once
+    the lag exceeds ``shed_threshold`` and stops once it falls below
+    ``recover_threshold``, so the state does not flap around a single
+    threshold. Each transition is logged and counted. Loop lag is a
+    property of the whole process, so one monitor is meant to be shared
+    by every proxy's :class:`LoadShedder`.
+    """
+
+    __slots__ = (
+        "_shed_started",
+        "lag",
+        "recover_threshold",
+        "shed_seconds",
+        "shed_threshold",
+        "shedding",
+        "transitions",
+    )
+
+    def __init__(
+        self,
+        shed_threshold: float = DEFAULT_SHED_THRESHOLD,
+        recover_threshold: float = DEFAULT_RECOVER_THRESHOLD,
+    ) -> None:
+        if shed_threshold <= 0:
+            raise ValueError(f"Shed threshold must be positive, got {shed_threshold}")
+        if not 0 <= recover_threshold < shed_threshold:
+            raise ValueError(
+                "Recover threshold must be below the shed threshold, got "
+                f"{recover_threshold} >= {shed_threshold}"
+            )
+        self.shed_threshold = shed_threshold
+        self.recover_threshold = recover_threshold
+        self.lag = 0.0
+        self.shedding = False
+        self.transitions = 0
+        self.shed_seconds = 0.0
+        self._shed_started = 0.0
+
+    def async_start(self, interval: float = DEFAULT_LAG_INTERVAL) -> Callable[[], None]:
+        """
+        Start sampling the running loop every ``interval`` seconds.
+
+        Returns a callable that stops sampling; the current state is kept.
+        """
+        loop = asyncio.get_running_loop()
+        handle: asyncio.TimerHandle
+        expected = loop.time() + interval
+
+        def _tick() -> None:
+            nonlocal expected, handle
+            now = loop.time()
+            self.async_record_lag(max(now - expected, 0.0))
+            expected = now + interval
+            handle = loop.call_later(interval, _tick)
+
+        handle = loop.call_later(interval, _tick)
+
+        def _stop() -> None:
+            handle.cancel()
+
+        return _stop
+
+    def async_record_lag(self, lag: float) -> None:
+        """Fold one lag sample in seconds into the smoothed lag."""
+        self.lag += (lag - self.lag) * _LAG_SMOOTHING
+        if not self.shedding and self.lag > self.shed_threshold:
+            self.shedding = True
+            self.transitions += 1
+            self._shed_started = MONOTONIC_TIME()
+            _LOGGER.warning(
+                "Event loop lag is %.0fms (threshold %.0fms); shedding "
+                "advertisements until it recovers",
+                self.lag * 1000,
+                self.shed_threshold * 1000,
+            )
+        elif self.shedding and self.lag < self.recover_threshold:
+            self.shedding = False
+            self.transitions += 1
+            shed_for = MONOTONIC_TIME() - self._shed_started
+            self.shed_seconds += shed_for
+            _LOGGER.warning(
+                "Event loop lag recovered to %.0fms; stopped shedding "
+                "advertisements after %.1fs",
+                self.lag * 1000,
+                shed_for,
+            )
+
+
+class LoadShedder:
+    """
+    Reduce one proxy's raw advertisement stream while the loop is lagging.
+
+    Bind with :meth:`ESPHomeScanner.set_load_shedder`. While ``monitor``
+    reports shedding, each batch is reduced by ``policy``:
+
+    - ``"newest"`` coalesces: the newest advertisement per address is
+      held and released once per ``interval``, stamped with the release
+      time, so every device is still refreshed with its latest payload.
+    - ``"sample"`` forwards the first advertisement per address per
+      ``interval`` and drops the rest.
+    - ``"drop"`` drops every raw advertisement.
+
+    Held advertisements are released with the first batch after the lag
+    recovers. The per-address tables are LRUs bounded by
+    ``max_addresses``. ``forwarded`` and ``shed`` count advertisements
+    let through and dropped, merged away or evicted while shedding.
+    """
+
+    __slots__ = (
+        "_last_forwarded",
+        "_pending",
+        "_window_start",
+        "forwarded",
+        "interval",
+        "monitor",
+        "policy",
+        "shed",
+    )
+
+    def __init__(
+        self,
+        monitor: LoopLagMonitor,
+        policy: str = SHED_NEWEST,
+        interval: float = DEFAULT_SHED_INTERVAL,
+        max_addresses: int = DEFAULT_MAX_SHED_ADDRESSES,
+    ) -> None:
+        if policy not in SHED_POLICIES:
+            raise ValueError(
+                f"Unknown shedding policy {policy!r}, expected one of {SHED_POLICIES}"
+            )
+        if interval <= 0:
+            raise ValueError(f"Shedding interval must be positive, got {interval}")
+        if max_addresses < 1:
+            raise ValueError(
+                f"Shedding table size must be positive, got {max_addresses}"
+            )
+        self.monitor = monitor
+        self.policy = policy
+        self.interval = interval
+        self.forwarded = 0
+        self.shed = 0
+        self._window_start = 0.0
+        self._pending: LRU[str, tuple[int, bytes, int]] = LRU(max_addresses)
+        self._last_forwarded: LRU[str, float] = LRU(max_addresses)
+
+    @property
+    def engaged(self) -> bool:
+        """Whether batches must pass through :meth:`shed_batch`."""
+        return self.monitor.shedding or bool(self._pending)
+
+    def shed_batch(self, batch: RawAdvertisementBatch) -> RawAdvertisementBatch:
+        """Return what to forward of ``batch`` under the current state."""
+        if not self.monitor.shedding:
+            return self._release(batch)
+        if self.policy == SHED_NEWEST:
+            return self._coalesce(batch)
+        if self.policy == SHED_SAMPLE:
+            return self._sample(batch)
+        self.shed += len(batch.addresses)
+        return RawAdvertisementBatch(batch.source, batch.time, [], [], [], [])
+
+    def _release(self, batch: RawAdvertisementBatch) -> RawAdvertisementBatch:
+        """Prepend held advertisements to ``batch`` and forget them."""
+        pending = self._pending
+        if not pending:
+            return batch
+        addresses: list[str] = []
+        rssis: list[int] = []
+        payloads: list[bytes] = []
+        address_types: list[int] = []
+        # Oldest first so a later payload for the same address wins.
+        for address, (rssi, data, address_type) in reversed(pending.items()):
+            addresses.append(address)
+            rssis.append(rssi)
+            payloads.append(data)
+            address_types.append(address_type)
+        pending.clear()
+        self.forwarded += len(addresses)
+        return RawAdvertisementBatch(
+            batch.source,
+            batch.time,
+            addresses + batch.addresses,
+            rssis + batch.rssis,
+            payloads + batch.payloads,
+            address_types + batch.address_types,
+        )
+
+    def _coalesce(self, batch: RawAdvertisementBatch) -> RawAdvertisementBatch:
+        """Hold the newest advertisement per address; release per interval."""
+        if batch.time - self._window_start >= self.interval:
+            self._window_start = batch.time
+            out = self._release(
+                RawAdvertisementBatch(batch.source, batch.time, [], [], [], [])
+            )
+        else:
+            out = RawAdvertisementBatch(batch.source, batch.time, [], [], [], [])
+        pending = self._pending
+        max_pending = pending.get_size()
+        addresses = batch.addresses
+        rssis = batch.rssis
+        payloads = batch.payloads
+        address_types = batch.address_types
+        for i in range(len(addresses)):
+            address = addresses[i]
+            if address in pending or len(pending) >= max_pending:
+                # Merged away, or a full table evicts its oldest held one.
+                self.shed += 1
+            pending[address] = (rssis[i], payloads[i], address_types[i])
+        return out
+
+    def _sample(self, batch: RawAdvertisementBatch) -> RawAdvertisementBatch:
+        """Forward the first advertisement per address per interval."""
+        last_forwarded = self._last_forwarded
+        interval = self.interval
+        now = batch.time
+        out = RawAdvertisementBatch(batch.source, now, [], [], [], [])
+        addresses = batch.addresses
+        for i in range(len(addresses)):
+            address = addresses[i]
+            if (last := last_forwarded.get(address)) is not None and (
+                now - last < interval
+            ):
+                self.shed += 1
+                continue
+            last_forwarded[address] = now
+            out.addresses.append(address)
+            out.rssis.append(batch.rssis[i])
+            out.payloads.append(batch.payloads[i])
+            out.address_types.append(batch.address_types[i])
+        self.forwarded += len(out.addresses)
+        return out
@@ -0,0 +1,122 @@
+"""Detection of esphome proxies that stop delivering advertisements."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+DEFAULT_STALL_CHECK_INTERVAL = 5.0
+DEFAULT_STALL_SENSITIVITY = 30.0
+DEFAULT_MIN_STALL_GAP = 15.0
+DEFAULT_STALL_WARMUP = 60.0
+
+# Weight of each new rate sample in the learned baseline.
+_BASELINE_SMOOTHING = 0.1
+
+
+@dataclass(frozen=True, slots=True)
+class StallEvent:
+    """A proxy that went quiet for longer than its traffic explains."""
+
+    source: str
+    gap: float
+    baseline_rate: float
+    threshold: float
+
+
+class StallDetector:
+    """
+    Spot a proxy whose radio stopped while its API link stays up.
+
+    The API keepalive only notices a dead link, so a wedged radio can go
+    unnoticed for a long time. The detector is fed the proxy's cumulative
+    advertisement count at regular samples (the hot path pays nothing)
+    and learns the proxy's usual rate from the samples where advertisements
+    arrived. The proxy is stalled once nothing has arrived for as long as
+    it takes to miss ``sensitivity`` advertisements at that rate, and at
+    least ``min_gap`` seconds. Nothing is reported until ``warmup``
+    seconds of traffic have been seen, so a quiet proxy is never flagged
+    on a guess.
+    """
+
+    __slots__ = (
+        "_last_count",
+        "_last_ingest",
+        "_last_sample",
+        "baseline_rate",
+        "min_gap",
+        "observed",
+        "sensitivity",
+        "stalled",
+        "stalls",
+        "warmup",
+    )
+
+    def __init__(
+        self,
+        sensitivity: float = DEFAULT_STALL_SENSITIVITY,
+        min_gap: float = DEFAULT_MIN_STALL_GAP,
+        warmup: float = DEFAULT_STALL_WARMUP,
+    ) -> None:
+        if sensitivity <= 0:
+            raise ValueError(f"Stall sensitivity must be positive, got {sensitivity}")
+        if min_gap <= 0:
+            raise ValueError(f"Minimum stall gap must be positive, got {min_gap}")
+        if warmup < 0:
+            raise ValueError(f"Stall warmup must not be negative, got {warmup}")
+        self.sensitivity = sensitivity
+        self.min_gap = min_gap
+        self.warmup = warmup
+        self.baseline_rate = 0.0
+        self.observed = 0.0
+        self.stalled = False
+        self.stalls = 0
+        self._last_count: int | None = None
+        self._last_ingest = 0.0
+        self._last_sample = 0.0
+
+    @property
+    def threshold(self) -> float:
+        """Return the silence in seconds that counts as a stall."""
+        if not self.baseline_rate:
+            return self.min_gap
+        return max(self.min_gap, self.sensitivity / self.baseline_rate)
+
+    def async_reset(self, now: float, count: int) -> None:
+        """Restart the silence clock, keeping the learned baseline."""
+        self._last_count = count
+        self._last_ingest = self._last_sample = now
+        self.stalled = False
+
+    def async_sample(self, source: str, now: float, count: int) -> StallEvent | None:
+        """
+        Fold in the cumulative advertisement count seen at ``now``.
+
+        Returns a :class:`StallEvent` when the proxy first goes quiet for
+        longer than :attr:`threshold`; later samples of the same stall
+        return ``None`` until advertisements flow again.
+        """
+        if self._last_count is None:
+            self.async_reset(now, count)
+            return None
+        elapsed = now - self._last_sample
+        self._last_sample = now
+        if count != self._last_count:
+            if elapsed > 0:
+                rate = (count - self._last_count) / elapsed
+                if self.baseline_rate:
+                    self.baseline_rate += (rate - self.baseline_rate) * (
+                        _BASELINE_SMOOTHING
+                    )
+                else:
+                    self.baseline_rate = rate
+                self.observed += elapsed
+            self._last_count = count
+            self._last_ingest = now
+            self.stalled = False
+            return None
+        gap = now - self._last_ingest
+        if self.stalled or self.observed < self.warmup or gap < self.threshold:
+            return None
+        self.stalled = True
+        self.stalls += 1
+        return StallEvent(source, gap, self.baseline_rate, self.threshold)
@@ -0,0 +1,68 @@
+"""Identical-payload suppression for esphome raw advertisements."""
+
+from __future__ import annotations
+
+from lru import LRU  # pylint: disable=no-name-in-module
+
+DEFAULT_SUPPRESSION_WINDOW = 1.0
+DEFAULT_RSSI_THRESHOLD = 6
+DEFAULT_MAX_SUPPRESSION_ADDRESSES = 4096
+
+
+class PayloadSuppressor:
+    """
+    Drop repeats of an address's last forwarded payload within a window.
+
+    Beacons repeat byte-identical payloads several times a second and
+    only the RSSI moves. An advertisement is suppressed when its payload
+    matches the last one forwarded for the same address, less than
+    ``window`` seconds have passed since that forward, and the RSSI has
+    moved by at most ``rssi_threshold`` dB. Anything else is forwarded
+    and becomes the new reference, so a device is still refreshed at
+    least once per window.
+
+    The per-address table is an LRU bounded by ``max_addresses``; an
+    evicted address simply has its next advertisement forwarded.
+    """
+
+    __slots__ = ("_last", "passed", "rssi_threshold", "suppressed", "window")
+
+    def __init__(
+        self,
+        window: float = DEFAULT_SUPPRESSION_WINDOW,
+        rssi_threshold: int = DEFAULT_RSSI_THRESHOLD,
+        max_addresses: int = DEFAULT_MAX_SUPPRESSION_ADDRESSES,
+    ) -> None:
+        if window <= 0:
+            raise ValueError(f"Suppression window must be positive, got {window}")
+        if rssi_threshold < 0:
+            raise ValueError(
+                f"RSSI threshold must not be negative, got {rssi_threshold}"
+            )
+        if max_addresses < 1:
+            raise ValueError(
+                f"Suppression table size must be positive, got {max_addresses}"
+            )
+        self.window = window
+        self.rssi_threshold = rssi_threshold
+        self.passed = 0
+        self.suppressed = 0
+        self._last: LRU[int, tuple[bytes, int, float]] = LRU(max_addresses)
+
+    def should_forward(self, address: int, rssi: int, data: bytes, now: float) -> bool:
+        """Return True if the advertisement should be forwarded."""
+        if (
+            (last := self._last.get(address)) is not None
+            and now - last[2] < self.window
+            and last[0] == data
+            and -self.rssi_threshold <= rssi - last[1] <= self.rssi_threshold
+        ):
+            self.suppressed += 1
+            return False
+        self._last[address] = (data, rssi, now)
+        self.passed += 1
+        return True
+
+    def clear(self) -> None:
+        """Forget every address so the next advertisement of each passes."""
+        self._last.clear()
@@ -0,0 +1,104 @@
+"""Thread-safe shared state for free-threaded Python builds."""
+
+from __future__ import annotations
+
+import sys
+import threading
+from collections.abc import Iterator, MutableMapping
+from typing import TypeVar, overload
+
+from lru import LRU  # pylint: disable=no-name-in-module
+
+_K = TypeVar("_K")
+_V = TypeVar("_V")
+_T = TypeVar("_T")
+
+# True on a free-threaded (no-GIL) interpreter with the GIL actually off.
+# lru-dict does not declare free-threading support, so importing it turns
+# the GIL back on unless the process runs with ``PYTHON_GIL=0``.
+FREE_THREADED: bool = not getattr(sys, "_is_gil_enabled", lambda: True)()
+
+
+class LockedLRU(MutableMapping[_K, _V]):
+    """
+    An ``LRU`` whose every operation holds a lock.
+
+    With the GIL each ``LRU`` call is already atomic; without it two
+    threads may race inside the C extension. State shared across
+    threads (the address intern table, the GATT caches) switches to this
+    wrapper on free-threaded builds. The lock is a plain mutex, so keep
+    work under it to the single ``LRU`` call. Iteration walks a snapshot
+    of the keys.
+    """
+
+    __slots__ = ("_lock", "_lru")
+
+    def __init__(self, size: int) -> None:
+        self._lru: LRU[_K, _V] = LRU(size)
+        self._lock = threading.Lock()
+
+    def __getitem__(self, key: _K) -> _V:
+        """Return the value for ``key`` and mark it recently used."""
+        with self._lock:
+            return self._lru[key]
+
+    def __setitem__(self, key: _K, value: _V) -> None:
+        """Store ``value``, evicting the least recently used entry if full."""
+        with self._lock:
+            self._lru[key] = value
+
+    def __delitem__(self, key: _K) -> None:
+        """Remove ``key``."""
+        with self._lock:
+            del self._lru[key]
+
+    def __contains__(self, key: object) -> bool:
+        """Return True if ``key`` is cached."""
+        with self._lock:
+            return key in self._lru
+
+    def __iter__(self) -> Iterator[_K]:
+        """Iterate a snapshot of the keys, most recently used first."""
+        with self._lock:
+            return iter(self._lru.keys())
+
+    def __len__(self) -> int:
+        """Return the number of entries."""
+        with self._lock:
+            return len(self._lru)
+
+    @overload
+    def get(self, key: _K, /) -> _V | None: ...
+
+    @overload
+    def get(self, key: _K, default: _V | _T, /) -> _V | _T: ...
+
+    def get(self, key: _K, default: object = None, /) -> object:
+        """Return the value for ``key`` and mark it recently used."""
+        with self._lock:
+            return self._lru.get(key, default)
+
+    def pop(self, key: _K, default: object = None, /) -> object:  # type: ignore[override]
+        """Remove ``key`` and return its value, or ``default``."""
+        with self._lock:
+            return self._lru.pop(key, default)
+
+    def clear(self) -> None:
+        """Remove every entry."""
+        with self._lock:
+            self._lru.clear()
+
+    def get_size(self) -> int:
+        """Return the capacity."""
+        with self._lock:
+            return self._lru.get_size()
+
+    def set_size(self, size: int) -> None:
+        """Change the capacity, evicting least recently used entries."""
+        with self._lock:
+            self._lru.set_size(size)
+
+    def get_stats(self) -> tuple[int, int]:
+        """Return the ``(hits, misses)`` counters."""
+        with self._lock:
+            return self._lru.get_stats()
@@ -0,0 +1,234 @@
+"""Off-loop worker thread for esphome raw advertisement ingestion."""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import os
+import queue
+import threading
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from .batch import RawAdvertisementBatch
+    from .scanner import ESPHomeScanner
+
+_LOGGER = logging.getLogger(__name__)
+
+DEFAULT_MAX_PENDING_BATCHES = 1024
+
+# Upper bound on batches handed back to the loop in one callback so a
+# backlog cannot turn into one long loop stall.
+MAX_CHUNK_BATCHES = 64
+
+_STOP = object()
+
+
+class IngestWorker:
+    """
+    Convert raw advertisement batches on a worker thread.
+
+    Bind to one or more scanners with
+    :meth:`ESPHomeScanner.set_ingest_worker`. The scanner then only
+    enqueues each protobuf batch; the worker thread interns the
+    addresses and runs the scanner's filter and suppression stages, and
+    the surviving :class:`RawAdvertisementBatch` objects are handed back
+    to the event loop in coalesced chunks, one loop callback per chunk.
+    Load shedding and delivery to habluetooth stay on the loop.
+
+    One thread serves every bound scanner, so a scanner's stages never
+    run concurrently and its batches keep their order. When more than
+    ``max_pending`` batches are waiting, new ones are dropped and counted
+    in ``dropped`` rather than letting the backlog grow without bound.
+    """
+
+    __slots__ = (
+        "_loop",
+        "_queue",
+        "_thread",
+        "batches",
+        "chunks",
+        "dropped",
+    )
+
+    def __init__(self, max_pending: int = DEFAULT_MAX_PENDING_BATCHES) -> None:
+        if max_pending < 1:
+            raise ValueError(f"Pending batch limit must be positive, got {max_pending}")
+        self._queue: queue.Queue[Any] = queue.Queue(max_pending)
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._thread: threading.Thread | None = None
+        self.batches = 0
+        self.chunks = 0
+        self.dropped = 0
+
+    @property
+    def running(self) -> bool:
+        """Whether the worker thread is accepting batches."""
+        return self._thread is not None
+
+    def async_start(self) -> None:
+        """Start the worker thread, delivering results to the running loop."""
+        if self._thread is not None:
+            raise RuntimeError("Ingest worker is already running")
+        self._loop = asyncio.get_running_loop()
+        self._thread = threading.Thread(
+            target=self._run, name="bleak-esphome-ingest", daemon=True
+        )
+        self._thread.start()
+
+    async def stop(self) -> None:
+        """
+        Stop the worker thread once the batches already queued are done.
+
+        The thread is signalled and joined from the default executor, so
+        the loop keeps running, and delivering, while it winds down.
+        Batches keep queuing until the thread has joined; those queued
+        behind the stop marker are then converted on the loop, so each
+        scanner's batches keep their order and its stages never run on
+        two threads at once. Results not yet delivered when the loop
+        stops are discarded.
+        """
+        if (thread := self._thread) is None:
+            return
+        await asyncio.get_running_loop().run_in_executor(
+            None, self._stop_thread, thread
+        )
+        self._thread = None
+        get_nowait = self._queue.get_nowait
+        while True:
+            try:
+                job = get_nowait()
+            except queue.Empty:
+                return
+            if job is _STOP:
+                continue
+            scanner, advertisements, now = job
+            try:
+                scanner._async_forward_raw_batch(
+                    *scanner._build_raw_batch(advertisements, now)
+                )
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: Error converting advertisements", scanner.name)
+
+    def _stop_thread(self, thread: threading.Thread) -> None:
+        """Queue the stop marker behind any backlog and wait for ``thread``."""
+        self._queue.put(_STOP)
+        thread.join()
+
+    def submit(self, scanner: ESPHomeScanner, advertisements: Any, now: float) -> bool:
+        """
+        Queue a repeated ``BluetoothLERawAdvertisement`` field for conversion.
+
+        The field must not be touched by the caller afterwards. Returns
+        False when the worker is not running so the caller can ingest the
+        batch itself.
+        """
+        if self._thread is None:
+            return False
+        try:
+            self._queue.put_nowait((scanner, advertisements, now))
+        except queue.Full:
+            self.dropped += 1
+        return True
+
+    def _run(self) -> None:
+        """Convert queued batches and hand them back to the loop."""
+        get = self._queue.get
+        get_nowait = self._queue.get_nowait
+        while True:
+            job = get()
+            results: list[tuple[ESPHomeScanner, RawAdvertisementBatch, int]] = []
+            stop = False
+            while True:
+                if job is _STOP:
+                    stop = True
+                    break
+                scanner, advertisements, now = job
+                try:
+                    batch, received = scanner._build_raw_batch(advertisements, now)
+                except Exception:  # pylint: disable=broad-except
+                    _LOGGER.exception(
+                        "%s: Error converting advertisements", scanner.name
+                    )
+                else:
+                    # Sent back even when empty: the byte count is
+                    # recorded on the loop, not on this thread.
+                    results.append((scanner, batch, received))
+                if len(results) >= MAX_CHUNK_BATCHES:
+                    break
+                try:
+                    job = get_nowait()
+                except queue.Empty:
+                    break
+            if results:
+                self._hand_back(results)
+            if stop:
+                return
+
+    def _hand_back(
+        self, results: list[tuple[ESPHomeScanner, RawAdvertisementBatch, int]]
+    ) -> None:
+        """Schedule one loop callback delivering ``results``."""
+        if TYPE_CHECKING:
+            assert self._loop is not None
+        try:
+            self._loop.call_soon_threadsafe(self._async_deliver, results)
+        except RuntimeError:
+            # The loop has been closed under us; nothing left to feed.
+            _LOGGER.debug("Event loop closed; dropping %s batches", len(results))
+
+    def _async_deliver(
+        self, results: list[tuple[ESPHomeScanner, RawAdvertisementBatch, int]]
+    ) -> None:
+        """Forward a chunk of converted batches on the loop."""
+        self.chunks += 1
+        for scanner, batch, received in results:
+            if batch.addresses:
+                self.batches += 1
+            try:
+                scanner._async_forward_raw_batch(batch, received)
+            except Exception:  # pylint: disable=broad-except
+                _LOGGER.exception("%s: Error forwarding advertisements", scanner.name)
+
+
+class IngestWorkerPool:
+    """
+    Spread scanners over several :class:`IngestWorker` threads.
+
+    :meth:`bind` pins each scanner to one worker, round robin, so a
+    proxy's stages still run on one thread at a time and its batches
+    keep their order while different proxies convert in parallel. Do not
+    share a filter or suppressor between scanners bound to different
+    workers. The workers only run truly in parallel on a free-threaded
+    build; with the GIL they take turns and a single worker does as well.
+    """
+
+    __slots__ = ("_next", "workers")
+
+    def __init__(
+        self,
+        threads: int | None = None,
+        max_pending: int = DEFAULT_MAX_PENDING_BATCHES,
+    ) -> None:
+        if threads is None:
+            threads = os.cpu_count() or 1
+        if threads < 1:
+            raise ValueError(f"Worker thread count must be positive, got {threads}")
+        self.workers = tuple(IngestWorker(max_pending) for _ in range(threads))
+        self._next = 0
+
+    def async_start(self) -> None:
+        """Start every worker thread."""
+        for worker in self.workers:
+            worker.async_start()
+
+    async def stop(self) -> None:
+        """Stop every worker thread; see :meth:`IngestWorker.stop`."""
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+
+    def bind(self, scanner: ESPHomeScanner) -> IngestWorker:
+        """Pin ``scanner`` to the next worker and return that worker."""
+        worker = self.workers[self._next % len(self.workers)]
+        self._next += 1
+        scanner.set_ingest_worker(worker)
+        return worker
@@ -18,18 +18,17 @@ _LOGGER = logging.getLogger(__name__)
 
 def _can_connect(bluetooth_device: ESPHomeBluetoothDevice, source: str) -> bool:
     """Check if a given source can make another connection."""
-    can_connect = bool(
-        bluetooth_device.available and bluetooth_device.ble_connections_free
-    )
+    can_connect = bool(bluetooth_device.available and bluetooth_device.unleased_slots)
     _LOGGER.debug(
         (
             "%s [%s]: Checking can connect, available=%s, ble_connections_free=%s"
-            " result=%s"
+            " slot_leases=%s result=%s"
         ),
         bluetooth_device.name,
         source,
         bluetooth_device.available,
         bluetooth_device.ble_connections_free,
+        bluetooth_device.slot_leases,
         can_connect,
     )
     return can_connect
@@ -93,6 +92,8 @@ def connect_scanner(
     # but we never unsubscribe so we don't care about the return value: the
     # underlying APIClient connection owns these subscriptions and tears them
     # all down when it disconnects, so no per-subscription cleanup is needed.
+    # The one exception is the advertisement subscription, whose callback the
+    # scanner keeps so callers can pause it on connection-only proxies.
 
     if connectable:
         # If its connectable be sure not to register the scanner
@@ -114,7 +115,7 @@ def connect_scanner(
             cli.subscribe_bluetooth_le_raw_advertisements,
             scanner.async_on_raw_advertisements,
         )
-        subscribe()
+        scanner.set_advertisement_subscription(subscribe, subscribe())
         if feature_flags & BluetoothProxyFeature.FEATURE_STATE_AND_MODE:
             # The device only allows one advertisement subscriber at a time
             # and silently rejects the request when a stale connection from a
@@ -125,6 +126,9 @@ def connect_scanner(
             # handler set dedupes it and only the request is re-sent.
             scanner.set_resubscribe_advertisements(subscribe)
     else:
-        cli.subscribe_bluetooth_le_advertisements(scanner.async_on_advertisement)
+        subscribe = partial(
+            cli.subscribe_bluetooth_le_advertisements, scanner.async_on_advertisement
+        )
+        scanner.set_advertisement_subscription(subscribe, subscribe())
 
     return client_data
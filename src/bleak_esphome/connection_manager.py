@@ -15,6 +15,7 @@ if TYPE_CHECKING:
     from collections.abc import Callable
 
     from .backend.device import ESPHomeBluetoothDevice
+    from .backend.stall import StallEvent
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -33,7 +34,9 @@ class ESPHomeDeviceConfig(TypedDict):
 class APIConnectionManager:
     """Manager for the API connection to an ESPHome device."""
 
-    def __init__(self, config: ESPHomeDeviceConfig) -> None:
+    def __init__(
+        self, config: ESPHomeDeviceConfig, reconnect_on_stall: bool = False
+    ) -> None:
         """
         Initialize the API connection manager.
 
@@ -41,6 +44,11 @@ class APIConnectionManager:
         loop. The ``APIClient`` / ``ReconnectLogic`` instances and the start
         future are created in :meth:`start` so the manager can be constructed
         synchronously outside an async context.
+
+        With ``reconnect_on_stall`` each session's scanner is watched for
+        stalls (advertisements stopping while the API link stays up), and
+        a stall drops the connection so ``ReconnectLogic`` dials the proxy
+        again instead of waiting for the keepalive to notice.
         """
         self._address = config["address"]
         self._noise_psk = config["noise_psk"]
@@ -51,6 +59,9 @@ class APIConnectionManager:
         self._disconnect_callbacks: set[Callable[[], None]] | None = None
         self._bluetooth_device: ESPHomeBluetoothDevice | None = None
         self._start_future: asyncio.Future[None] | None = None
+        self._reconnect_on_stall = reconnect_on_stall
+        self._unwatch_stalls: Callable[[], None] | None = None
+        self._stall_reconnect_task: asyncio.Task[None] | None = None
 
     def _teardown_scanner(self) -> None:
         """Unset up and unregister the scanner if wired."""
@@ -58,6 +69,9 @@ class APIConnectionManager:
         unregister = self._unregister_scanner
         self._unsetup_scanner = None
         self._unregister_scanner = None
+        if (unwatch_stalls := self._unwatch_stalls) is not None:
+            self._unwatch_stalls = None
+            unwatch_stalls()
         try:
             if unsetup is not None:
                 unsetup()
@@ -131,6 +145,8 @@ class APIConnectionManager:
         scanner = client_data.scanner
         assert scanner is not None  # noqa: S101
         self._unsetup_scanner = scanner.async_setup()
+        if self._reconnect_on_stall:
+            self._unwatch_stalls = scanner.async_watch_for_stalls(self._on_stall)
         self._unregister_scanner = habluetooth.get_manager().async_register_scanner(
             scanner
         )
@@ -139,6 +155,24 @@ class APIConnectionManager:
         if self._start_future is not None and not self._start_future.done():
             self._start_future.set_result(None)
 
+    def _on_stall(self, event: StallEvent) -> None:
+        """Drop the API connection of a stalled proxy to force a reconnect."""
+        if self._cli is None or (
+            self._stall_reconnect_task is not None
+            and not self._stall_reconnect_task.done()
+        ):
+            return
+        _LOGGER.warning(
+            "%s: Reconnecting to the proxy after %.0fs without advertisements",
+            self._address,
+            event.gap,
+        )
+        # ReconnectLogic tears the session down through _on_disconnect and
+        # dials again after its short expected-disconnect cooldown.
+        self._stall_reconnect_task = asyncio.get_running_loop().create_task(
+            self._cli.disconnect(force=True)
+        )
+
     async def start(self) -> None:
         """
         Start the API connection and wait for the first successful connect.
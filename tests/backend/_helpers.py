@@ -5,12 +5,14 @@ from __future__ import annotations
 import asyncio
 from contextlib import contextmanager
 from typing import TYPE_CHECKING, Any
-from unittest.mock import Mock, patch
+from unittest.mock import MagicMock, Mock, patch
 
 from bleak import BleakClient
 from bleak.backends.device import BLEDevice
+from habluetooth import HaBluetoothConnector
 
 from bleak_esphome.backend.client import ESPHomeClient, ESPHomeClientData
+from bleak_esphome.backend.scanner import ESPHomeScanner
 
 from .. import generate_ble_device
 
@@ -19,6 +21,7 @@ if TYPE_CHECKING:
 
     from aioesphomeapi import ESPHomeBluetoothGATTServices
     from bleak.backends.service import BleakGATTServiceCollection
+    from habluetooth import BluetoothScanningMode
 
 ESP_MAC_ADDRESS = "AA:BB:CC:DD:EE:FF"
 ESP_NAME = "proxy"
@@ -33,6 +36,27 @@ def make_ble_device() -> BLEDevice:
     )
 
 
+def make_scanner(
+    source: str = ESP_MAC_ADDRESS,
+    mode: BluetoothScanningMode | None = None,
+    *,
+    name: str = ESP_NAME,
+    mock_client: bool = False,
+) -> ESPHomeScanner:
+    """
+    Build a connectable ``ESPHomeScanner`` for the proxy ``source``.
+
+    With ``mock_client`` the scanner is bound to a ``MagicMock`` API
+    client, so mode switches can be asserted on its
+    ``bluetooth_scanner_set_mode``.
+    """
+    connector = HaBluetoothConnector(ESPHomeClientData, source, lambda: True)
+    scanner = ESPHomeScanner(source, name, connector, True, mode)
+    if mock_client:
+        scanner.set_client(MagicMock())
+    return scanner
+
+
 def _make_client_backend(
     client_data: ESPHomeClientData,
 ) -> type[ESPHomeClient]:
@@ -0,0 +1,388 @@
+"""
+Multi-proxy ingest load profiles and runner for ``tests/backend``.
+
+A profile is a time-ordered schedule of proxy batches. The runner pushes
+it through one ``ESPHomeScanner`` per proxy as fast as the host allows
+and reports sustained throughput, per-batch latency and peak memory, so
+the headroom over the profile's real arrival rate is visible. Print the
+reports for the built-in profiles with ``python -m tests.backend._load``.
+
+The parallel helpers shard proxies over threads and run the off-loop
+conversion stage (``IngestWorker``'s share of the work) on each shard, to
+show how ingest scales with cores on free-threaded builds.
+"""
+
+from __future__ import annotations
+
+import random
+import statistics
+import tracemalloc
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from time import perf_counter
+from typing import TYPE_CHECKING, Any
+
+from aioesphomeapi import (
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+from habluetooth import HaBluetoothConnector
+
+from bleak_esphome.backend.capture import read_capture
+from bleak_esphome.backend.client import ESPHomeClientData
+from bleak_esphome.backend.scanner import ESPHomeScanner
+from bleak_esphome.backend.threadsafe import FREE_THREADED
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from os import PathLike
+
+# ESPHome proxies flush their raw advertisement buffer about every 100ms.
+BATCH_INTERVAL = 0.1
+# And cap a batch at this many advertisements.
+MAX_BATCH_SIZE = 16
+
+_BASE_PROXY_ADDRESS = 0x0A0000000000
+_BASE_DEVICE_ADDRESS = 0xC00000000000
+
+
+@dataclass(slots=True)
+class LoadProfile:
+    """A schedule of ``(time, source, batch)`` events across proxies."""
+
+    name: str
+    sources: list[str]
+    events: list[tuple[float, str, BluetoothLERawAdvertisementsResponse]]
+    duration: float
+
+    @property
+    def advertisements(self) -> int:
+        """Total advertisements in the schedule."""
+        return sum(len(batch.advertisements) for _, _, batch in self.events)
+
+    @property
+    def arrival_rate(self) -> float:
+        """Advertisements per second the real fleet would deliver."""
+        return self.advertisements / self.duration
+
+
+@dataclass(frozen=True, slots=True)
+class LoadReport:
+    """Result of pushing a profile through its scanners."""
+
+    profile: str
+    proxies: int
+    batches: int
+    advertisements: int
+    arrival_rate: float
+    ads_per_second: float
+    p50_batch_us: float
+    p99_batch_us: float
+    peak_memory_bytes: int
+
+    @property
+    def headroom(self) -> float:
+        """Sustained throughput as a multiple of the arrival rate."""
+        return self.ads_per_second / self.arrival_rate
+
+
+def _source(index: int) -> str:
+    """Return a proxy source MAC for ``index``."""
+    value = f"{_BASE_PROXY_ADDRESS + index:012X}"
+    return ":".join(value[i : i + 2] for i in range(0, 12, 2))
+
+
+def _device_payload(rng: random.Random, device: int) -> bytes:
+    """Return a plausible payload for a device, by a device-type mix."""
+    kind = device % 4
+    if kind == 0:
+        # Apple continuity: flags + manufacturer data.
+        return bytes.fromhex("02011a0aff4c001005") + rng.randbytes(4)
+    if kind == 1:
+        # BTHome-style service data.
+        return (
+            bytes.fromhex("020106")
+            + bytes((9, 0x16, 0xD2, 0xFC, 0x40))
+            + rng.randbytes(5)
+        )
+    if kind == 2:
+        # iBeacon.
+        return bytes.fromhex("0201061aff4c000215") + rng.randbytes(21)
+    # Vendor sensor with a name.
+    return (
+        bytes.fromhex("0201060709")
+        + b"sensor"
+        + bytes.fromhex("05ff88ec")
+        + rng.randbytes(2)
+    )
+
+
+def _batch_events(
+    name: str,
+    proxies: int,
+    heard: list[list[tuple[int, int, bytes, int]]],
+    duration: float,
+    advertise_interval: float,
+    rng: random.Random,
+    change_probability: float,
+) -> LoadProfile:
+    """Turn per-proxy device lists into batched arrival events."""
+    sources = [_source(index) for index in range(proxies)]
+    events: list[tuple[float, str, BluetoothLERawAdvertisementsResponse]] = []
+    ticks = round(duration / BATCH_INTERVAL)
+    ticks_per_interval = max(1, round(advertise_interval / BATCH_INTERVAL))
+    for proxy, devices in enumerate(heard):
+        offset = rng.random() * BATCH_INTERVAL
+        payloads = {address: payload for address, _, payload, _ in devices}
+        for tick in range(ticks):
+            # Each device advertises once per interval, spread over ticks.
+            due = [d for d in devices if not (d[3] + tick) % ticks_per_interval]
+            for start in range(0, len(due), MAX_BATCH_SIZE):
+                chunk = due[start : start + MAX_BATCH_SIZE]
+                advertisements = []
+                for address, address_type, _, _ in chunk:
+                    if rng.random() < change_probability:
+                        payloads[address] = payloads[address][:-1] + rng.randbytes(1)
+                    advertisements.append(
+                        BluetoothLERawAdvertisement(
+                            address=address,
+                            address_type=address_type,
+                            rssi=-40 - rng.randrange(60),
+                            data=payloads[address],
+                        )
+                    )
+                events.append(
+                    (
+                        tick * BATCH_INTERVAL + offset,
+                        sources[proxy],
+                        BluetoothLERawAdvertisementsResponse(
+                            advertisements=advertisements
+                        ),
+                    )
+                )
+    events.sort(key=lambda event: event[0])
+    return LoadProfile(name, sources, events, duration)
+
+
+def fleet_profile(
+    proxies: int = 50,
+    devices: int = 3000,
+    duration: float = 1.0,
+    proxies_per_device: int = 3,
+    advertise_interval: float = 1.0,
+    seed: int = 0,
+) -> LoadProfile:
+    """
+    Build a fleet where every device is heard by a few nearby proxies.
+
+    Each device advertises once per ``advertise_interval`` and about one
+    advertisement in five carries a changed payload.
+    """
+    rng = random.Random(seed)  # noqa: S311 - reproducible load data
+    ticks_per_interval = max(1, round(advertise_interval / BATCH_INTERVAL))
+    heard: list[list[tuple[int, int, bytes, int]]] = [[] for _ in range(proxies)]
+    for device in range(devices):
+        entry = (
+            _BASE_DEVICE_ADDRESS + device,
+            device & 1,
+            _device_payload(rng, device),
+            rng.randrange(ticks_per_interval),
+        )
+        for proxy in rng.sample(range(proxies), min(proxies_per_device, proxies)):
+            heard[proxy].append(entry)
+    return _batch_events(
+        f"fleet-{proxies}x{devices}",
+        proxies,
+        heard,
+        duration,
+        advertise_interval,
+        rng,
+        0.2,
+    )
+
+
+def beacon_flood_profile(
+    proxies: int = 4,
+    beacons: int = 500,
+    duration: float = 1.0,
+    advertise_interval: float = 0.1,
+    seed: int = 0,
+) -> LoadProfile:
+    """Build a beacon-dense space: fast, byte-identical repeats everywhere."""
+    rng = random.Random(seed)  # noqa: S311 - reproducible load data
+    entries = [
+        (
+            _BASE_DEVICE_ADDRESS + beacon,
+            1,
+            bytes.fromhex("0201061aff4c000215") + rng.randbytes(21),
+            0,
+        )
+        for beacon in range(beacons)
+    ]
+    return _batch_events(
+        f"beacon-flood-{proxies}x{beacons}",
+        proxies,
+        [entries] * proxies,
+        duration,
+        advertise_interval,
+        rng,
+        0.0,
+    )
+
+
+def capture_profile(path: str | PathLike[str]) -> LoadProfile:
+    """Build a profile from a capture written by ``AdvertisementRecorder``."""
+    events = [
+        (batch.time, batch.source, batch.response) for batch in read_capture(path)
+    ]
+    if not events:
+        raise ValueError(f"{path} contains no batches")
+    start = events[0][0]
+    events = [(time - start, source, batch) for time, source, batch in events]
+    sources = sorted({source for _, source, _ in events})
+    # A single-batch capture still spans one flush interval.
+    duration = max(events[-1][0], BATCH_INTERVAL)
+    return LoadProfile(str(path), sources, events, duration)
+
+
+def make_scanners(
+    profile: LoadProfile,
+    configure: Callable[[ESPHomeScanner], None] | None = None,
+) -> dict[str, ESPHomeScanner]:
+    """Build one scanner per proxy in ``profile``."""
+    scanners: dict[str, ESPHomeScanner] = {}
+    for source in profile.sources:
+        connector = HaBluetoothConnector(ESPHomeClientData, source, lambda: True)
+        scanner = ESPHomeScanner(source, source, connector, True)
+        if configure is not None:
+            configure(scanner)
+        scanners[source] = scanner
+    return scanners
+
+
+def replay(profile: LoadProfile, scanners: dict[str, ESPHomeScanner]) -> None:
+    """Push every batch of ``profile`` without latency bookkeeping."""
+    for _, source, batch in profile.events:
+        scanners[source].async_on_raw_advertisements(batch)
+
+
+def run_load(
+    profile: LoadProfile,
+    configure: Callable[[ESPHomeScanner], None] | None = None,
+    trace_memory: bool = True,
+) -> LoadReport:
+    """
+    Push ``profile`` through fresh scanners and measure it.
+
+    Tracing allocations slows every one of them down, so the peak memory
+    is measured in a second, untimed pass through another set of fresh
+    scanners.
+    """
+    scanners = make_scanners(profile, configure)
+    latencies: list[float] = []
+    started = perf_counter()
+    for _, source, batch in profile.events:
+        batch_started = perf_counter()
+        scanners[source].async_on_raw_advertisements(batch)
+        latencies.append(perf_counter() - batch_started)
+    elapsed = perf_counter() - started
+    peak = _peak_memory(profile, configure) if trace_memory else 0
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p99 = cuts[49], cuts[98]
+    else:
+        p50 = p99 = latencies[0]
+    advertisements = profile.advertisements
+    return LoadReport(
+        profile.name,
+        len(scanners),
+        len(profile.events),
+        advertisements,
+        profile.arrival_rate,
+        advertisements / elapsed,
+        p50 * 1e6,
+        p99 * 1e6,
+        peak,
+    )
+
+
+def _peak_memory(
+    profile: LoadProfile, configure: Callable[[ESPHomeScanner], None] | None
+) -> int:
+    """Return the peak bytes allocated replaying ``profile`` from scratch."""
+    scanners = make_scanners(profile, configure)
+    tracemalloc.start()
+    try:
+        replay(profile, scanners)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def shard_events(
+    profile: LoadProfile, scanners: dict[str, ESPHomeScanner], threads: int
+) -> list[list[tuple[ESPHomeScanner, Any]]]:
+    """Split the schedule by proxy into ``threads`` per-thread shards."""
+    shard_of = {source: i % threads for i, source in enumerate(profile.sources)}
+    shards: list[list[tuple[ESPHomeScanner, Any]]] = [[] for _ in range(threads)]
+    for _, source, batch in profile.events:
+        shards[shard_of[source]].append((scanners[source], batch.advertisements))
+    return shards
+
+
+def _convert_shard(shard: list[tuple[ESPHomeScanner, Any]]) -> None:
+    """Run the off-loop conversion stage over one shard."""
+    for scanner, advertisements in shard:
+        scanner._build_raw_batch(advertisements, 0.0)
+
+
+def convert_in_parallel(
+    executor: ThreadPoolExecutor, shards: list[list[tuple[ESPHomeScanner, Any]]]
+) -> None:
+    """Convert every shard, one per executor thread, and wait for all."""
+    for _ in executor.map(_convert_shard, shards):
+        pass
+
+
+def run_parallel_conversion(profile: LoadProfile, threads: int) -> float:
+    """Return advertisements per second converted on ``threads`` threads."""
+    scanners = make_scanners(profile)
+    shards = shard_events(profile, scanners, threads)
+    with ThreadPoolExecutor(threads) as executor:
+        # Warm the intern table so every run measures the steady state.
+        convert_in_parallel(executor, shards)
+        started = perf_counter()
+        convert_in_parallel(executor, shards)
+        elapsed = perf_counter() - started
+    return profile.advertisements / elapsed
+
+
+def _main() -> None:
+    """Print reports for the built-in profiles."""
+    # Standalone runs need the process-wide manager the test suite's
+    # conftest normally installs.
+    from bleak_retry_connector import BleakSlotManager  # noqa: PLC0415
+    from habluetooth import BluetoothManager, set_manager  # noqa: PLC0415
+
+    from tests.conftest import FakeBluetoothAdapters  # noqa: PLC0415
+
+    set_manager(BluetoothManager(FakeBluetoothAdapters(), BleakSlotManager()))
+    for profile in (fleet_profile(duration=5.0), beacon_flood_profile(duration=5.0)):
+        report = run_load(profile)
+        print(
+            f"{report.profile}: {report.advertisements} ads in {report.batches}"
+            f" batches, {report.ads_per_second:,.0f} ads/s sustained"
+            f" ({report.headroom:.1f}x arrival), p50 {report.p50_batch_us:.0f}us"
+            f" p99 {report.p99_batch_us:.0f}us,"
+            f" peak {report.peak_memory_bytes / 1024:,.0f} KiB"
+        )
+    fleet = fleet_profile(duration=5.0)
+    single = run_parallel_conversion(fleet, 1)
+    print(f"off-loop conversion, free-threaded={FREE_THREADED}:")
+    for threads in (1, 2, 4, 8):
+        rate = single if threads == 1 else run_parallel_conversion(fleet, threads)
+        print(f"  {threads} threads: {rate:,.0f} ads/s ({rate / single:.2f}x)")
+
+
+if __name__ == "__main__":
+    _main()
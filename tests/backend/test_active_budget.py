@@ -0,0 +1,182 @@
+import asyncio
+from functools import partial
+from unittest.mock import MagicMock
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+    BluetoothScannerMode,
+)
+from bluetooth_data_tools import int_to_bluetooth_address
+
+from bleak_esphome.backend import active_budget as active_budget_module
+from bleak_esphome.backend.active_budget import ActiveScanBudget
+from bleak_esphome.backend.scanner import ESPHomeScanner
+
+from ._helpers import make_scanner
+
+WANTED = 261602360644300
+
+_make_scanner = partial(make_scanner, mock_client=True)
+
+
+def _set_mode(scanner: ESPHomeScanner) -> MagicMock:
+    """Return the mocked ``bluetooth_scanner_set_mode`` of ``scanner``."""
+    return scanner._client.bluetooth_scanner_set_mode
+
+
+def _hear(scanner: ESPHomeScanner, address: int) -> None:
+    """Feed ``scanner`` one advertisement from ``address``."""
+    scanner.async_on_raw_advertisements(
+        BluetoothLERawAdvertisementsResponse(
+            advertisements=[
+                BluetoothLERawAdvertisement(
+                    address=address, rssi=-60, address_type=1, data=b"\x02\x01\x06"
+                )
+            ]
+        )
+    )
+
+
+async def _open_window(scanner: ESPHomeScanner) -> asyncio.Task[bool]:
+    """Open a long window on ``scanner`` and wait until the proxy flipped."""
+    task = asyncio.create_task(scanner.async_request_active_window(3600.0))
+    while not _set_mode(scanner).called:
+        await asyncio.sleep(0)
+    return task
+
+
+async def _close_window(task: asyncio.Task[bool]) -> None:
+    task.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await task
+
+
+@pytest.mark.asyncio
+async def test_budget_caps_concurrent_windows() -> None:
+    """Past ``max_active`` open windows further requests are refused."""
+    budget = ActiveScanBudget(max_active=1)
+    first, second = _make_scanner("proxy-1"), _make_scanner("proxy-2")
+    first.set_active_scan_budget(budget)
+    second.set_active_scan_budget(budget)
+
+    task = await _open_window(first)
+    assert budget.active_sources == ["proxy-1"]
+    assert await second.async_request_active_window(1.0) is False
+    _set_mode(second).assert_not_called()
+    assert budget.denied == 1
+
+    await _close_window(task)
+    assert budget.active_sources == []
+    assert await second.async_request_active_window(0.0) is True
+    assert budget.granted == 2
+
+
+def test_budget_trims_then_refuses_past_seconds_per_minute() -> None:
+    """Windows are shortened to the remaining budget, then refused."""
+    budget = ActiveScanBudget(
+        max_active=3, active_seconds_per_minute=15.0, min_window=2.0
+    )
+    first, second, third = (_make_scanner(f"proxy-{i}") for i in range(3))
+    assert budget.async_request(first, 10.0) == 10.0
+    assert budget.async_request(second, 10.0) == 5.0
+    assert budget.trimmed == 1
+    assert budget.async_request(third, 10.0) is None
+    assert budget.async_used_seconds() == 15.0
+    # Releasing refunds the unused part of the grant.
+    budget.async_release(first)
+    assert budget.async_used_seconds() < 6.0
+    assert budget.async_extend(second, 3.0) == 3.0
+    assert budget.async_extend(third, 3.0) == 0.0
+
+
+def test_budget_prefers_best_coverage() -> None:
+    """A free slot is held for a waiting proxy that hears more wanted devices."""
+    budget = ActiveScanBudget(max_active=1)
+    near, far, other = (_make_scanner(s) for s in ("near", "far", "other"))
+    for scanner in (near, far, other):
+        scanner.set_active_scan_budget(budget)
+    _hear(near, WANTED)
+    budget.async_set_wanted_addresses([int_to_bluetooth_address(WANTED)])
+    assert budget.async_coverage(near) == 1
+    assert budget.async_coverage(far) == 0
+
+    # Until "near" is refused a window itself, it does not hold one back.
+    assert budget.async_request(other, 1.0) == 1.0
+    assert budget.async_request(near, 1.0) is None
+    budget.async_release(other)
+    assert budget.async_request(far, 1.0) is None
+    assert budget.async_request(near, 1.0) == 1.0
+    # Once it had its window, it no longer holds one back.
+    budget.async_release(near)
+    assert budget.async_request(far, 1.0) == 1.0
+    budget.async_release(far)
+
+    assert budget.async_request(other, 1.0) == 1.0
+    assert budget.async_request(near, 1.0) is None
+    budget.async_release(other)
+    near.set_active_scan_budget(None)
+    assert budget.async_request(far, 1.0) == 1.0
+
+
+def test_budget_stale_or_unslotted_refusals_hold_nothing(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Only a recent refusal for want of a slot holds one back."""
+    budget = ActiveScanBudget(
+        max_active=2, active_seconds_per_minute=10.0, min_window=2.0
+    )
+    near, far, other = (_make_scanner(s) for s in ("near", "far", "other"))
+    for scanner in (near, far, other):
+        scanner.set_active_scan_budget(budget)
+    _hear(near, WANTED)
+    budget.async_set_wanted_addresses([int_to_bluetooth_address(WANTED)])
+
+    # Refused for lack of seconds, with a slot free: nothing to wait for.
+    assert budget.async_request(other, 9.0) == 9.0
+    assert budget.async_request(near, 5.0) is None
+    budget.async_release(other)
+    assert budget.async_request(far, 0.5) == 0.5
+    budget.async_release(far)
+
+    # Refused for want of a slot, then idle past the pending timeout.
+    budget = ActiveScanBudget(max_active=1)
+    for scanner in (near, far, other):
+        scanner.set_active_scan_budget(budget)
+    budget.async_set_wanted_addresses([int_to_bluetooth_address(WANTED)])
+    assert budget.async_request(other, 1.0) == 1.0
+    assert budget.async_request(near, 1.0) is None
+    budget.async_release(other)
+    later = active_budget_module.MONOTONIC_TIME() + 61.0
+    monkeypatch.setattr(active_budget_module, "MONOTONIC_TIME", lambda: later)
+    assert budget.async_request(far, 1.0) == 1.0
+
+
+@pytest.mark.asyncio
+async def test_budget_charges_merged_extensions() -> None:
+    """Extending an open window draws from the same per-minute budget."""
+    budget = ActiveScanBudget(active_seconds_per_minute=0.05, min_window=0.0)
+    scanner = _make_scanner("proxy")
+    scanner.set_active_scan_budget(budget)
+    opener = asyncio.create_task(scanner.async_request_active_window(0.01))
+    await asyncio.sleep(0)
+    assert await asyncio.gather(
+        opener, scanner.async_request_active_window(3600.0)
+    ) == [True, True]
+    assert [c.args for c in _set_mode(scanner).call_args_list] == [
+        (BluetoothScannerMode.ACTIVE,),
+        (BluetoothScannerMode.PASSIVE,),
+    ]
+    assert budget.active_sources == []
+    assert budget.trimmed == 1
+
+
+def test_budget_rejects_bad_arguments() -> None:
+    """Out of range settings are refused."""
+    with pytest.raises(ValueError, match="Active proxy limit"):
+        ActiveScanBudget(max_active=0)
+    with pytest.raises(ValueError, match="Active seconds per minute"):
+        ActiveScanBudget(active_seconds_per_minute=0)
+    with pytest.raises(ValueError, match="Minimum window"):
+        ActiveScanBudget(active_seconds_per_minute=1.0, min_window=2.0)
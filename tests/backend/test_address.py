@@ -0,0 +1,74 @@
+from collections.abc import Iterator
+
+import pytest
+from bluetooth_data_tools import int_to_bluetooth_address
+
+from bleak_esphome.backend import address as address_module
+from bleak_esphome.backend.address import (
+    INTERNED_ADDRESSES,
+    MAX_INTERNED_ADDRESSES,
+    get_address_intern_stats,
+    intern_address,
+    intern_addresses,
+    set_address_intern_size,
+)
+from bleak_esphome.backend.threadsafe import FREE_THREADED, LockedLRU
+
+
+@pytest.fixture(autouse=True)
+def _restore_intern_size() -> Iterator[None]:
+    """Put the shared table back to its default size after each test."""
+    yield
+    set_address_intern_size(MAX_INTERNED_ADDRESSES)
+
+
+def test_intern_address_returns_same_object() -> None:
+    """Repeated lookups return the identical string object."""
+    first = intern_address(0x112233445566)
+    assert first == int_to_bluetooth_address(0x112233445566)
+    assert intern_address(0x112233445566) is first
+
+
+def test_intern_addresses_list() -> None:
+    """Converting a list reuses the interned entries."""
+    single = intern_address(0x1122334455AA)
+    assert intern_addresses([0x1122334455AA, 0x1122334455AB]) == [
+        single,
+        int_to_bluetooth_address(0x1122334455AB),
+    ]
+    assert intern_addresses([0x1122334455AA])[0] is single
+    assert intern_addresses([]) == []
+
+
+def test_intern_stats_count_hits_and_misses() -> None:
+    """Stats report a miss for a new address and a hit for a repeat."""
+    before = get_address_intern_stats()
+    intern_address(0xA1B2C3D4E5F6)
+    intern_address(0xA1B2C3D4E5F6)
+    after = get_address_intern_stats()
+    assert after.misses == before.misses + 1
+    assert after.hits == before.hits + 1
+    assert after.capacity == MAX_INTERNED_ADDRESSES
+    assert after.size == len(INTERNED_ADDRESSES)
+
+
+def test_set_address_intern_size_evicts_lru() -> None:
+    """Shrinking the table evicts least recently used addresses in place."""
+    table = address_module.INTERNED_ADDRESSES
+    intern_address(0x010000000001)
+    intern_address(0x010000000002)
+    set_address_intern_size(1)
+    assert address_module.INTERNED_ADDRESSES is table
+    assert get_address_intern_stats().capacity == 1
+    assert list(table.keys()) == [0x010000000002]
+
+
+def test_set_address_intern_size_rejects_non_positive() -> None:
+    """A zero or negative size is rejected."""
+    with pytest.raises(ValueError, match="must be positive"):
+        set_address_intern_size(0)
+
+
+def test_intern_table_locked_on_free_threaded_builds() -> None:
+    """Without the GIL the shared table guards every access with a lock."""
+    assert isinstance(INTERNED_ADDRESSES, LockedLRU) is FREE_THREADED
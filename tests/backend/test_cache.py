@@ -2,9 +2,12 @@
 
 from __future__ import annotations
 
+from concurrent.futures import ThreadPoolExecutor
+
 from bleak.backends.service import BleakGATTServiceCollection
 
 from bleak_esphome.backend.cache import MAX_CACHED_SERVICES, ESPHomeBluetoothCache
+from bleak_esphome.backend.threadsafe import FREE_THREADED, LockedLRU
 
 
 def test_get_gatt_services_cache_miss_returns_none() -> None:
@@ -118,3 +121,25 @@ def test_distinct_instances_have_isolated_state() -> None:
     cache_a.set_gatt_mtu_cache(1, 247)
     assert cache_b.get_gatt_services_cache(1) is None
     assert cache_b.get_gatt_mtu_cache(1) is None
+
+
+def test_cache_shared_across_threads() -> None:
+    """Concurrent writers and readers keep the bounded LRU consistent."""
+    cache = ESPHomeBluetoothCache()
+
+    def _hammer(offset: int) -> None:
+        for address in range(offset, offset + 1000):
+            cache.set_gatt_mtu_cache(address, address & 0xFF)
+            assert cache.get_gatt_mtu_cache(address) in (address & 0xFF, None)
+            cache.clear_gatt_mtu_cache(address - 1)
+
+    with ThreadPoolExecutor(4) as executor:
+        list(executor.map(_hammer, range(0, 4000, 1000)))
+    assert len(cache._gatt_mtu_cache) <= MAX_CACHED_SERVICES
+
+
+def test_caches_locked_on_free_threaded_builds() -> None:
+    """Without the GIL the caches guard every access with a lock."""
+    cache = ESPHomeBluetoothCache()
+    assert isinstance(cache._gatt_services_cache, LockedLRU) is FREE_THREADED
+    assert isinstance(cache._gatt_mtu_cache, LockedLRU) is FREE_THREADED
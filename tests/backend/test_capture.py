@@ -0,0 +1,170 @@
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLEAdvertisement,
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+from bluetooth_data_tools import parse_advertisement_data_bytes
+
+from bleak_esphome.backend import capture as capture_module
+from bleak_esphome.backend.capture import (
+    AdvertisementRecorder,
+    async_replay_capture,
+    encode_advertisement_data,
+    read_capture,
+)
+
+from ._helpers import ESP_MAC_ADDRESS, make_scanner
+
+OTHER_SOURCE = "11:22:33:44:55:66"
+
+BATCH = BluetoothLERawAdvertisementsResponse(
+    advertisements=[
+        BluetoothLERawAdvertisement(
+            address=261602360644300,
+            rssi=-96,
+            address_type=1,
+            data=bytes.fromhex("02011a020a0c0aff4c0010050a1484face"),
+        ),
+        BluetoothLERawAdvertisement(
+            address=211748016838317,
+            rssi=-66,
+            address_type=0,
+            data=bytes.fromhex("0201050716feff0900ff10"),
+        ),
+    ]
+)
+
+DECODED = BluetoothLEAdvertisement(
+    address=9049263188781,
+    rssi=-53,
+    address_type=0,
+    name="LOOKin_98F330F3",
+    service_uuids=[
+        "00001812-0000-1000-8000-00805f9b34fb",
+        "d30a7847-e12b-09a8-b04b-8e0922a9abab",
+    ],
+    service_data={
+        "0000fe95-0000-1000-8000-00805f9b34fb": b"\x01\x02",
+        "d30a7847-e12b-09a8-b04b-8e0922a9abab": b"\x03",
+    },
+    manufacturer_data={0x004C: b"\x10\x05"},
+)
+
+
+def test_encode_advertisement_data_round_trips() -> None:
+    """Re-encoded decoded advertisements parse back to the same fields."""
+    name, service_uuids, service_data, manufacturer_data, _ = (
+        parse_advertisement_data_bytes(encode_advertisement_data(DECODED))
+    )
+    assert name == DECODED.name
+    assert sorted(service_uuids) == sorted(DECODED.service_uuids)
+    assert service_data == DECODED.service_data
+    assert manufacturer_data == DECODED.manufacturer_data
+
+
+def test_recorder_round_trip(tmp_path: Path) -> None:
+    """Scanner batches and decoded ads come back in order, per source."""
+    path = tmp_path / "capture.bin"
+    recorder = AdvertisementRecorder(path)
+    scanner = make_scanner()
+    other = make_scanner(OTHER_SOURCE)
+    scanner.set_capture_recorder(recorder)
+    other.set_capture_recorder(recorder)
+    scanner.async_on_raw_advertisements(BATCH)
+    other.async_on_advertisement(DECODED)
+    scanner.async_on_raw_advertisements(BATCH)
+    scanner.set_capture_recorder(None)
+    scanner.async_on_raw_advertisements(BATCH)
+    assert recorder.records == 5
+    recorder.close()
+
+    batches = list(read_capture(path))
+    assert [batch.source for batch in batches] == [
+        ESP_MAC_ADDRESS,
+        OTHER_SOURCE,
+        ESP_MAC_ADDRESS,
+    ]
+    assert batches[0].response == BATCH
+    assert batches[2].response == BATCH
+    assert batches[0].time <= batches[1].time <= batches[2].time
+    (decoded,) = batches[1].response.advertisements
+    assert decoded.address == DECODED.address
+    assert decoded.rssi == DECODED.rssi
+    assert decoded.data == encode_advertisement_data(DECODED)
+
+
+def test_recorder_appends_to_existing_capture(tmp_path: Path) -> None:
+    """A second recorder appends without a second header."""
+    path = tmp_path / "capture.bin"
+    for source in (ESP_MAC_ADDRESS, OTHER_SOURCE):
+        recorder = AdvertisementRecorder(path)
+        recorder.record_raw_advertisements(source, 1.0, BATCH.advertisements)
+        recorder.close()
+    assert path.read_bytes().count(capture_module.CAPTURE_MAGIC) == 1
+    assert [batch.source for batch in read_capture(path)] == [
+        ESP_MAC_ADDRESS,
+        OTHER_SOURCE,
+    ]
+
+
+def test_read_capture_stops_at_truncated_record(tmp_path: Path) -> None:
+    """A tail cut short mid-write drops only the incomplete batch."""
+    path = tmp_path / "capture.bin"
+    recorder = AdvertisementRecorder(path)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 1.0, BATCH.advertisements)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 2.0, BATCH.advertisements)
+    recorder.close()
+    path.write_bytes(path.read_bytes()[:-5])
+    batches = list(read_capture(path))
+    assert [batch.time for batch in batches] == [1.0]
+
+
+def test_read_capture_skips_unknown_records(tmp_path: Path) -> None:
+    """Record types from a newer writer are skipped."""
+    path = tmp_path / "capture.bin"
+    recorder = AdvertisementRecorder(path)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 1.0, BATCH.advertisements)
+    recorder.close()
+    with path.open("ab") as file:
+        file.write(b"\x03\x00\x7fabc")
+    recorder = AdvertisementRecorder(path)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 2.0, BATCH.advertisements)
+    recorder.close()
+    assert [batch.time for batch in read_capture(path)] == [1.0, 2.0]
+
+
+def test_read_capture_empty_and_foreign_files(tmp_path: Path) -> None:
+    """An empty file has no batches; a foreign file is rejected."""
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert list(read_capture(empty)) == []
+    foreign = tmp_path / "foreign.bin"
+    foreign.write_bytes(b"not a capture file")
+    with pytest.raises(ValueError, match="not an advertisement capture"):
+        list(read_capture(foreign))
+
+
+@pytest.mark.asyncio
+async def test_async_replay_capture(tmp_path: Path) -> None:
+    """Replay feeds known sources, honours gaps and skips unknown ones."""
+    path = tmp_path / "capture.bin"
+    recorder = AdvertisementRecorder(path)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 10.0, BATCH.advertisements)
+    recorder.record_raw_advertisements(OTHER_SOURCE, 10.5, BATCH.advertisements)
+    recorder.record_raw_advertisements(ESP_MAC_ADDRESS, 12.0, BATCH.advertisements)
+    recorder.close()
+    scanner = make_scanner()
+
+    with patch.object(capture_module.asyncio, "sleep") as mock_sleep:
+        assert await async_replay_capture(path, {ESP_MAC_ADDRESS: scanner}, 2.0) == 4
+    (call,) = mock_sleep.call_args_list
+    assert 0 < call.args[0] <= 1.0
+    assert scanner.async_get_ingest_metrics().batches == 2
+
+    with patch.object(capture_module.asyncio, "sleep") as mock_sleep:
+        assert await async_replay_capture(path, {ESP_MAC_ADDRESS: scanner}, 0) == 4
+    mock_sleep.assert_not_called()
@@ -336,6 +336,37 @@ async def test_bleak_client_cached_get_services_and_read_write(
     mock_read.assert_called_once_with(BLE_ADDRESS_AS_INT, 20, 30)
 
 
+@pytest.mark.asyncio
+async def test_bleak_client_connect_holds_slot_lease(
+    bleak_pair: tuple[BleakClient, ESPHomeClient],
+    esphome_bluetooth_gatt_services: ESPHomeBluetoothGATTServices,
+) -> None:
+    """A connect in flight leases its slot until the attempt resolves."""
+    bleak_client, client = bleak_pair
+    bluetooth_device = client._bluetooth_device
+    free = bluetooth_device.ble_connections_free
+    with (
+        patch.object(
+            client._client,
+            "bluetooth_device_connect",
+            return_value=Mock(),
+        ) as mock_connect,
+        patch.object(
+            client._client,
+            "bluetooth_gatt_get_services",
+            return_value=esphome_bluetooth_gatt_services,
+        ),
+    ):
+        task = asyncio.create_task(bleak_client.connect(dangerous_use_bleak_cache=True))
+        await asyncio.sleep(0)
+        assert bluetooth_device.slot_leases == 1
+        assert bluetooth_device.unleased_slots == free - 1
+        callback = mock_connect.call_args_list[0][0][1]
+        callback(True, 23, 0)
+        await task
+    assert bluetooth_device.slot_leases == 0
+
+
 @pytest.mark.asyncio
 async def test_bleak_client_connect(
     bleak_pair: tuple[BleakClient, ESPHomeClient],
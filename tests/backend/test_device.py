@@ -8,6 +8,7 @@ from unittest.mock import Mock
 
 import pytest
 from bleak_retry_connector import Allocations
+from bluetooth_data_tools import int_to_bluetooth_address
 
 from bleak_esphome.backend.device import ESPHomeBluetoothDevice
 
@@ -33,7 +34,7 @@ async def test_wait_for_ble_connections_free_resolves_on_update(
     assert not task.done()
     bluetooth_device.async_update_ble_connection_limits(2, 5, [10, 20, 30])
     assert await task == 2
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -52,7 +53,7 @@ async def test_wait_for_ble_connections_free_timeout(
     assert "AA:BB:CC:DD:EE:FF" in message
     assert "limit=3" in message
     assert "in use=3" in message
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -66,7 +67,7 @@ async def test_wait_for_ble_connections_free_cancellation_cleans_up(
     task.cancel()
     with pytest.raises(asyncio.CancelledError):
         await task
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -105,6 +106,43 @@ async def test_reconcile_only_disconnects_missing_addresses(
     assert "Reconciling stale connection" in caplog.text
 
 
+@pytest.mark.asyncio
+async def test_repeated_slot_reports_reuse_allocation_index(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """Reports repeating the allocated members reuse the cached index."""
+    pushes: list[Allocations] = []
+    bluetooth_device.async_subscribe_connection_slots(pushes.append)
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [42, 43])
+    addresses = bluetooth_device.allocated_addresses
+    assert addresses == [int_to_bluetooth_address(42), int_to_bluetooth_address(43)]
+    assert pushes[0].allocated is addresses
+
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [42, 43])
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [43, 42])
+    assert bluetooth_device.allocated_addresses is addresses
+    assert len(pushes) == 1
+
+    # A client tracked since the last report is still checked against
+    # the unchanged members.
+    stale = Mock()
+    bluetooth_device.async_track_client(44, stale)
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [43, 42])
+    stale.assert_called_once_with()
+    assert len(pushes) == 1
+
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [43])
+    assert bluetooth_device.allocated_addresses == [int_to_bluetooth_address(43)]
+    assert len(pushes) == 2
+
+    # A list changed in place is reindexed by its members, not its identity.
+    bluetooth_device.ble_allocations.append(45)
+    assert bluetooth_device.allocated_addresses == [
+        int_to_bluetooth_address(43),
+        int_to_bluetooth_address(45),
+    ]
+
+
 @pytest.mark.asyncio
 async def test_reconcile_isolates_raising_handler(
     bluetooth_device: ESPHomeBluetoothDevice,
@@ -217,7 +255,7 @@ async def test_set_unavailable_fails_pending_slot_waiters(
     with pytest.raises(TimeoutError, match="Proxy became unavailable"):
         await task
     assert bluetooth_device.available is False
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
     # The dead session's allocated list and free count must not survive
     # into a reuse, and the cleared snapshot is pushed so the
     # subscriber's stored copy does not keep the stale state either.
@@ -345,7 +383,7 @@ async def test_wait_after_unavailable_fails_fast(
     bluetooth_device.async_set_unavailable()
     with pytest.raises(TimeoutError, match="Proxy became unavailable"):
         await bluetooth_device.wait_for_ble_connections_free(60.0)
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -435,12 +473,12 @@ async def test_set_unavailable_skips_done_futures(
     done_fut: asyncio.Future[int] = loop.create_future()
     done_fut.cancel()
     pending_fut: asyncio.Future[int] = loop.create_future()
-    bluetooth_device._ble_connection_free_futures.update({done_fut, pending_fut})
+    bluetooth_device._ble_connection_free_futures.extend([done_fut, pending_fut])
     bluetooth_device.async_set_unavailable()
     assert done_fut.cancelled()
     with pytest.raises(TimeoutError, match="Proxy became unavailable"):
         await pending_fut
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -462,11 +500,11 @@ async def test_async_update_ble_connection_limits_skips_done_futures(
     done_fut: asyncio.Future[int] = asyncio.get_running_loop().create_future()
     done_fut.cancel()
     pending_fut: asyncio.Future[int] = asyncio.get_running_loop().create_future()
-    bluetooth_device._ble_connection_free_futures.update([done_fut, pending_fut])
+    bluetooth_device._ble_connection_free_futures.extend([done_fut, pending_fut])
     bluetooth_device.async_update_ble_connection_limits(4, 4, [])
     assert pending_fut.done()
     assert pending_fut.result() == 4
-    assert bluetooth_device._ble_connection_free_futures == set()
+    assert not bluetooth_device._ble_connection_free_futures
 
 
 @pytest.mark.asyncio
@@ -513,3 +551,181 @@ async def test_subscribe_connection_slots_fires_on_change(
     assert third.free == 2
     assert third.slots == 2
     assert third.allocated == []
+
+
+@pytest.mark.asyncio
+async def test_slot_report_wakes_only_free_waiters_in_order(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """One freed slot wakes the oldest waiter; the rest stay parked."""
+    tasks = [
+        asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+        for _ in range(3)
+    ]
+    await asyncio.sleep(0)
+    assert bluetooth_device.slot_waiters == 3
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    await asyncio.sleep(0)
+    assert [task.done() for task in tasks] == [True, False, False]
+    assert bluetooth_device.slot_waiters == 2
+
+    # Free slots are promised to the parked waiters, so a newcomer queues.
+    late = asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+    await asyncio.sleep(0)
+    assert not late.done()
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [1])
+    assert await asyncio.gather(tasks[1], tasks[2]) == [2, 1]
+    assert not late.done()
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    assert await late == 1
+    assert bluetooth_device.slot_waits == 4
+    assert bluetooth_device.slot_wait_seconds >= bluetooth_device.slot_wait_max_seconds
+
+
+@pytest.mark.asyncio
+async def test_cancelled_granted_waiter_passes_its_turn_on(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """A waiter cancelled right after being granted wakes the next one."""
+    first = asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+    second = asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+    await asyncio.sleep(0)
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    assert await second == 1
+    assert bluetooth_device.slot_waiters == 0
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("fail", ["timeout", "unavailable"])
+async def test_cancelled_failed_waiter_returns_no_grant(
+    bluetooth_device: ESPHomeBluetoothDevice, fail: str
+) -> None:
+    """A wait that failed before its task was cancelled never held a grant."""
+    waiter = asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+    await asyncio.sleep(0)
+    if fail == "timeout":
+        fut = bluetooth_device._ble_connection_free_futures[0]
+        bluetooth_device._wait_for_ble_connections_free_timeout(fut)
+    else:
+        bluetooth_device.async_set_unavailable()
+        bluetooth_device.available = True
+    # Torn down before the waiter saw its failure.
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert bluetooth_device._slot_grants == 0
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    assert bluetooth_device.unleased_slots == 1
+
+
+@pytest.mark.asyncio
+async def test_slot_leases_hold_back_free_slots(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """Leased slots are not offered again until released."""
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    bluetooth_device.async_lease_slot(3, 60.0)
+    assert (bluetooth_device.slot_leases, bluetooth_device.unleased_slots) == (1, 0)
+    waiter = asyncio.create_task(bluetooth_device.wait_for_ble_connections_free(60.0))
+    await asyncio.sleep(0)
+    pushes: list[Allocations] = []
+    bluetooth_device.async_subscribe_connection_slots(pushes.append)
+    # A report that still counts the leased slot as free wakes nobody,
+    # and subscribers see the proxy's own count.
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    await asyncio.sleep(0)
+    assert not waiter.done()
+    assert pushes[0].free == 1
+    # The connect failed: the slot goes to the parked waiter.
+    bluetooth_device.async_release_slot_lease(3)
+    assert await waiter == 1
+    bluetooth_device.async_release_slot_lease(3)
+
+
+@pytest.mark.asyncio
+async def test_slot_lease_ends_when_proxy_allocates_or_expires(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """The proxy's allocated list takes over a lease; stale leases expire."""
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [1])
+    bluetooth_device.async_lease_slot(2, 60.0)
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    assert (bluetooth_device.slot_leases, bluetooth_device.unleased_slots) == (0, 1)
+
+    bluetooth_device.async_lease_slot(3, 0.001)
+    assert bluetooth_device.unleased_slots == 0
+    await asyncio.sleep(0.01)
+    assert bluetooth_device.slot_leases == 0
+
+    bluetooth_device.async_lease_slot(3, 60.0)
+    bluetooth_device.async_set_unavailable()
+    assert bluetooth_device.slot_leases == 0
+
+
+@pytest.mark.asyncio
+async def test_allocation_coalescing_pushes_latest_after_quiet_period(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """A burst of reports yields one push of the last snapshot."""
+    pushes: list[Allocations] = []
+    bluetooth_device.async_set_allocation_coalescing(0.01)
+    bluetooth_device.async_subscribe_connection_slots(pushes.append)
+    # The first push after subscribing is not held back.
+    bluetooth_device.async_update_ble_connection_limits(3, 3, [])
+    assert [p.free for p in pushes] == [3]
+
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [1])
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [2])
+    assert len(pushes) == 1
+    await asyncio.sleep(0.03)
+    assert [(p.free, p.allocated) for p in pushes[1:]] == [
+        (2, [int_to_bluetooth_address(2)])
+    ]
+    assert bluetooth_device.allocation_pushes_coalesced == 2
+
+    # A burst that settles back where it started pushes nothing.
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [2, 3])
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [2])
+    await asyncio.sleep(0.03)
+    assert len(pushes) == 2
+    assert bluetooth_device.allocation_pushes_coalesced == 4
+
+
+@pytest.mark.asyncio
+async def test_allocation_coalescing_is_bounded_and_yields_to_unavailable(
+    bluetooth_device: ESPHomeBluetoothDevice,
+) -> None:
+    """Steady reports cannot postpone a push past the maximum delay."""
+    pushes: list[Allocations] = []
+    bluetooth_device.async_set_allocation_coalescing(10.0, max_delay=10.0)
+    bluetooth_device.async_subscribe_connection_slots(pushes.append)
+    bluetooth_device.async_update_ble_connection_limits(3, 3, [])
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [1])
+    handle = bluetooth_device._publish_handle
+    assert handle is not None
+    bluetooth_device.async_update_ble_connection_limits(1, 3, [1, 2])
+    assert bluetooth_device._publish_handle is not None
+    assert bluetooth_device._publish_handle.when() == pytest.approx(handle.when())
+
+    # Unavailability supersedes the pending push and goes out at once.
+    bluetooth_device.async_set_unavailable()
+    assert bluetooth_device._publish_handle is None
+    assert [(p.free, p.allocated) for p in pushes] == [(3, []), (0, [])]
+
+    # Turning coalescing off flushes a pending push right away.
+    bluetooth_device.async_update_ble_connection_limits(2, 3, [1])
+    bluetooth_device.async_set_allocation_coalescing(0.0)
+    assert pushes[-1].free == 2
+
+
+def test_allocation_coalescing_rejects_bad_arguments() -> None:
+    """Out of range settings are refused."""
+    device = ESPHomeBluetoothDevice("proxy", ESP_MAC_ADDRESS, loop=Mock())
+    with pytest.raises(ValueError, match="Quiet period"):
+        device.async_set_allocation_coalescing(-1.0)
+    with pytest.raises(ValueError, match="Maximum delay"):
+        device.async_set_allocation_coalescing(1.0, max_delay=0.5)
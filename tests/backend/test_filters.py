@@ -0,0 +1,91 @@
+from bluetooth_data_tools import int_to_bluetooth_address
+
+from bleak_esphome.backend.filters import AdvertisementFilter
+
+ADDRESS = 0x112233445566
+# Flags, Apple (0x004C) manufacturer data.
+APPLE_PAYLOAD = bytes.fromhex("02011a0aff4c0010050a1484face")
+# Flags, complete 16-bit UUID list (0x1812, 0x180F), service data 0xFE95.
+UUID_PAYLOAD = bytes.fromhex("020106050312180f18051695fe0102")
+# Flags, Govee (0xEC88) manufacturer data.
+OTHER_PAYLOAD = bytes.fromhex("02010605ff88ec0001")
+
+
+def test_no_predicates_passes_everything() -> None:
+    """An empty filter only counts."""
+    advertisement_filter = AdvertisementFilter()
+    assert advertisement_filter.should_forward(ADDRESS, -70, OTHER_PAYLOAD, 0.0)
+    assert advertisement_filter.passed == 1
+
+
+def test_manufacturer_id_match() -> None:
+    """Only payloads carrying a wanted company ID pass."""
+    advertisement_filter = AdvertisementFilter(manufacturer_ids=[0x004C])
+    assert advertisement_filter.should_forward(ADDRESS, -70, APPLE_PAYLOAD, 0.0)
+    assert not advertisement_filter.should_forward(ADDRESS, -70, OTHER_PAYLOAD, 0.0)
+    assert not advertisement_filter.should_forward(ADDRESS, -70, UUID_PAYLOAD, 0.0)
+    assert advertisement_filter.passed == 1
+    assert advertisement_filter.unmatched == 2
+
+
+def test_service_uuid_list_and_service_data_match() -> None:
+    """16-bit UUIDs match in UUID lists and in service data."""
+    assert AdvertisementFilter(service_uuids=[0x180F]).should_forward(
+        ADDRESS, -70, UUID_PAYLOAD, 0.0
+    )
+    assert AdvertisementFilter(service_uuids=[0xFE95]).should_forward(
+        ADDRESS, -70, UUID_PAYLOAD, 0.0
+    )
+    assert not AdvertisementFilter(service_uuids=[0x181A]).should_forward(
+        ADDRESS, -70, UUID_PAYLOAD, 0.0
+    )
+
+
+def test_allow_and_deny_addresses() -> None:
+    """Allowlisted addresses bypass content checks; denied ones never pass."""
+    advertisement_filter = AdvertisementFilter(
+        manufacturer_ids=[0x004C],
+        allow_addresses=[int_to_bluetooth_address(ADDRESS)],
+        deny_addresses=[ADDRESS + 1],
+    )
+    assert advertisement_filter.should_forward(ADDRESS, -70, OTHER_PAYLOAD, 0.0)
+    assert not advertisement_filter.should_forward(ADDRESS + 1, -70, APPLE_PAYLOAD, 0.0)
+    assert advertisement_filter.should_forward(ADDRESS + 2, -70, APPLE_PAYLOAD, 0.0)
+    assert not advertisement_filter.should_forward(ADDRESS + 2, -70, OTHER_PAYLOAD, 0.0)
+    assert advertisement_filter.denied == 1
+    assert advertisement_filter.unmatched == 1
+    assert advertisement_filter.passed == 2
+
+
+def test_deny_only_passes_other_addresses() -> None:
+    """A denylist alone does not turn on content filtering."""
+    advertisement_filter = AdvertisementFilter(deny_addresses=[ADDRESS])
+    assert not advertisement_filter.should_forward(ADDRESS, -70, OTHER_PAYLOAD, 0.0)
+    assert advertisement_filter.should_forward(ADDRESS + 1, -70, OTHER_PAYLOAD, 0.0)
+
+
+def test_malformed_payloads_do_not_match() -> None:
+    """Truncated or zero-length structures end the scan without matching."""
+    advertisement_filter = AdvertisementFilter(
+        manufacturer_ids=[0x004C], service_uuids=[0x180F]
+    )
+    for payload in (
+        b"",
+        b"\x02",
+        b"\x00\xff\x4c\x00",
+        b"\x0a\xff\x4c",
+        b"\x02\xff\x4c",
+        b"\x02\x16\x0f",
+    ):
+        assert not advertisement_filter.should_forward(ADDRESS, -70, payload, 0.0)
+
+
+def test_identifier_bytes_outside_a_matching_structure() -> None:
+    """Identifier bytes in the wrong place pass the index but not the scan."""
+    advertisement_filter = AdvertisementFilter(manufacturer_ids=[0x004C])
+    # The company ID bytes only appear inside another company's data.
+    payload = bytes.fromhex("020106" "06ff88ecff4c00")
+    assert not advertisement_filter.should_forward(ADDRESS, -70, payload, 0.0)
+    # A payload without them is rejected without scanning.
+    assert not advertisement_filter.should_forward(ADDRESS, -70, OTHER_PAYLOAD, 0.0)
+    assert advertisement_filter.unmatched == 2
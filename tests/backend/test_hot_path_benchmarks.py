@@ -0,0 +1,191 @@
+"""
+Benchmark the optionally compiled modules against their Python source.
+
+Every benchmark runs twice: once against the build that is installed
+(compiled when the extensions were built) and once against the module
+loaded straight from its ``.py`` source, so the gain per module shows up
+side by side in one run.
+"""
+
+from __future__ import annotations
+
+import importlib.util
+import sys
+from functools import cache
+from pathlib import Path
+from types import ModuleType, SimpleNamespace
+from typing import Any
+
+import pytest
+from aioesphomeapi import APIVersion, BluetoothProxyFeature, DeviceInfo
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_esphome.backend import cache as cache_module
+from bleak_esphome.backend import client as client_module
+from bleak_esphome.backend import device as device_module
+from bleak_esphome.backend.device import ESPHomeBluetoothDevice
+
+from ._helpers import ESP_MAC_ADDRESS, ESP_NAME, make_ble_device
+
+BUILDS = ("installed", "python")
+TRACKED = [0xAABBCCDDEE01, 0xAABBCCDDEE02, 0xAABBCCDDEE03]
+
+
+@cache
+def _python_source(module: ModuleType) -> ModuleType:
+    """Load ``module`` from its ``.py`` source, bypassing a compiled build."""
+    package, _, leaf = module.__name__.rpartition(".")
+    assert module.__file__ is not None
+    path = Path(module.__file__).with_name(f"{leaf}.py")
+    name = f"{package}._{leaf}_python_source"
+    spec = importlib.util.spec_from_file_location(name, path)
+    assert spec is not None and spec.loader is not None
+    source = importlib.util.module_from_spec(spec)
+    sys.modules[name] = source
+    spec.loader.exec_module(source)
+    return source
+
+
+def _build(module: ModuleType, build: str) -> ModuleType:
+    """Return ``module`` as installed, or loaded from its Python source."""
+    return module if build == "installed" else _python_source(module)
+
+
+def _run(coro: Any) -> Any:
+    """Drive a coroutine that never suspends to completion."""
+    try:
+        coro.send(None)
+    except StopIteration as stop:
+        return stop.value
+    raise AssertionError("coroutine suspended")
+
+
+class _ProxyAPI:
+    """Stand-in for the GATT calls of ``APIClient`` that answer instantly."""
+
+    def __init__(self) -> None:
+        self.on_notify: Any = None
+
+    async def bluetooth_gatt_read(
+        self, address: int, handle: int, timeout: float
+    ) -> bytearray:
+        return bytearray(b"\x01")
+
+    async def bluetooth_gatt_write(
+        self, address: int, handle: int, data: bytes, response: bool
+    ) -> None:
+        return None
+
+    async def bluetooth_gatt_start_notify(
+        self, address: int, handle: int, on_notify: Any, timeout: float
+    ) -> tuple[Any, Any]:
+        self.on_notify = on_notify
+        return self._stop_notify, lambda: None
+
+    async def _stop_notify(self) -> None:
+        return None
+
+
+def _make_client(build: str) -> tuple[Any, _ProxyAPI]:
+    """Build a connected ``ESPHomeClient`` from ``build`` over a stub proxy."""
+    module = _build(client_module, build)
+    api = _ProxyAPI()
+    client_data = module.ESPHomeClientData(
+        bluetooth_device=ESPHomeBluetoothDevice(ESP_NAME, ESP_MAC_ADDRESS),
+        client=api,
+        device_info=DeviceInfo(
+            mac_address=ESP_MAC_ADDRESS,
+            name=ESP_NAME,
+            bluetooth_proxy_feature_flags=BluetoothProxyFeature.ACTIVE_CONNECTIONS,
+        ),
+        api_version=APIVersion(1, 9),
+        title=ESP_NAME,
+        scanner=None,
+    )
+    client = module.ESPHomeClient(make_ble_device(), client_data=client_data)
+    client._is_connected = True
+    return client, api
+
+
+@pytest.mark.parametrize("build", BUILDS)
+@pytest.mark.asyncio
+async def test_device_slot_update_and_reconcile(
+    benchmark: BenchmarkFixture, build: str
+) -> None:
+    """Benchmark slot reports that publish and reconcile tracked clients."""
+    module = _build(device_module, build)
+    device = module.ESPHomeBluetoothDevice(ESP_NAME, ESP_MAC_ADDRESS)
+    device.async_subscribe_connection_slots(lambda allocations: None)
+    for address in TRACKED:
+        device.async_track_client(address, lambda: None)
+    # Same slots in a new order: every report publishes and reconciles.
+    reordered = TRACKED[::-1]
+
+    @benchmark
+    def _benchmark():
+        for _ in range(500):
+            device.async_update_ble_connection_limits(0, 3, TRACKED)
+            device.async_update_ble_connection_limits(0, 3, reordered)
+
+    assert len(device._tracked_clients) == 3
+
+
+@pytest.mark.parametrize("build", BUILDS)
+def test_cache_mtu_and_services_lookup(benchmark: BenchmarkFixture, build: str) -> None:
+    """Benchmark the GATT cache lookups made on every connect."""
+    module = _build(cache_module, build)
+    bluetooth_cache = module.ESPHomeBluetoothCache()
+    addresses = range(0xAABBCCDD0000, 0xAABBCCDD0000 + 100)
+    services = object()
+
+    @benchmark
+    def _benchmark():
+        for address in addresses:
+            bluetooth_cache.set_gatt_mtu_cache(address, 247)
+            bluetooth_cache.set_gatt_services_cache(address, services)
+        for address in addresses:
+            bluetooth_cache.get_gatt_mtu_cache(address)
+            bluetooth_cache.get_gatt_services_cache(address)
+
+    assert bluetooth_cache.get_gatt_mtu_cache(addresses[-1]) == 247
+
+
+@pytest.mark.parametrize("build", BUILDS)
+@pytest.mark.asyncio
+async def test_client_read_write_dispatch(
+    benchmark: BenchmarkFixture, build: str
+) -> None:
+    """Benchmark the read and write dispatch down to the proxy call."""
+    client, _ = _make_client(build)
+    characteristic = SimpleNamespace(handle=20)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(500):
+            _run(client.read_gatt_char(characteristic))
+            _run(client.write_gatt_char(characteristic, b"\x01\x02", False))
+
+    assert _run(client.read_gatt_char(characteristic)) == bytearray(b"\x01")
+
+
+@pytest.mark.parametrize("build", BUILDS)
+@pytest.mark.asyncio
+async def test_client_notify_dispatch(benchmark: BenchmarkFixture, build: str) -> None:
+    """Benchmark delivering notifications to the bleak callback."""
+    client, api = _make_client(build)
+    received: list[bytearray] = []
+    characteristic = SimpleNamespace(
+        handle=20, properties=["notify"], uuid="2a37", service_uuid="180d"
+    )
+    _run(client.start_notify(characteristic, received.append))
+    on_notify = api.on_notify
+    data = bytearray(b"\x06\x48")
+
+    @benchmark
+    def _benchmark():
+        received.clear()
+        for _ in range(1000):
+            on_notify(20, data)
+
+    assert len(received) == 1000
+    _run(client.stop_notify(characteristic))
@@ -0,0 +1,130 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import pytest
+from pytest_codspeed import BenchmarkFixture
+
+from bleak_esphome.backend.capture import AdvertisementRecorder
+from bleak_esphome.backend.suppression import PayloadSuppressor
+
+from ._load import (
+    LoadProfile,
+    beacon_flood_profile,
+    capture_profile,
+    convert_in_parallel,
+    fleet_profile,
+    make_scanners,
+    replay,
+    run_load,
+    run_parallel_conversion,
+    shard_events,
+)
+
+
+@pytest.fixture(scope="module")
+def fleet() -> LoadProfile:
+    """50 proxies hearing 3000 devices for one second."""
+    return fleet_profile(proxies=50, devices=3000, duration=1.0)
+
+
+@pytest.fixture(scope="module")
+def beacon_flood() -> LoadProfile:
+    """4 proxies in a 500 beacon space for one second."""
+    return beacon_flood_profile(proxies=4, beacons=500, duration=1.0)
+
+
+def test_fleet_50x3000_ingest(benchmark: BenchmarkFixture, fleet: LoadProfile) -> None:
+    """Benchmark one second of a 50 proxy, 3000 device fleet."""
+    scanners = make_scanners(fleet)
+
+    @benchmark
+    def _benchmark():
+        replay(fleet, scanners)
+
+
+def test_beacon_flood_ingest(
+    benchmark: BenchmarkFixture, beacon_flood: LoadProfile
+) -> None:
+    """Benchmark one second of a duplicate-heavy beacon flood."""
+    scanners = make_scanners(beacon_flood)
+
+    @benchmark
+    def _benchmark():
+        replay(beacon_flood, scanners)
+
+
+def test_beacon_flood_ingest_suppressed(
+    benchmark: BenchmarkFixture, beacon_flood: LoadProfile
+) -> None:
+    """Benchmark the beacon flood with identical-payload suppression."""
+    scanners = make_scanners(
+        beacon_flood,
+        lambda scanner: scanner.set_payload_suppressor(PayloadSuppressor()),
+    )
+
+    @benchmark
+    def _benchmark():
+        replay(beacon_flood, scanners)
+
+
+@pytest.mark.parametrize("threads", [1, 2, 4])
+def test_fleet_parallel_conversion(
+    benchmark: BenchmarkFixture, fleet: LoadProfile, threads: int
+) -> None:
+    """Benchmark off-loop conversion of the fleet sharded over threads."""
+    shards = shard_events(fleet, make_scanners(fleet), threads)
+    with ThreadPoolExecutor(threads) as executor:
+
+        @benchmark
+        def _benchmark():
+            convert_in_parallel(executor, shards)
+
+
+def test_parallel_conversion_covers_every_proxy(fleet: LoadProfile) -> None:
+    """Shards partition the schedule by proxy and conversion completes."""
+    scanners = make_scanners(fleet)
+    shards = shard_events(fleet, scanners, 4)
+    assert sum(len(shard) for shard in shards) == len(fleet.events)
+    for shard in shards:
+        assert len({scanner.source for scanner, _ in shard}) <= 13
+    assert run_parallel_conversion(fleet, 2) > 0
+
+
+def test_run_load_report(fleet: LoadProfile) -> None:
+    """The report accounts for every batch and keeps up with the fleet."""
+    report = run_load(fleet)
+    assert report.proxies == 50
+    assert report.batches == len(fleet.events)
+    assert report.advertisements == fleet.advertisements
+    # Every device advertises once per second, heard by three proxies.
+    assert report.arrival_rate == pytest.approx(9000)
+    assert 0 < report.p50_batch_us <= report.p99_batch_us
+    assert report.peak_memory_bytes > 0
+    assert report.headroom > 0
+
+
+def test_capture_profile_replays_recording(
+    tmp_path: Path, beacon_flood: LoadProfile
+) -> None:
+    """A recorded capture becomes a profile with the recorded pacing."""
+    path = tmp_path / "flood.cap"
+    recorder = AdvertisementRecorder(path)
+    for time, source, batch in beacon_flood.events[:40]:
+        recorder.record_raw_advertisements(source, 100.0 + time, batch.advertisements)
+    recorder.close()
+    profile = capture_profile(path)
+    assert profile.sources == sorted(
+        {source for _, source, _ in beacon_flood.events[:40]}
+    )
+    assert profile.events[0][0] == 0.0
+    assert profile.advertisements == sum(
+        len(batch.advertisements) for _, _, batch in beacon_flood.events[:40]
+    )
+    report = run_load(profile, trace_memory=False)
+    assert report.batches == 40
+    assert report.peak_memory_bytes == 0
+
+    empty = tmp_path / "empty.cap"
+    AdvertisementRecorder(empty).close()
+    with pytest.raises(ValueError, match="contains no batches"):
+        capture_profile(empty)
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import pytest
+from aioesphomeapi import (
+    APIConnectionError,
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+
+from bleak_esphome.backend.latency import LatencyEstimator
+from bleak_esphome.backend.scanner import ESPHomeScanner
+
+from ._helpers import make_scanner
+
+BATCH = BluetoothLERawAdvertisementsResponse(
+    advertisements=[
+        BluetoothLERawAdvertisement(
+            address=261602360644300, rssi=-60, address_type=1, data=b"\x02\x01\x06"
+        )
+    ]
+)
+
+
+def test_steady_round_trips_leave_half_the_round_trip() -> None:
+    """With no queueing the delay is half the smoothed round trip."""
+    estimator = LatencyEstimator()
+    estimator.record_round_trip(0.2)
+    estimator.record_round_trip(0.04)
+    assert estimator.round_trip == pytest.approx(0.18)
+    assert estimator.base_round_trip == pytest.approx(0.04)
+    for i in range(20):
+        assert estimator.record_arrival(i * 0.1) == i * 0.1
+    # Half the base round trip plus the excess of the smoothed one.
+    assert estimator.delay == pytest.approx(0.02 + 0.14)
+
+    steady = LatencyEstimator()
+    for _ in range(5):
+        steady.record_round_trip(0.05)
+    assert steady.delay == pytest.approx(0.025)
+
+
+def test_irregular_on_time_arrivals_do_not_raise_the_estimate() -> None:
+    """A proxy flushing on its own bursty schedule is not taken for queueing."""
+    estimator = LatencyEstimator(correct=True)
+    estimator.record_round_trip(0.01)
+    now = 0.0
+    for _ in range(20):
+        now += 1.5
+        assert estimator.record_arrival(now) == pytest.approx(now - 0.005)
+        now += 0.1
+        assert estimator.record_arrival(now) == pytest.approx(now - 0.005)
+    assert estimator.delay == pytest.approx(0.005)
+
+
+def test_corrected_times_stay_monotonic() -> None:
+    """A jump in the estimate between batches does not stamp back in time."""
+    estimator = LatencyEstimator(correct=True)
+    estimator.record_round_trip(0.01)
+    first = estimator.record_arrival(100.0)
+    assert first == pytest.approx(99.995)
+    # The link congests: the round trip balloons and the delay with it.
+    estimator.record_round_trip(2.0)
+    assert estimator.delay > 0.2
+    assert estimator.record_arrival(100.01) == first
+    later = estimator.record_arrival(101.0)
+    assert later == pytest.approx(101.0 - estimator.delay)
+    assert later > first
+
+
+def test_scanner_stamps_corrected_time() -> None:
+    """A correcting estimator shifts the timestamp handed to habluetooth."""
+    scanner = make_scanner()
+    estimator = LatencyEstimator(correct=True)
+    estimator.record_round_trip(0.5)
+    scanner.set_latency_estimator(estimator)
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(BATCH)
+    stamped = on_raw.call_args.args[4]
+    snapshot = scanner.async_get_ingest_metrics()
+    assert snapshot.delivery_delay == pytest.approx(0.25)
+    assert stamped == pytest.approx(snapshot.time - 0.25, abs=0.05)
+
+    scanner.set_latency_estimator(None)
+    assert scanner.async_get_ingest_metrics().delivery_delay == 0.0
+
+
+@pytest.mark.asyncio
+async def test_round_trip_probe() -> None:
+    """Round trips feed the estimator until the connection goes away."""
+    scanner = make_scanner()
+    estimator = LatencyEstimator()
+    scanner.set_latency_estimator(estimator)
+    cli = MagicMock()
+    cli.device_info = AsyncMock()
+    round_trip = await scanner.async_measure_round_trip(cli)
+    assert estimator.round_trip == round_trip
+
+    cli.device_info = AsyncMock(side_effect=[None, APIConnectionError("gone")])
+    scanner.async_probe_round_trip(cli, interval=0.0)
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert cli.device_info.await_count == 2
@@ -0,0 +1,33 @@
+from bleak_esphome.backend.metrics import (
+    BATCH_SIZE_BUCKET,
+    BATCH_SIZE_LABELS,
+    IngestMetrics,
+)
+
+
+def test_batch_size_buckets_match_labels() -> None:
+    """Each bucket index lines up with its label's range."""
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[0]] == "0"
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[1]] == "1"
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[3]] == "2-3"
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[4]] == "4-7"
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[15]] == "8-15"
+    assert BATCH_SIZE_LABELS[BATCH_SIZE_BUCKET[31]] == "16-31"
+
+
+def test_snapshot_rates() -> None:
+    """Rates cover the span since start, or since the previous snapshot."""
+    metrics = IngestMetrics(100.0)
+    metrics.advertisements = 50
+    metrics.batches = 10
+    metrics.batch_sizes[3] = 10
+    first = metrics.snapshot("proxy", 110.0)
+    assert first.advertisements_per_second == 5.0
+    assert first.batch_sizes["4-7"] == 10
+    assert first.batches == 10
+    assert first.delivery_delay == 0.0
+    metrics.advertisements = 70
+    second = metrics.snapshot("proxy", 112.0, first)
+    assert second.advertisements_per_second == 10.0
+    assert second.source == "proxy"
+    assert metrics.snapshot("proxy", 112.0, second).advertisements_per_second == 0.0
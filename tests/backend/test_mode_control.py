@@ -0,0 +1,145 @@
+import asyncio
+from functools import partial
+from unittest.mock import patch
+
+import pytest
+from aioesphomeapi import BluetoothScannerMode
+from habluetooth import BluetoothScanningMode
+
+from bleak_esphome.backend import mode_control as mode_control_module
+from bleak_esphome.backend.mode_control import ScanModeController
+from bleak_esphome.backend.scanner import ESPHomeScanner
+
+from ._helpers import make_scanner
+
+_make_scanner = partial(
+    make_scanner, mode=BluetoothScanningMode.ACTIVE, mock_client=True
+)
+
+
+class _Clock:
+    """Monotonic clock the test advances by hand."""
+
+    def __init__(self) -> None:
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Return the current time."""
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch: pytest.MonkeyPatch) -> _Clock:
+    clock = _Clock()
+    monkeypatch.setattr(mode_control_module, "MONOTONIC_TIME", clock)
+    return clock
+
+
+def _spend(clock: _Clock, costs: dict[ESPHomeScanner, float]) -> None:
+    """Advance 10s, charging each scanner its share of a CPU for it."""
+    clock.now += 10.0
+    for scanner, cost in costs.items():
+        scanner._metrics.raw_seconds += cost * 10.0
+
+
+def test_demotes_costliest_then_restores(clock: _Clock) -> None:
+    """Over target the costliest proxy goes PASSIVE; it returns once load drops."""
+    controller = ScanModeController(cpu_target=0.2, min_dwell=0.0)
+    cheap, costly = _make_scanner("cheap"), _make_scanner("costly")
+    controller.async_add_scanner(cheap)
+    controller.async_add_scanner(costly)
+    assert costly._metrics.timing
+
+    _spend(clock, {cheap: 0.05, costly: 0.2})
+    controller.async_evaluate()
+    assert controller.load == pytest.approx(0.25)
+    assert controller.demoted_sources == ["costly"]
+    assert costly.requested_mode is BluetoothScanningMode.PASSIVE
+    assert costly.scanning_intent is BluetoothScanningMode.PASSIVE
+    costly._client.bluetooth_scanner_set_mode.assert_called_once_with(
+        BluetoothScannerMode.PASSIVE
+    )
+    cheap._client.bluetooth_scanner_set_mode.assert_not_called()
+
+    # Between the recover level and the target nothing moves.
+    _spend(clock, {cheap: 0.05, costly: 0.1})
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["costly"]
+
+    _spend(clock, {cheap: 0.05, costly: 0.05})
+    controller.async_evaluate()
+    assert controller.demoted_sources == []
+    assert costly.requested_mode is BluetoothScanningMode.ACTIVE
+    assert (controller.demotions, controller.promotions) == (1, 1)
+
+
+def test_respects_operator_bounds(clock: _Clock) -> None:
+    """Exempt, PASSIVE and dwelling proxies stay put, up to ``max_demoted``."""
+    controller = ScanModeController(cpu_target=0.1, max_demoted=1, min_dwell=60.0)
+    exempt = _make_scanner("exempt")
+    passive = _make_scanner("passive", mode=BluetoothScanningMode.PASSIVE)
+    first, second = _make_scanner("first"), _make_scanner("second")
+    controller.async_add_scanner(exempt, exempt=True)
+    for scanner in (passive, first, second):
+        controller.async_add_scanner(scanner)
+
+    costs = {exempt: 0.5, passive: 0.4, first: 0.3, second: 0.2}
+    _spend(clock, costs)
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["first"]
+    _spend(clock, costs)
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["first"]
+
+    # Load drops, but "first" has not dwelled long enough to switch back.
+    _spend(clock, dict.fromkeys(costs, 0.0))
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["first"]
+    clock.now += 60.0
+    _spend(clock, dict.fromkeys(costs, 0.0))
+    controller.async_evaluate()
+    assert controller.demoted_sources == []
+
+
+def test_operator_repin_and_removal(clock: _Clock) -> None:
+    """A repinned proxy is let go; removing a demoted proxy restores it."""
+    controller = ScanModeController(cpu_target=0.1, min_dwell=0.0)
+    repinned = _make_scanner("repinned", mode=BluetoothScanningMode.AUTO)
+    removed = _make_scanner("removed")
+    controller.async_add_scanner(repinned)
+    controller.async_add_scanner(removed)
+
+    _spend(clock, {repinned: 0.3, removed: 0.2})
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["repinned"]
+    repinned.async_set_scanning_mode(BluetoothScanningMode.PASSIVE)
+    repinned.async_set_scanning_mode(BluetoothScanningMode.ACTIVE)
+
+    _spend(clock, {repinned: 0.0, removed: 0.2})
+    controller.async_evaluate()
+    assert controller.demoted_sources == ["removed"]
+
+    controller.async_remove_scanner(removed)
+    assert controller.demoted_sources == []
+    assert removed.requested_mode is BluetoothScanningMode.ACTIVE
+
+
+@pytest.mark.asyncio
+async def test_async_start_evaluates_periodically() -> None:
+    """The controller evaluates on its own until stopped."""
+    controller = ScanModeController()
+    with patch.object(ScanModeController, "async_evaluate") as evaluate:
+        stop = controller.async_start(0.001)
+        await asyncio.sleep(0.05)
+        stop()
+    assert evaluate.called
+
+
+def test_controller_rejects_bad_arguments() -> None:
+    """Out of range settings are refused."""
+    with pytest.raises(ValueError, match="CPU target"):
+        ScanModeController(cpu_target=0)
+    with pytest.raises(ValueError, match="Recover ratio"):
+        ScanModeController(recover_ratio=1.0)
+    with pytest.raises(ValueError, match="Demoted proxy limit"):
+        ScanModeController(max_demoted=-1)
@@ -0,0 +1,178 @@
+import asyncio
+from collections.abc import Callable
+from unittest.mock import MagicMock
+
+import pytest
+from aioesphomeapi import (
+    BluetoothScannerMode,
+    BluetoothScannerState,
+    BluetoothScannerStateResponse,
+)
+
+from bleak_esphome.backend import scanner as scanner_module
+from bleak_esphome.backend.resubscribe import ResubscribeScheduler
+
+from ._helpers import make_scanner
+
+RUNNING = BluetoothScannerStateResponse(
+    state=BluetoothScannerState.RUNNING,
+    mode=BluetoothScannerMode.PASSIVE,
+)
+
+
+async def _until(predicate: Callable[[], bool]) -> None:
+    """Let the loop run until ``predicate()`` holds."""
+    for _ in range(200):
+        if predicate():
+            return
+        await asyncio.sleep(0)
+    raise AssertionError("condition never held")
+
+
+def _waiting(scheduler: ResubscribeScheduler, source: str) -> bool:
+    """Return True once ``source`` is queued for a slot."""
+    state = scheduler.async_get_retry_states().get(source)
+    return state is not None and state.waiting_for_slot
+
+
+def test_jitter_spreads_delays_within_bounds() -> None:
+    """Jittered delays stay within ``1 ± jitter`` and are not all equal."""
+    scheduler = ResubscribeScheduler(jitter=0.5)
+    delays = {scheduler.async_schedule(f"proxy-{i}", 10.0) for i in range(50)}
+    assert all(5.0 <= delay <= 15.0 for delay in delays)
+    assert len(delays) > 1
+    assert ResubscribeScheduler(jitter=0).async_schedule("proxy", 10.0) == 10.0
+    assert scheduler.async_get_retry_states()["proxy-0"].next_attempt_at is not None
+
+
+@pytest.mark.asyncio
+async def test_concurrency_cap_grants_in_arrival_order() -> None:
+    """Past the cap proxies queue and are granted slots as others release."""
+    scheduler = ResubscribeScheduler(jitter=0, max_concurrent=1)
+    await scheduler.async_acquire("a")
+    second = asyncio.create_task(scheduler.async_acquire("b"))
+    third = asyncio.create_task(scheduler.async_acquire("c"))
+    await _until(lambda: _waiting(scheduler, "c"))
+    states = scheduler.async_get_retry_states()
+    assert states["a"].in_flight and states["b"].waiting_for_slot
+    assert scheduler.in_flight == 1
+
+    scheduler.async_release("a")
+    await second
+    assert not third.done()
+    assert scheduler.async_get_retry_states()["b"].in_flight
+    scheduler.async_forget("b")
+    await third
+    assert set(scheduler.async_get_retry_states()) == {"a", "c"}
+    scheduler.async_forget("c")
+    assert scheduler.in_flight == 0
+
+
+@pytest.mark.asyncio
+async def test_slot_released_after_settle() -> None:
+    """A proxy that never reports state frees its slot after ``settle``."""
+    scheduler = ResubscribeScheduler(jitter=0, max_concurrent=1, settle=0.01)
+    await scheduler.async_acquire("a")
+    await asyncio.wait_for(scheduler.async_acquire("b"), timeout=1)
+    assert not scheduler.async_get_retry_states()["a"].in_flight
+    scheduler.async_forget("b")
+
+
+@pytest.mark.asyncio
+async def test_retry_before_settle_restarts_the_settle_timer() -> None:
+    """A second attempt inside ``settle`` is not released by the first timer."""
+    scheduler = ResubscribeScheduler(jitter=0, max_concurrent=1, settle=0.2)
+    await scheduler.async_acquire("a")
+    await asyncio.sleep(0.1)
+    # The retry delay is shorter than settle: the slot is still held.
+    await asyncio.wait_for(scheduler.async_acquire("a"), timeout=0.05)
+    await asyncio.sleep(0.15)
+    assert scheduler.async_get_retry_states()["a"].in_flight
+    assert scheduler.in_flight == 1
+    await asyncio.wait_for(scheduler.async_acquire("b"), timeout=1)
+    assert not scheduler.async_get_retry_states()["a"].in_flight
+    scheduler.async_forget("b")
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    """A watchdog cancelled while queued neither holds nor blocks a slot."""
+    scheduler = ResubscribeScheduler(jitter=0, max_concurrent=1)
+    await scheduler.async_acquire("a")
+    waiter = asyncio.create_task(scheduler.async_acquire("b"))
+    await _until(lambda: _waiting(scheduler, "b"))
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    scheduler.async_release("a")
+    assert scheduler.in_flight == 0
+    await scheduler.async_acquire("c")
+    assert scheduler.in_flight == 1
+
+
+def test_scheduler_rejects_bad_arguments() -> None:
+    """Out of range settings are refused."""
+    with pytest.raises(ValueError, match="jitter"):
+        ResubscribeScheduler(jitter=1.0)
+    with pytest.raises(ValueError, match="Concurrent resubscribe limit"):
+        ResubscribeScheduler(max_concurrent=0)
+    with pytest.raises(ValueError, match="Settle time"):
+        ResubscribeScheduler(settle=0)
+
+
+@pytest.mark.asyncio
+async def test_watchdogs_share_the_fleet_cap(monkeypatch: pytest.MonkeyPatch) -> None:
+    """With a cap of one, a second proxy resubscribes only after the first lands."""
+    monkeypatch.setattr(scanner_module, "_SUBSCRIPTION_RETRY_DELAYS", (0.0,))
+    scheduler = ResubscribeScheduler(jitter=0, max_concurrent=1)
+    first, second = make_scanner("proxy-1"), make_scanner("proxy-2")
+    first_resubscribe, second_resubscribe = MagicMock(), MagicMock()
+    unsetups = []
+    for scanner, resubscribe in (
+        (first, first_resubscribe),
+        (second, second_resubscribe),
+    ):
+        scanner.set_resubscribe_scheduler(scheduler)
+        scanner.set_resubscribe_advertisements(resubscribe)
+        unsetups.append(scanner.async_setup())
+
+    await _until(lambda: bool(first_resubscribe.called))
+    await _until(lambda: _waiting(scheduler, "proxy-2"))
+    second_resubscribe.assert_not_called()
+    state = scheduler.async_get_retry_states()["proxy-1"]
+    assert (state.attempts, state.in_flight) == (1, True)
+
+    first.async_update_scanner_state(RUNNING)
+    await _until(lambda: bool(second_resubscribe.called))
+    assert first._subscription_watchdog_task is not None
+    await asyncio.wait_for(first._subscription_watchdog_task, timeout=1)
+    assert "proxy-1" not in scheduler.async_get_retry_states()
+
+    second.async_update_scanner_state(RUNNING)
+    assert second._subscription_watchdog_task is not None
+    await asyncio.wait_for(second._subscription_watchdog_task, timeout=1)
+    assert scheduler.async_get_retry_states() == {}
+    assert scheduler.in_flight == 0
+    for unsetup in unsetups:
+        unsetup()
+
+
+@pytest.mark.asyncio
+async def test_watchdog_records_resubscribe_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    """Failed attempts are counted with their error until the watchdog ends."""
+    monkeypatch.setattr(scanner_module, "_SUBSCRIPTION_RETRY_DELAYS", (0.0,))
+    scheduler = ResubscribeScheduler(jitter=0, settle=0.001)
+    scanner = make_scanner("proxy")
+    resubscribe = MagicMock(side_effect=ValueError("boom"))
+    scanner.set_resubscribe_scheduler(scheduler)
+    scanner.set_resubscribe_advertisements(resubscribe)
+    unsetup = scanner.async_setup()
+    await _until(lambda: resubscribe.call_count >= 2)
+    state = scheduler.async_get_retry_states()["proxy"]
+    assert state.attempts >= 2
+    assert state.last_error == "ValueError('boom')"
+    unsetup()
+    await asyncio.sleep(0)
+    assert scheduler.async_get_retry_states() == {}
@@ -0,0 +1,172 @@
+import subprocess
+import sys
+from collections.abc import Iterator
+from multiprocessing.shared_memory import SharedMemory
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLEAdvertisement,
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+from habluetooth import HaBluetoothConnector
+
+from bleak_esphome.backend.capture import encode_advertisement_data
+from bleak_esphome.backend.client import ESPHomeClientData
+from bleak_esphome.backend.ring import (
+    MIN_RING_SIZE,
+    RingPublisher,
+    RingReader,
+    RingRecord,
+)
+from bleak_esphome.backend.scanner import ESPHomeScanner
+
+from ._helpers import ESP_MAC_ADDRESS, ESP_NAME
+
+BATCH = BluetoothLERawAdvertisementsResponse(
+    advertisements=[
+        BluetoothLERawAdvertisement(
+            address=261602360644300,
+            rssi=-96,
+            address_type=1,
+            data=bytes.fromhex("02011a020a0c0aff4c0010050a1484face"),
+        ),
+        BluetoothLERawAdvertisement(
+            address=211748016838317,
+            rssi=-66,
+            address_type=0,
+            data=bytes.fromhex("0201050716feff0900ff10"),
+        ),
+    ]
+)
+
+
+@pytest.fixture
+def publisher() -> Iterator[RingPublisher]:
+    """A minimum-size ring so tests wrap it quickly."""
+    publisher = RingPublisher(size=MIN_RING_SIZE)
+    yield publisher
+    publisher.close()
+
+
+def test_scanner_publishes_raw_and_decoded(publisher: RingPublisher) -> None:
+    """Both ingest paths publish; readers only see what follows attaching."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    scanner.set_ring_publisher(publisher)
+    scanner.async_on_raw_advertisements(BATCH)
+    reader = RingReader(publisher.name)
+    try:
+        assert reader.read() == []
+        scanner.async_on_raw_advertisements(BATCH)
+        decoded = BluetoothLEAdvertisement(
+            address=9049263188781,
+            rssi=-53,
+            address_type=0,
+            name="LOOKin",
+            service_uuids=[],
+            service_data={},
+            manufacturer_data={0x004C: b"\x10\x05"},
+        )
+        scanner.async_on_advertisement(decoded)
+        records = reader.read()
+        assert reader.read() == []
+        assert reader.published == publisher.records == 5
+    finally:
+        reader.close()
+    scanner.set_ring_publisher(None)
+    scanner.async_on_raw_advertisements(BATCH)
+    assert publisher.records == 5
+
+    first, second, third = records
+    assert first == RingRecord(
+        ESP_MAC_ADDRESS,
+        first.time,
+        261602360644300,
+        1,
+        -96,
+        bytes.fromhex("02011a020a0c0aff4c0010050a1484face"),
+    )
+    assert second.address == 211748016838317
+    assert second.time == first.time
+    assert third.address == 9049263188781
+    assert third.data == encode_advertisement_data(decoded)
+
+
+def test_ring_wraps_and_keeps_order(publisher: RingPublisher) -> None:
+    """Records keep flowing across many laps of a small ring."""
+    reader = RingReader(publisher.name)
+    try:
+        for lap in range(400):
+            publisher.publish_raw_advertisements(
+                f"proxy-{lap % 3}", float(lap), BATCH.advertisements
+            )
+            records = reader.read()
+            assert [record.time for record in records] == [float(lap)] * 2
+            assert records[0].source == f"proxy-{lap % 3}"
+        assert reader.overruns == 0
+    finally:
+        reader.close()
+
+
+def test_lapped_reader_counts_overrun(publisher: RingPublisher) -> None:
+    """A reader lapped by the writer resynchronizes instead of misparsing."""
+    reader = RingReader(publisher.name)
+    try:
+        for lap in range(200):
+            publisher.publish_raw_advertisements(
+                ESP_MAC_ADDRESS, float(lap), BATCH.advertisements
+            )
+        assert reader.read() == []
+        assert reader.overruns == 1
+        publisher.publish_raw_advertisements(
+            ESP_MAC_ADDRESS, 1000.0, BATCH.advertisements
+        )
+        assert [record.time for record in reader.read()] == [1000.0, 1000.0]
+    finally:
+        reader.close()
+
+
+def test_reader_in_another_process(publisher: RingPublisher) -> None:
+    """A separate process maps the ring and reads what is published."""
+    script = (
+        "import sys, time\n"
+        "from bleak_esphome.backend.ring import RingReader\n"
+        "reader = RingReader(sys.argv[1])\n"
+        "print('ready', flush=True)\n"
+        "records = []\n"
+        "deadline = time.monotonic() + 10\n"
+        "while len(records) < 4 and time.monotonic() < deadline:\n"
+        "    records += reader.read()\n"
+        "    time.sleep(0.001)\n"
+        "reader.close()\n"
+        "print(len(records), records[-1].address)\n"
+    )
+    with subprocess.Popen(  # noqa: S603 - our own interpreter and script
+        [sys.executable, "-c", script, publisher.name],
+        stdout=subprocess.PIPE,
+        text=True,
+    ) as process:
+        assert process.stdout is not None
+        assert process.stdout.readline().strip() == "ready"
+        publisher.publish_raw_advertisements(ESP_MAC_ADDRESS, 1.0, BATCH.advertisements)
+        publisher.publish_raw_advertisements(ESP_MAC_ADDRESS, 2.0, BATCH.advertisements)
+        output, _ = process.communicate(timeout=20)
+    assert output.split() == ["4", "211748016838317"]
+    # The reader exiting must not have destroyed the segment.
+    RingReader(publisher.name).close()
+
+
+def test_ring_rejects_bad_arguments(publisher: RingPublisher) -> None:
+    """Undersized rings and foreign segments are refused."""
+    with pytest.raises(ValueError, match="Ring size"):
+        RingPublisher(size=MIN_RING_SIZE - 1)
+    with pytest.raises(FileNotFoundError):
+        RingReader("bleak-esphome-no-such-ring")
+    foreign = SharedMemory(create=True, size=MIN_RING_SIZE)
+    try:
+        with pytest.raises(ValueError, match="not an advertisement ring"):
+            RingReader(foreign.name)
+    finally:
+        foreign.close()
+        foreign.unlink()
@@ -0,0 +1,137 @@
+from unittest.mock import MagicMock
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+from bleak.exc import BleakError
+from bleak_retry_connector import NO_RSSI_VALUE
+from bluetooth_data_tools import int_to_bluetooth_address
+from habluetooth import BluetoothScannerDevice
+
+from bleak_esphome.backend.client import ESPHomeClient, ESPHomeClientData
+from bleak_esphome.backend.device import ESPHomeBluetoothDevice
+from bleak_esphome.backend.router import ConnectionRouter
+from bleak_esphome.backend.scanner import ESPHomeScanner
+
+from .. import generate_ble_device
+from ._helpers import make_scanner
+
+TARGET = 261602360644300
+ADDRESS = int_to_bluetooth_address(TARGET)
+
+
+def _make_proxy(
+    source: str, router: ConnectionRouter, free: int = 3, rssi: int = -60
+) -> ESPHomeScanner:
+    """Build a bound proxy with ``free`` of 3 slots that hears the target."""
+    scanner = make_scanner(source, name=source)
+    scanner.set_bluetooth_device(
+        ESPHomeBluetoothDevice(
+            source,
+            source,
+            ble_connections_free=free,
+            ble_connections_limit=3,
+            available=True,
+        )
+    )
+    scanner.set_connection_router(router)
+    scanner.async_on_raw_advertisements(
+        BluetoothLERawAdvertisementsResponse(
+            advertisements=[
+                BluetoothLERawAdvertisement(
+                    address=TARGET, rssi=rssi, address_type=1, data=b"\x02\x01\x06"
+                )
+            ]
+        )
+    )
+    return scanner
+
+
+def _path(scanner: ESPHomeScanner) -> BluetoothScannerDevice:
+    """Return habluetooth's connection path to the target via ``scanner``."""
+    info = scanner._previous_service_info[ADDRESS]
+    return BluetoothScannerDevice(scanner, info.device, info.advertisement)
+
+
+@pytest.mark.asyncio
+async def test_router_prefers_idle_proxy_over_stronger_busy_one() -> None:
+    """Free slots and queued waiters outweigh a few dB of RSSI."""
+    router = ConnectionRouter()
+    busy = _make_proxy("busy", router, free=1, rssi=-55)
+    idle = _make_proxy("idle", router, free=3, rssi=-60)
+    assert router.async_route(ADDRESS) is idle
+
+    busy_score = _path(busy).score_connection_path(5)
+    idle_score = _path(idle).score_connection_path(5)
+    assert idle_score == pytest.approx(-54.0)
+    # habluetooth's own last-slot penalty applies before the router's terms.
+    assert busy_score == pytest.approx(-55.0 - 5 * 0.76)
+    busy._bluetooth_device._ble_connection_free_futures.append(MagicMock())
+    assert _path(busy).score_connection_path(5) == pytest.approx(-68.8)
+
+    busy._bluetooth_device.ble_connections_free = 0
+    assert _path(busy).score_connection_path(5) == NO_RSSI_VALUE
+    idle._bluetooth_device.available = False
+    assert router.async_route(ADDRESS) is None
+
+
+@pytest.mark.asyncio
+async def test_router_tracks_recent_success_rate() -> None:
+    """Failed connects lower a proxy's score until it succeeds again."""
+    router = ConnectionRouter(failure_penalty=20.0)
+    flaky = _make_proxy("flaky", router)
+    assert router.async_success_rate(flaky) == 1.0
+    flaky._finished_connecting(ADDRESS, False)
+    flaky._finished_connecting(ADDRESS, False)
+    assert router.async_success_rate(flaky) == pytest.approx(0.64)
+    # habluetooth charges the device's own failures; the router adds the rate.
+    assert router.async_score(flaky, ADDRESS) == pytest.approx(
+        -60 - 1.02 + 6.0 - 20.0 * 0.36
+    )
+    assert router.async_score(flaky, "AA:BB:CC:DD:EE:FF") == NO_RSSI_VALUE
+
+    flaky._finished_connecting(ADDRESS, True)
+    assert router.async_success_rate(flaky) == pytest.approx(0.712)
+    # A restart clears habluetooth's totals; the learned rate is kept.
+    flaky._clear_connection_history()
+    flaky._finished_connecting(ADDRESS, True)
+    assert router.async_success_rate(flaky) == pytest.approx(0.7696)
+
+
+@pytest.mark.asyncio
+async def test_client_reroutes_connect_that_would_queue(
+    client_data: ESPHomeClientData,
+) -> None:
+    """A connect to a full proxy fails fast when another proxy is free."""
+    router = ConnectionRouter()
+    full = _make_proxy("full", router, free=0, rssi=-50)
+    _make_proxy("free", router, free=2, rssi=-70)
+    client_data.bluetooth_device = full._bluetooth_device
+    client_data.scanner = full
+    client = ESPHomeClient(
+        generate_ble_device(ADDRESS, details={"source": "full", "address_type": 1}),
+        client_data=client_data,
+    )
+    with pytest.raises(BleakError, match="re-routing to free"):
+        await client.connect(False)
+    assert router.reroutes == 1
+    # habluetooth's wrapper records the refusal as a failure of this device
+    # on the full proxy; the router does not hold it against the proxy's rate.
+    full._finished_connecting(ADDRESS, False)
+    assert router.async_success_rate(full) == 1.0
+
+    full.set_connection_router(None)
+    assert full.connection_router is None
+    assert _path(full).score_connection_path(5) == NO_RSSI_VALUE
+
+
+def test_router_rejects_bad_arguments() -> None:
+    """Negative weights are refused."""
+    with pytest.raises(ValueError, match="Free slot bonus"):
+        ConnectionRouter(free_slot_bonus=-1)
+    with pytest.raises(ValueError, match="Waiter penalty"):
+        ConnectionRouter(waiter_penalty=-1)
+    with pytest.raises(ValueError, match="Failure penalty"):
+        ConnectionRouter(failure_penalty=-1)
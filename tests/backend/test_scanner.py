@@ -1,7 +1,7 @@
 import asyncio
 import logging
 from collections.abc import Callable
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 import pytest
 from aioesphomeapi import (
@@ -24,9 +24,15 @@ from habluetooth import (
 )
 
 from bleak_esphome.backend import scanner as scanner_module
+from bleak_esphome.backend.address import get_address_intern_stats
+from bleak_esphome.backend.batch import RawAdvertisementBatch
 from bleak_esphome.backend.client import ESPHomeClientData
 from bleak_esphome.backend.device import ESPHomeBluetoothDevice
+from bleak_esphome.backend.filters import AdvertisementFilter
+from bleak_esphome.backend.metrics import IngestMetricsSnapshot
 from bleak_esphome.backend.scanner import ESPHomeScanner
+from bleak_esphome.backend.shedding import SHED_SAMPLE, LoadShedder, LoopLagMonitor
+from bleak_esphome.backend.suppression import PayloadSuppressor
 
 from ._helpers import ESP_MAC_ADDRESS, ESP_NAME
 
@@ -92,6 +98,346 @@ def test_scanner_async_on_raw_advertisements(scanner: ESPHomeScanner) -> None:
     )
 
 
+def test_scanner_raw_advertisements_reuse_interned_objects(
+    scanner: ESPHomeScanner,
+) -> None:
+    """The raw ingest loop hands out interned MACs and shared details."""
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+            ),
+            BluetoothLERawAdvertisement(
+                address=246965243285491, rssi=-88, address_type=1, data=b"\x02\x01\x1a"
+            ),
+            BluetoothLERawAdvertisement(
+                address=211748016838317, rssi=-66, address_type=0, data=b"\x02\x01\x1a"
+            ),
+        ]
+    )
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+        scanner.async_on_raw_advertisements(adv)
+    calls = [call.args for call in on_raw.call_args_list]
+    first, second = calls[:3], calls[3:]
+    for before, after in zip(first, second, strict=True):
+        assert before[0] is after[0]
+        assert before[3] is after[3]
+    assert first[0][0] == int_to_bluetooth_address(261602360644300)
+    assert first[0][3] is first[1][3]
+    assert first[0][3] == {"address_type": 1}
+    assert first[2][3] == {"address_type": 0}
+
+
+def test_scanner_raw_ingest_counts_each_intern_miss_once(
+    scanner: ESPHomeScanner,
+) -> None:
+    """Per-ad and batch ingest count one miss per new address, then hits."""
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=address, rssi=-70, address_type=1, data=b"\x02\x01\x06"
+            )
+            for address in (0x0A0000000001, 0x0A0000000002)
+        ]
+    )
+    before = get_address_intern_stats()
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement"):
+        scanner._async_ingest_raw_advertisements(adv)
+        scanner._async_ingest_raw_advertisements(adv)
+    after = get_address_intern_stats()
+    assert (after.misses - before.misses, after.hits - before.hits) == (2, 2)
+
+    batched = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=0x0A0000000003, rssi=-70, address_type=1, data=b"\x02\x01\x06"
+            )
+        ]
+    )
+    scanner.set_raw_batch_handler(lambda batch: None)
+    scanner._async_ingest_raw_advertisements(batched)
+    scanner._async_ingest_raw_advertisements(batched)
+    final = get_address_intern_stats()
+    assert (final.misses - after.misses, final.hits - after.hits) == (1, 1)
+
+
+def test_scanner_details_for_unknown_address_type() -> None:
+    """Address types outside public/random get their own shared dict."""
+    details = scanner_module._details_for_address_type(7)
+    assert details == {"address_type": 7}
+    assert scanner_module._details_for_address_type(7) is details
+
+
+def test_scanner_raw_batch_handler_receives_parallel_arrays(
+    scanner: ESPHomeScanner,
+) -> None:
+    """A bound batch handler gets the whole batch in one call."""
+    batches: list[RawAdvertisementBatch] = []
+    scanner.set_raw_batch_handler(batches.append)
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+            ),
+            BluetoothLERawAdvertisement(
+                address=211748016838317, rssi=-66, address_type=0, data=b"\x02\x01\x1a"
+            ),
+        ]
+    )
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+    on_raw.assert_not_called()
+    assert len(batches) == 1
+    batch = batches[0]
+    assert len(batch) == 2
+    assert batch.source == ESP_MAC_ADDRESS
+    assert batch.addresses == [
+        int_to_bluetooth_address(261602360644300),
+        int_to_bluetooth_address(211748016838317),
+    ]
+    assert batch.rssis == [-96, -66]
+    assert batch.payloads == [b"\x02\x01\x04", b"\x02\x01\x1a"]
+    assert batch.address_types == [1, 0]
+
+    scanner.async_ingest_raw_batch(batch)
+    manager = get_manager()
+    info = manager.async_last_service_info(batch.addresses[1], True)
+    assert info is not None
+    assert info.rssi == -66
+    assert info.time == batch.time
+    assert info.device.details["address_type"] == 0
+
+    scanner.set_raw_batch_handler(None)
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+    assert on_raw.call_count == 2
+    assert len(batches) == 1
+
+
+def test_scanner_payload_suppressor_drops_repeats(scanner: ESPHomeScanner) -> None:
+    """A bound suppressor keeps repeated payloads away from habluetooth."""
+    suppressor = PayloadSuppressor(window=10.0)
+    scanner.set_payload_suppressor(suppressor)
+    assert scanner.payload_suppressor is suppressor
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+            ),
+            BluetoothLERawAdvertisement(
+                address=211748016838317, rssi=-66, address_type=0, data=b"\x02\x01\x1a"
+            ),
+        ]
+    )
+    changed = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-95, address_type=1, data=b"\x02\x01\x05"
+            ),
+            BluetoothLERawAdvertisement(
+                address=211748016838317, rssi=-67, address_type=0, data=b"\x02\x01\x1a"
+            ),
+        ]
+    )
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 2
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 2
+        scanner.async_on_raw_advertisements(changed)
+        assert on_raw.call_count == 3
+    assert on_raw.call_args.args[0] == int_to_bluetooth_address(261602360644300)
+    assert on_raw.call_args.args[2] == b"\x02\x01\x05"
+    assert on_raw.call_args.args[3] == {"address_type": 1}
+    assert suppressor.suppressed == 3
+    assert suppressor.passed == 3
+
+    batches: list[RawAdvertisementBatch] = []
+    scanner.set_raw_batch_handler(batches.append)
+    scanner.async_on_raw_advertisements(changed)
+    assert batches == []
+
+    scanner.set_payload_suppressor(None)
+    scanner.set_raw_batch_handler(None)
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+    assert on_raw.call_count == 2
+
+
+def test_scanner_advertisement_filter_runs_before_suppressor(
+    scanner: ESPHomeScanner,
+) -> None:
+    """Filtered advertisements never reach the suppressor or habluetooth."""
+    advertisement_filter = AdvertisementFilter(manufacturer_ids=[0x004C])
+    suppressor = PayloadSuppressor()
+    scanner.set_advertisement_filter(advertisement_filter)
+    scanner.set_payload_suppressor(suppressor)
+    assert scanner.advertisement_filter is advertisement_filter
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=211748016838317,
+                rssi=-66,
+                address_type=0,
+                data=bytes.fromhex("02011a020a0c0aff4c0010050a1484face"),
+            ),
+            BluetoothLERawAdvertisement(
+                address=277557927228479,
+                rssi=-66,
+                address_type=1,
+                data=bytes.fromhex("0201050716feff0900ff10"),
+            ),
+        ]
+    )
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+    assert on_raw.call_count == 1
+    assert on_raw.call_args.args[0] == int_to_bluetooth_address(211748016838317)
+    assert advertisement_filter.unmatched == 1
+    assert suppressor.passed == 1
+    scanner.set_advertisement_filter(None)
+    assert scanner._gates == (suppressor.should_forward,)
+
+
+def test_scanner_load_shedder_engages_with_lag(scanner: ESPHomeScanner) -> None:
+    """The shedder only reduces batches while the loop is lagging."""
+    monitor = LoopLagMonitor()
+    shedder = LoadShedder(monitor, SHED_SAMPLE, interval=10.0)
+    scanner.set_load_shedder(shedder)
+    assert scanner.load_shedder is shedder
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+            ),
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-95, address_type=1, data=b"\x02\x01\x05"
+            ),
+        ]
+    )
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 2
+        monitor.shedding = True
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 3
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 3
+        monitor.shedding = False
+        scanner.async_on_raw_advertisements(adv)
+        assert on_raw.call_count == 5
+    assert shedder.shed == 3
+    scanner.set_load_shedder(None)
+    assert scanner.load_shedder is None
+
+
+def test_scanner_ingest_metrics(scanner: ESPHomeScanner) -> None:
+    """Both ingest paths feed the per-proxy counters."""
+    adv = BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+            ),
+            BluetoothLERawAdvertisement(
+                address=211748016838317, rssi=-66, address_type=0, data=b"\x02\x01"
+            ),
+        ]
+    )
+    scanner.async_on_raw_advertisements(adv)
+    scanner.set_payload_suppressor(PayloadSuppressor())
+    scanner.async_on_raw_advertisements(adv)
+    scanner.set_raw_batch_handler(lambda batch: None)
+    scanner.set_payload_suppressor(None)
+    scanner.async_on_raw_advertisements(adv)
+    scanner.async_on_advertisement(
+        BluetoothLEAdvertisement(
+            address=261602360644300,
+            rssi=-72,
+            address_type=1,
+            name="decoded-device",
+            service_uuids=[],
+            service_data={},
+            manufacturer_data={},
+        )
+    )
+    snapshot = scanner.async_get_ingest_metrics()
+    assert snapshot.source == ESP_MAC_ADDRESS
+    assert snapshot.batches == 4
+    assert snapshot.advertisements == 7
+    assert snapshot.bytes_received == 15
+    assert snapshot.batch_sizes["2-3"] == 3
+    assert snapshot.batch_sizes["1"] == 1
+    assert snapshot.raw_seconds == 0.0
+    assert snapshot.decoded_seconds == 0.0
+
+
+def test_scanner_ingest_timing(scanner: ESPHomeScanner) -> None:
+    """Timing only accumulates while enabled."""
+    scanner.set_ingest_timing(True)
+    scanner.async_on_raw_advertisements(
+        BluetoothLERawAdvertisementsResponse(
+            advertisements=[
+                BluetoothLERawAdvertisement(
+                    address=261602360644300, rssi=-96, address_type=1, data=b"\x02"
+                ),
+            ]
+        )
+    )
+    scanner.async_on_advertisement(
+        BluetoothLEAdvertisement(
+            address=261602360644300,
+            rssi=-72,
+            address_type=1,
+            name="decoded-device",
+            service_uuids=[],
+            service_data={},
+            manufacturer_data={},
+        )
+    )
+    snapshot = scanner.async_get_ingest_metrics()
+    assert snapshot.raw_seconds > 0
+    assert snapshot.decoded_seconds > 0
+    scanner.set_ingest_timing(False)
+    scanner.async_on_advertisement(
+        BluetoothLEAdvertisement(
+            address=261602360644300,
+            rssi=-72,
+            address_type=1,
+            name="decoded-device",
+            service_uuids=[],
+            service_data={},
+            manufacturer_data={},
+        )
+    )
+    assert scanner.async_get_ingest_metrics().decoded_seconds == (
+        snapshot.decoded_seconds
+    )
+
+
+@pytest.mark.asyncio
+async def test_scanner_subscribe_ingest_metrics(
+    scanner: ESPHomeScanner, caplog: pytest.LogCaptureFixture
+) -> None:
+    """Subscribers get periodic snapshots until they unsubscribe."""
+    snapshots: list[IngestMetricsSnapshot] = []
+
+    def _callback(snapshot: IngestMetricsSnapshot) -> None:
+        snapshots.append(snapshot)
+        if len(snapshots) == 2:
+            raise ValueError("boom")
+
+    unsubscribe = scanner.async_subscribe_ingest_metrics(_callback, 0.01)
+    while len(snapshots) < 3:
+        await asyncio.sleep(0.01)
+    unsubscribe()
+    count = len(snapshots)
+    await asyncio.sleep(0.05)
+    assert len(snapshots) == count
+    assert all(snapshot.source == ESP_MAC_ADDRESS for snapshot in snapshots)
+    assert "Error pushing ingest metrics" in caplog.text
+
+
 def test_scanner_async_update_scanner_state(
     scanner: ESPHomeScanner, mock_client: APIClient
 ) -> None:
@@ -394,26 +740,58 @@ async def test_async_request_active_window_restore_failure_swallowed(
 
 
 @pytest.mark.asyncio
-async def test_async_request_active_window_rejects_overlap(
+async def test_async_request_active_window_merges_overlap(
     scanner: ESPHomeScanner, mock_client: APIClient
 ) -> None:
-    """A second request while a window is open returns False without flipping."""
+    """Overlapping requests extend one window: one flip, one restore."""
     mock_client.bluetooth_scanner_set_mode = MagicMock()
     scanner.set_client(mock_client)
-    # Long duration so the first window is still inside asyncio.sleep
-    # when the second request arrives. The lock is held for the whole
-    # sleep, so the second call sees .locked() and fast-fails.
-    first = asyncio.create_task(scanner.async_request_active_window(3600.0))
-    # Wait until the first task has run the entry set_mode call;
-    # next line in the worker is the asyncio.sleep that holds the lock.
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    first = asyncio.create_task(scanner.async_request_active_window(0.02))
     while mock_client.bluetooth_scanner_set_mode.call_count == 0:
         await asyncio.sleep(0)
-    assert await scanner.async_request_active_window(0.0) is False
-    # Only the first task has called bluetooth_scanner_set_mode (the entry flip).
+    # One request extends the window, one falls inside it.
+    results = await asyncio.gather(
+        first,
+        scanner.async_request_active_window(0.05),
+        scanner.async_request_active_window(0.0),
+    )
+    assert results == [True, True, True]
+    assert loop.time() - start >= 0.05
+    calls = [c.args for c in mock_client.bluetooth_scanner_set_mode.call_args_list]
+    assert calls == [(BluetoothScannerMode.ACTIVE,), (BluetoothScannerMode.PASSIVE,)]
+    assert scanner.merged_active_windows == 2
+    # The window is closed; the next request flips the proxy again.
+    assert await scanner.async_request_active_window(0.0) is True
+    assert mock_client.bluetooth_scanner_set_mode.call_count == 4
+    assert scanner.merged_active_windows == 2
+
+
+@pytest.mark.asyncio
+async def test_async_request_active_window_merged_request_cancellation(
+    scanner: ESPHomeScanner, mock_client: APIClient
+) -> None:
+    """A cancelled merged request leaves the window open; the opener ends it."""
+    mock_client.bluetooth_scanner_set_mode = MagicMock()
+    scanner.set_client(mock_client)
+    opener = asyncio.create_task(scanner.async_request_active_window(3600.0))
+    while mock_client.bluetooth_scanner_set_mode.call_count == 0:
+        await asyncio.sleep(0)
+    quitter = asyncio.create_task(scanner.async_request_active_window(1.0))
+    waiter = asyncio.create_task(scanner.async_request_active_window(1.0))
+    await asyncio.sleep(0)
+    quitter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await quitter
     assert mock_client.bluetooth_scanner_set_mode.call_count == 1
-    first.cancel()
+    # Cutting the window short reports False to the requests merged into it.
+    opener.cancel()
     with pytest.raises(asyncio.CancelledError):
-        await first
+        await opener
+    assert await waiter is False
+    calls = [c.args for c in mock_client.bluetooth_scanner_set_mode.call_args_list]
+    assert calls == [(BluetoothScannerMode.ACTIVE,), (BluetoothScannerMode.PASSIVE,)]
 
 
 @pytest.mark.asyncio
@@ -721,3 +1099,68 @@ async def test_subscription_watchdog_rewarns_periodically(
     # One retry delay is patched in, so attempt 0 warns (escalation phase)
     # and attempt `interval` warns again (periodic re-warn).
     assert len(warnings) == 2
+
+
+def test_pause_and_resume_advertisements(scanner: ESPHomeScanner) -> None:
+    """Pausing cancels the bound subscription; resuming sends a new one."""
+    unsubscribe, resubscribed = MagicMock(), MagicMock()
+    subscribe = MagicMock(return_value=resubscribed)
+    # Nothing bound: nothing to pause.
+    scanner.async_pause_advertisements()
+    assert scanner.advertisements_paused is False
+
+    scanner.set_advertisement_subscription(subscribe, unsubscribe)
+    scanner.async_resume_advertisements()
+    subscribe.assert_not_called()
+    scanner.async_pause_advertisements()
+    scanner.async_pause_advertisements()
+    unsubscribe.assert_called_once()
+    assert scanner.advertisements_paused is True
+
+    scanner.async_resume_advertisements()
+    subscribe.assert_called_once()
+    assert scanner.advertisements_paused is False
+    scanner.async_pause_advertisements()
+    resubscribed.assert_called_once()
+
+
+def test_pause_and_resume_survive_dead_connection(scanner: ESPHomeScanner) -> None:
+    """A lost connection leaves a pause in place and a resume pending."""
+    subscribe = MagicMock(side_effect=APIConnectionError("connection lost"))
+    unsubscribe = MagicMock(side_effect=APIConnectionError("connection lost"))
+    scanner.set_advertisement_subscription(subscribe, unsubscribe)
+    scanner.async_pause_advertisements()
+    assert scanner.advertisements_paused is True
+    scanner.async_resume_advertisements()
+    subscribe.assert_called_once()
+    assert scanner.advertisements_paused is True
+
+
+@pytest.mark.asyncio
+async def test_pause_stops_and_resume_rearms_watchdog(
+    scanner: ESPHomeScanner, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """A paused proxy sends no state, so the watchdog sits out the pause."""
+    resubscribe = MagicMock()
+    scanner.set_advertisement_subscription(resubscribe, MagicMock())
+    task, unsetup = _arm_watchdog(scanner, monkeypatch, resubscribe)
+    scanner.async_pause_advertisements()
+    assert scanner._subscription_watchdog_task is None
+    with pytest.raises(asyncio.CancelledError):
+        await task
+    resubscribe.assert_not_called()
+
+    scanner.async_resume_advertisements()
+    resumed = scanner._subscription_watchdog_task
+    assert resumed is not None
+    resubscribe.assert_called_once()
+    while resubscribe.call_count < 2:
+        await asyncio.sleep(0)
+    scanner.async_update_scanner_state(_RUNNING_PASSIVE_STATE)
+    await asyncio.wait_for(resumed, timeout=1)
+
+    # Resuming after unsetup does not start a new watchdog.
+    unsetup()
+    scanner.async_pause_advertisements()
+    scanner.async_resume_advertisements()
+    assert scanner._subscription_watchdog_task is None
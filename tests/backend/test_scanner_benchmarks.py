@@ -3,13 +3,18 @@ from aioesphomeapi import (
     BluetoothLERawAdvertisement,
     BluetoothLERawAdvertisementsResponse,
 )
+from bluetooth_data_tools import int_to_bluetooth_address
+from bluetooth_data_tools import monotonic_time_coarse as MONOTONIC_TIME
 from habluetooth import (
     HaBluetoothConnector,
 )
 from pytest_codspeed import BenchmarkFixture
 
 from bleak_esphome.backend.client import ESPHomeClientData
+from bleak_esphome.backend.filters import AdvertisementFilter
+from bleak_esphome.backend.ring import RingPublisher, RingReader
 from bleak_esphome.backend.scanner import ESPHomeScanner
+from bleak_esphome.backend.suppression import PayloadSuppressor
 
 ESP_MAC_ADDRESS = "AA:BB:CC:DD:EE:FF"
 ESP_NAME = "proxy"
@@ -200,3 +205,191 @@ def test_scanner_real_adv_data(
     def _benchmark():
         for _ in range(1000):
             scanner.async_on_raw_advertisements(adv)
+
+
+# 16 batches x 20 ads = 320 distinct devices, more than the 256 entry
+# lru_cache behind int_to_bluetooth_address, like a host fed by many proxies.
+FLEET_BATCHES = [
+    BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=246965243285491 + batch * 20 + i,
+                rssi=-60 - i,
+                address_type=i & 1,
+                data=b"\x02\x01\x1a\x1b\xffu\x00B\x04\x01\x01o\xe0\x8d\x17\xe7\x0f\xf3\xe2\x8d\x17\xe7\x0f\xf2(\x00\x00\x00\x00\x00\x00",
+            )
+            for i in range(20)
+        ]
+    )
+    for batch in range(16)
+]
+
+
+def _legacy_on_raw_advertisements(
+    scanner: ESPHomeScanner, raw: BluetoothLERawAdvertisementsResponse
+) -> None:
+    """Ingest loop before interning, kept as the before/after baseline."""
+    now = MONOTONIC_TIME()
+    advertisements = raw.advertisements
+    on_raw = scanner._async_on_raw_advertisement
+    for i in range(len(advertisements)):
+        adv = advertisements[i]
+        on_raw(
+            int_to_bluetooth_address(adv.address),
+            adv.rssi,
+            adv.data,
+            {"address_type": adv.address_type},
+            now,
+        )
+
+
+def test_scanner_fleet_ingest_legacy_baseline(benchmark: BenchmarkFixture) -> None:
+    """Benchmark the pre-interning ingest loop across a fleet-sized population."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(50):
+            for batch in FLEET_BATCHES:
+                _legacy_on_raw_advertisements(scanner, batch)
+
+
+def test_scanner_fleet_ingest_interned(benchmark: BenchmarkFixture) -> None:
+    """Benchmark the interned ingest loop across a fleet-sized population."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(50):
+            for batch in FLEET_BATCHES:
+                scanner.async_on_raw_advertisements(batch)
+
+
+def _sized_batch(size: int) -> BluetoothLERawAdvertisementsResponse:
+    """Build a batch of ``size`` advertisements from distinct devices."""
+    return BluetoothLERawAdvertisementsResponse(
+        advertisements=[
+            BluetoothLERawAdvertisement(
+                address=246965243285491 + i,
+                rssi=-60 - i,
+                address_type=1,
+                data=b"\x02\x01\x1a\x1b\xffu\x00B\x04\x01\x01o\xe0\x8d\x17\xe7\x0f\xf3\xe2\x8d\x17\xe7\x0f\xf2(\x00\x00\x00\x00\x00\x00",
+            )
+            for i in range(size)
+        ]
+    )
+
+
+@pytest.mark.parametrize("size", [2, 6, 32])
+def test_scanner_per_ad_delivery(benchmark: BenchmarkFixture, size: int) -> None:
+    """Benchmark per-advertisement delivery into habluetooth."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    adv = _sized_batch(size)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(1000):
+            scanner.async_on_raw_advertisements(adv)
+
+
+@pytest.mark.parametrize("size", [2, 6, 32])
+def test_scanner_batch_delivery(benchmark: BenchmarkFixture, size: int) -> None:
+    """
+    Benchmark whole-batch delivery into habluetooth through a batch handler.
+
+    The handler feeds each batch back with ``async_ingest_raw_batch``, so
+    both paths end in the same habluetooth callback per advertisement and
+    only the conversion in between differs.
+    """
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    scanner.set_raw_batch_handler(scanner.async_ingest_raw_batch)
+    adv = _sized_batch(size)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(1000):
+            scanner.async_on_raw_advertisements(adv)
+
+
+def test_scanner_beacon_flood_suppressed(benchmark: BenchmarkFixture) -> None:
+    """Benchmark a duplicate-heavy beacon batch with payload suppression."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    scanner.set_payload_suppressor(PayloadSuppressor(window=3600.0))
+    adv = _sized_batch(6)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(1000):
+            scanner.async_on_raw_advertisements(adv)
+
+
+def test_scanner_pushdown_filter(benchmark: BenchmarkFixture) -> None:
+    """Benchmark a batch where the pushdown filter rejects every device."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    scanner.set_advertisement_filter(AdvertisementFilter(manufacturer_ids=[0x004C]))
+    adv = _sized_batch(6)
+
+    @benchmark
+    def _benchmark():
+        for _ in range(1000):
+            scanner.async_on_raw_advertisements(adv)
+
+
+def _rotating_batches(count: int) -> list[BluetoothLERawAdvertisementsResponse]:
+    """Build batches whose payloads carry a changing counter, like sensors."""
+    return [
+        BluetoothLERawAdvertisementsResponse(
+            advertisements=[
+                BluetoothLERawAdvertisement(
+                    address=246965243285491 + i,
+                    rssi=-60 - i,
+                    address_type=1,
+                    data=b"\x02\x01\x1a\x0b\xffu\x00B\x04\x01\x01"
+                    + (n * 6 + i).to_bytes(4, "little"),
+                )
+                for i in range(6)
+            ]
+        )
+        for n in range(count)
+    ]
+
+
+def test_scanner_pushdown_filter_rotating_payloads(
+    benchmark: BenchmarkFixture,
+) -> None:
+    """Benchmark the pushdown filter on payloads that never repeat."""
+    connector = HaBluetoothConnector(ESPHomeClientData, ESP_MAC_ADDRESS, lambda: True)
+    scanner = ESPHomeScanner(ESP_MAC_ADDRESS, ESP_NAME, connector, True)
+    scanner.set_advertisement_filter(AdvertisementFilter(manufacturer_ids=[0x004C]))
+    batches = _rotating_batches(1000)
+
+    @benchmark
+    def _benchmark():
+        for adv in batches:
+            scanner.async_on_raw_advertisements(adv)
+
+
+def test_ring_publish_and_read(benchmark: BenchmarkFixture) -> None:
+    """Benchmark publishing fleet batches to a ring and draining a reader."""
+    publisher = RingPublisher()
+    reader = RingReader(publisher.name)
+    try:
+
+        @benchmark
+        def _benchmark():
+            for _ in range(100):
+                for batch in FLEET_BATCHES:
+                    publisher.publish_raw_advertisements(
+                        ESP_MAC_ADDRESS, 1.0, batch.advertisements
+                    )
+                reader.read()
+
+    finally:
+        reader.close()
+        publisher.close()
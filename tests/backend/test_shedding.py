@@ -0,0 +1,157 @@
+import asyncio
+import logging
+import time
+
+import pytest
+
+from bleak_esphome.backend.batch import RawAdvertisementBatch
+from bleak_esphome.backend.shedding import (
+    SHED_DROP,
+    SHED_NEWEST,
+    SHED_SAMPLE,
+    LoadShedder,
+    LoopLagMonitor,
+)
+
+SOURCE = "AA:BB:CC:DD:EE:FF"
+DEVICE_A = "11:22:33:44:55:66"
+DEVICE_B = "11:22:33:44:55:77"
+
+
+def _batch(now: float, *ads: tuple[str, int, bytes]) -> RawAdvertisementBatch:
+    return RawAdvertisementBatch(
+        SOURCE,
+        now,
+        [address for address, _, _ in ads],
+        [rssi for _, rssi, _ in ads],
+        [data for _, _, data in ads],
+        [1] * len(ads),
+    )
+
+
+def _shedding_monitor() -> LoopLagMonitor:
+    monitor = LoopLagMonitor(shed_threshold=0.1, recover_threshold=0.01)
+    monitor.shedding = True
+    return monitor
+
+
+def test_monitor_hysteresis_logs_and_counts(caplog: pytest.LogCaptureFixture) -> None:
+    """Shedding starts above the shed threshold and ends below recovery."""
+    monitor = LoopLagMonitor(shed_threshold=0.1, recover_threshold=0.02)
+    monitor.async_record_lag(0.2)
+    assert not monitor.shedding
+    with caplog.at_level(logging.WARNING):
+        for _ in range(5):
+            monitor.async_record_lag(0.5)
+    assert monitor.shedding
+    assert "shedding advertisements" in caplog.text
+    # Between the thresholds the state holds.
+    for _ in range(5):
+        monitor.async_record_lag(0.05)
+    assert monitor.shedding
+    with caplog.at_level(logging.WARNING):
+        for _ in range(10):
+            monitor.async_record_lag(0.0)
+    assert not monitor.shedding
+    assert "stopped shedding" in caplog.text
+    assert monitor.transitions == 2
+    assert monitor.shed_seconds >= 0
+
+
+def test_monitor_rejects_bad_thresholds() -> None:
+    """The recover threshold must sit below the shed threshold."""
+    with pytest.raises(ValueError, match="Shed threshold"):
+        LoopLagMonitor(shed_threshold=0)
+    with pytest.raises(ValueError, match="Recover threshold"):
+        LoopLagMonitor(shed_threshold=0.1, recover_threshold=0.1)
+
+
+@pytest.mark.asyncio
+async def test_monitor_samples_running_loop() -> None:
+    """A callback blocking the loop shows up as lag."""
+    monitor = LoopLagMonitor(shed_threshold=0.01, recover_threshold=0.001)
+    stop = monitor.async_start(0.01)
+    asyncio.get_running_loop().call_soon(time.sleep, 0.2)
+    for _ in range(5):
+        await asyncio.sleep(0.02)
+    stop()
+    assert monitor.lag > 0
+    assert monitor.shedding
+
+
+def test_shedder_passes_through_when_healthy() -> None:
+    """Without lag the shedder is not engaged and forwards untouched."""
+    shedder = LoadShedder(LoopLagMonitor())
+    batch = _batch(1.0, (DEVICE_A, -60, b"\x01"))
+    assert not shedder.engaged
+    assert shedder.shed_batch(batch) is batch
+
+
+def test_shedder_newest_coalesces_per_interval() -> None:
+    """The newest advertisement per address is released once per interval."""
+    monitor = _shedding_monitor()
+    shedder = LoadShedder(monitor, SHED_NEWEST, interval=1.0)
+    assert not shedder.shed_batch(_batch(10.0, (DEVICE_A, -60, b"\x01")))
+    assert not shedder.shed_batch(
+        _batch(10.4, (DEVICE_A, -61, b"\x02"), (DEVICE_B, -70, b"\x03"))
+    )
+    released = shedder.shed_batch(_batch(11.0, (DEVICE_A, -62, b"\x04")))
+    assert released.addresses == [DEVICE_A, DEVICE_B]
+    assert released.payloads == [b"\x02", b"\x03"]
+    assert released.time == 11.0
+    assert shedder.shed == 1
+    assert shedder.forwarded == 2
+
+    # Recovery releases what is still held ahead of the live batch.
+    monitor.shedding = False
+    assert shedder.engaged
+    out = shedder.shed_batch(_batch(11.2, (DEVICE_B, -71, b"\x05")))
+    assert out.addresses == [DEVICE_A, DEVICE_B]
+    assert out.payloads == [b"\x04", b"\x05"]
+    assert not shedder.engaged
+
+
+def test_shedder_newest_counts_evicted_advertisements() -> None:
+    """An advertisement pushed out of a full table counts as shed."""
+    monitor = _shedding_monitor()
+    shedder = LoadShedder(monitor, SHED_NEWEST, interval=1.0, max_addresses=1)
+    assert not shedder.shed_batch(_batch(10.0, (DEVICE_A, -60, b"\x01")))
+    assert not shedder.shed_batch(_batch(10.4, (DEVICE_B, -70, b"\x02")))
+    assert shedder.shed == 1
+    monitor.shedding = False
+    out = shedder.shed_batch(_batch(10.5, (DEVICE_A, -61, b"\x03")))
+    assert out.payloads == [b"\x02", b"\x03"]
+    assert (shedder.shed, shedder.forwarded) == (1, 1)
+
+
+def test_shedder_sample_forwards_first_per_interval() -> None:
+    """Sampling forwards one advertisement per address per interval."""
+    shedder = LoadShedder(_shedding_monitor(), SHED_SAMPLE, interval=1.0)
+    out = shedder.shed_batch(
+        _batch(10.0, (DEVICE_A, -60, b"\x01"), (DEVICE_A, -60, b"\x02"))
+    )
+    assert out.payloads == [b"\x01"]
+    assert not shedder.shed_batch(_batch(10.5, (DEVICE_A, -60, b"\x03")))
+    assert shedder.shed_batch(_batch(11.0, (DEVICE_A, -60, b"\x04"))).payloads == [
+        b"\x04"
+    ]
+    assert shedder.shed == 2
+    assert shedder.forwarded == 2
+
+
+def test_shedder_drop() -> None:
+    """The drop policy forwards nothing while shedding."""
+    shedder = LoadShedder(_shedding_monitor(), SHED_DROP)
+    assert not shedder.shed_batch(_batch(10.0, (DEVICE_A, -60, b"\x01")))
+    assert shedder.shed == 1
+
+
+def test_shedder_rejects_bad_config() -> None:
+    """Unknown policies and non-positive sizes are rejected."""
+    monitor = LoopLagMonitor()
+    with pytest.raises(ValueError, match="Unknown shedding policy"):
+        LoadShedder(monitor, "oldest")
+    with pytest.raises(ValueError, match="interval"):
+        LoadShedder(monitor, interval=0)
+    with pytest.raises(ValueError, match="table size"):
+        LoadShedder(monitor, max_addresses=0)
@@ -0,0 +1,103 @@
+import asyncio
+from unittest.mock import MagicMock
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+
+from bleak_esphome.backend.scanner import ESPHomeScanner
+from bleak_esphome.backend.stall import StallDetector, StallEvent
+
+from ._helpers import ESP_MAC_ADDRESS, make_scanner
+
+
+def _hear(scanner: ESPHomeScanner) -> None:
+    """Feed ``scanner`` one advertisement."""
+    scanner.async_on_raw_advertisements(
+        BluetoothLERawAdvertisementsResponse(
+            advertisements=[
+                BluetoothLERawAdvertisement(
+                    address=0x112233445566, rssi=-60, address_type=1, data=b""
+                )
+            ]
+        )
+    )
+
+
+def test_stall_threshold_follows_learned_rate() -> None:
+    """A stall is ``sensitivity`` missed advertisements at the learned rate."""
+    detector = StallDetector(sensitivity=30.0, min_gap=5.0, warmup=20.0)
+    assert detector.async_sample("proxy", 0.0, 0) is None
+    for second in range(10, 40, 10):
+        assert detector.async_sample("proxy", second, second * 2) is None
+    assert detector.baseline_rate == pytest.approx(2.0)
+    assert detector.threshold == pytest.approx(15.0)
+
+    assert detector.async_sample("proxy", 40.0, 60) is None
+    assert detector.async_sample("proxy", 44.0, 60) is None
+    event = detector.async_sample("proxy", 45.0, 60)
+    assert event == StallEvent("proxy", 15.0, 2.0, 15.0)
+    # Reported once per stall, and cleared when traffic returns.
+    assert detector.async_sample("proxy", 60.0, 60) is None
+    assert (detector.stalled, detector.stalls) == (True, 1)
+    assert detector.async_sample("proxy", 65.0, 70) is None
+    assert detector.stalled is False
+
+    # Before any traffic was seen only the floor applies.
+    assert StallDetector(min_gap=5.0).threshold == 5.0
+
+
+def test_stall_waits_for_warmup() -> None:
+    """No verdict before ``warmup`` seconds of traffic were observed."""
+    detector = StallDetector(sensitivity=1.0, min_gap=1.0, warmup=30.0)
+    detector.async_sample("proxy", 0.0, 0)
+    detector.async_sample("proxy", 10.0, 100)
+    assert detector.async_sample("proxy", 1000.0, 100) is None
+    detector.async_reset(1000.0, 100)
+    assert detector.async_sample("proxy", 1001.0, 100) is None
+
+
+def test_stall_detector_rejects_bad_arguments() -> None:
+    """Out of range settings are refused."""
+    with pytest.raises(ValueError, match="Stall sensitivity"):
+        StallDetector(sensitivity=0)
+    with pytest.raises(ValueError, match="Minimum stall gap"):
+        StallDetector(min_gap=0)
+    with pytest.raises(ValueError, match="Stall warmup"):
+        StallDetector(warmup=-1)
+
+
+@pytest.mark.asyncio
+async def test_scanner_reports_stall_and_resubscribes() -> None:
+    """A silent proxy is reported and its subscription re-sent."""
+    scanner = make_scanner()
+    resubscribe = MagicMock()
+    scanner.set_resubscribe_advertisements(resubscribe)
+    events: list[StallEvent] = []
+    detector = StallDetector(min_gap=0.02, warmup=0.0)
+    unwatch = scanner.async_watch_for_stalls(
+        events.append, detector, interval=0.005, resubscribe=True
+    )
+    _hear(scanner)
+    await asyncio.sleep(0.1)
+    unwatch()
+    assert len(events) == 1
+    assert events[0].source == ESP_MAC_ADDRESS
+    resubscribe.assert_called_once()
+
+
+@pytest.mark.asyncio
+async def test_scanner_ignores_silence_while_paused() -> None:
+    """A paused subscription is expected to be silent."""
+    scanner = make_scanner()
+    scanner.set_advertisement_subscription(MagicMock(), MagicMock())
+    scanner.async_pause_advertisements()
+    callback = MagicMock()
+    unwatch = scanner.async_watch_for_stalls(
+        callback, StallDetector(min_gap=0.01, warmup=0.0), interval=0.005
+    )
+    await asyncio.sleep(0.05)
+    unwatch()
+    callback.assert_not_called()
@@ -0,0 +1,67 @@
+import pytest
+
+from bleak_esphome.backend.suppression import PayloadSuppressor
+
+ADDRESS = 0x112233445566
+PAYLOAD = b"\x02\x01\x06\x03\xff\x4c\x00"
+
+
+def test_identical_payload_suppressed_within_window() -> None:
+    """A repeat inside the window with a steady RSSI is dropped."""
+    suppressor = PayloadSuppressor(window=1.0, rssi_threshold=5)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.0)
+    assert not suppressor.should_forward(ADDRESS, -72, PAYLOAD, 100.5)
+    assert not suppressor.should_forward(ADDRESS, -65, PAYLOAD, 100.9)
+    assert suppressor.passed == 1
+    assert suppressor.suppressed == 2
+
+
+def test_repeat_forwarded_after_window() -> None:
+    """The window runs from the last forward, so a device refreshes."""
+    suppressor = PayloadSuppressor(window=1.0)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.0)
+    assert not suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.8)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 101.0)
+    assert not suppressor.should_forward(ADDRESS, -70, PAYLOAD, 101.5)
+
+
+def test_rssi_move_beyond_threshold_forwarded() -> None:
+    """An RSSI jump past the threshold is forwarded and becomes the reference."""
+    suppressor = PayloadSuppressor(window=1.0, rssi_threshold=5)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.0)
+    assert suppressor.should_forward(ADDRESS, -76, PAYLOAD, 100.1)
+    assert not suppressor.should_forward(ADDRESS, -80, PAYLOAD, 100.2)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.3)
+
+
+def test_changed_payload_forwarded() -> None:
+    """A different payload for the same address always passes."""
+    suppressor = PayloadSuppressor()
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.0)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD + b"\x01", 100.1)
+    assert suppressor.should_forward(ADDRESS + 1, -70, PAYLOAD, 100.1)
+
+
+def test_table_bounded_and_clear() -> None:
+    """Evicted or cleared addresses have their next advertisement forwarded."""
+    suppressor = PayloadSuppressor(max_addresses=1)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.0)
+    assert suppressor.should_forward(ADDRESS + 1, -70, PAYLOAD, 100.0)
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.1)
+    assert not suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.2)
+    suppressor.clear()
+    assert suppressor.should_forward(ADDRESS, -70, PAYLOAD, 100.3)
+
+
+@pytest.mark.parametrize(
+    ("kwargs", "match"),
+    [
+        ({"window": 0}, "window must be positive"),
+        ({"rssi_threshold": -1}, "must not be negative"),
+        ({"max_addresses": 0}, "table size must be positive"),
+    ],
+)
+def test_invalid_configuration_rejected(kwargs: dict[str, float], match: str) -> None:
+    """Nonsensical settings raise instead of silently misbehaving."""
+    with pytest.raises(ValueError, match=match):
+        PayloadSuppressor(**kwargs)
@@ -0,0 +1,53 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from bleak_esphome.backend.threadsafe import FREE_THREADED, LockedLRU
+
+
+def test_locked_lru_mapping_api() -> None:
+    """The wrapper behaves like the LRU it guards."""
+    lru: LockedLRU[int, str] = LockedLRU(2)
+    lru[1] = "one"
+    lru[2] = "two"
+    assert lru.get(1) == "one"
+    lru[3] = "three"
+    # 2 was least recently used.
+    assert 2 not in lru
+    assert sorted(lru) == [1, 3]
+    assert len(lru) == 2
+    assert lru[3] == "three"
+    assert lru.get(2, "gone") == "gone"
+    assert lru.pop(1) == "one"
+    assert lru.pop(1, None) is None
+    del lru[3]
+    with pytest.raises(KeyError):
+        lru[3]
+    assert lru.get_stats()[0] >= 1
+    lru.set_size(10)
+    assert lru.get_size() == 10
+    lru[4] = "four"
+    lru.clear()
+    assert not lru
+
+
+def test_locked_lru_under_contention() -> None:
+    """Threads interning overlapping keys never exceed the bound."""
+    lru: LockedLRU[int, str] = LockedLRU(256)
+
+    def _intern(offset: int) -> None:
+        for key in range(offset, offset + 2000):
+            if lru.get(key % 300) is None:
+                lru[key % 300] = str(key % 300)
+
+    with ThreadPoolExecutor(8) as executor:
+        list(executor.map(_intern, range(0, 16000, 2000)))
+    assert len(lru) == 256
+    assert all(lru.get(key) in (None, str(key)) for key in range(300))
+
+
+def test_free_threaded_flag_matches_interpreter() -> None:
+    """The flag reflects whether the GIL is really off."""
+    import sys  # noqa: PLC0415
+
+    assert FREE_THREADED is (not getattr(sys, "_is_gil_enabled", lambda: True)())
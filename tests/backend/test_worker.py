@@ -0,0 +1,214 @@
+import asyncio
+import threading
+from unittest.mock import patch
+
+import pytest
+from aioesphomeapi import (
+    BluetoothLERawAdvertisement,
+    BluetoothLERawAdvertisementsResponse,
+)
+from bluetooth_data_tools import int_to_bluetooth_address
+
+from bleak_esphome.backend.batch import RawAdvertisementBatch
+from bleak_esphome.backend.scanner import ESPHomeScanner
+from bleak_esphome.backend.shedding import SHED_DROP, LoadShedder, LoopLagMonitor
+from bleak_esphome.backend.suppression import PayloadSuppressor
+from bleak_esphome.backend.worker import IngestWorker, IngestWorkerPool
+
+from ._helpers import ESP_MAC_ADDRESS, make_scanner
+
+ADV = BluetoothLERawAdvertisementsResponse(
+    advertisements=[
+        BluetoothLERawAdvertisement(
+            address=261602360644300, rssi=-96, address_type=1, data=b"\x02\x01\x04"
+        ),
+        BluetoothLERawAdvertisement(
+            address=211748016838317, rssi=-66, address_type=0, data=b"\x02\x01\x1a"
+        ),
+    ]
+)
+LATER = BluetoothLERawAdvertisementsResponse(
+    advertisements=[
+        BluetoothLERawAdvertisement(
+            address=261602360644300, rssi=-50, address_type=1, data=b"\x02\x01\x06"
+        ),
+    ]
+)
+
+
+async def _drain(worker: IngestWorker, batches: int) -> None:
+    """Wait until ``batches`` converted batches reached the loop."""
+    for _ in range(200):
+        if worker.batches >= batches:
+            return
+        await asyncio.sleep(0.005)
+    raise AssertionError(f"only {worker.batches} of {batches} batches delivered")
+
+
+@pytest.mark.asyncio
+async def test_worker_converts_off_loop_and_delivers_on_loop() -> None:
+    """Stages run on the worker thread; habluetooth is fed on the loop."""
+    scanner = make_scanner()
+    worker = IngestWorker()
+    worker.async_start()
+    scanner.set_ingest_worker(worker)
+    gate_threads: set[int] = set()
+
+    class _RecordingSuppressor(PayloadSuppressor):
+        __slots__ = ()
+
+        def should_forward(
+            self, address: int, rssi: int, data: bytes, now: float
+        ) -> bool:
+            gate_threads.add(threading.get_ident())
+            return super().should_forward(address, rssi, data, now)
+
+    scanner.set_payload_suppressor(_RecordingSuppressor(window=10.0))
+    try:
+        with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+            scanner.async_on_raw_advertisements(ADV)
+            # The loop only enqueued; nothing is delivered yet.
+            assert on_raw.call_count == 0
+            await _drain(worker, 1)
+            scanner.async_on_raw_advertisements(ADV)
+            await asyncio.sleep(0.05)
+    finally:
+        await worker.stop()
+    assert on_raw.call_count == 2
+    assert on_raw.call_args_list[0].args[0] == int_to_bluetooth_address(261602360644300)
+    assert gate_threads and threading.get_ident() not in gate_threads
+    # The second batch was entirely suppressed and never handed back.
+    assert worker.batches == 1
+    assert scanner.async_get_ingest_metrics().bytes_received == 12
+
+
+@pytest.mark.asyncio
+async def test_worker_coalesces_chunks_and_sheds_on_loop() -> None:
+    """Batches queued together come back in one loop callback, in order."""
+    scanner = make_scanner()
+    other = make_scanner()
+    worker = IngestWorker()
+    worker.async_start()
+    scanner.set_ingest_worker(worker)
+    other.set_ingest_worker(worker)
+    monitor = LoopLagMonitor()
+    other.set_load_shedder(LoadShedder(monitor, SHED_DROP))
+    monitor.shedding = True
+    batches: list[RawAdvertisementBatch] = []
+    scanner.set_raw_batch_handler(batches.append)
+    try:
+        with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+            # No await in between: the loop cannot run a delivery callback.
+            for _ in range(10):
+                scanner.async_on_raw_advertisements(ADV)
+                other.async_on_raw_advertisements(ADV)
+            await _drain(worker, 20)
+    finally:
+        await worker.stop()
+    assert len(batches) == 10
+    assert [batch.time for batch in batches] == sorted(batch.time for batch in batches)
+    assert worker.chunks < 20
+    on_raw.assert_not_called()
+
+
+@pytest.mark.asyncio
+async def test_worker_not_running_ingests_inline() -> None:
+    """A stopped worker hands batches back to the inline path."""
+    scanner = make_scanner()
+    worker = IngestWorker()
+    scanner.set_ingest_worker(worker)
+    with patch.object(ESPHomeScanner, "_async_on_raw_advertisement") as on_raw:
+        scanner.async_on_raw_advertisements(ADV)
+    assert on_raw.call_count == 2
+    worker.async_start()
+    with pytest.raises(RuntimeError, match="already running"):
+        worker.async_start()
+    await worker.stop()
+    await worker.stop()
+    assert not worker.running
+
+
+@pytest.mark.asyncio
+async def test_worker_drops_when_backlog_full() -> None:
+    """Past ``max_pending`` queued batches new ones are dropped and counted."""
+    scanner = make_scanner()
+    worker = IngestWorker(max_pending=1)
+    scanner.set_ingest_worker(worker)
+    release = threading.Event()
+
+    def _blocked_build(
+        advertisements: object, now: float
+    ) -> tuple[RawAdvertisementBatch, int]:
+        release.wait()
+        return RawAdvertisementBatch(ESP_MAC_ADDRESS, now, [], [], [], []), 0
+
+    worker.async_start()
+    with patch.object(ESPHomeScanner, "_build_raw_batch", _blocked_build):
+        try:
+            for _ in range(5):
+                scanner.async_on_raw_advertisements(ADV)
+            assert worker.dropped >= 3
+        finally:
+            release.set()
+            await worker.stop()
+    with pytest.raises(ValueError, match="Pending batch limit"):
+        IngestWorker(max_pending=0)
+
+
+@pytest.mark.asyncio
+async def test_worker_stop_does_not_block_the_loop() -> None:
+    """Stopping waits for the backlog off the loop; late batches keep order."""
+    scanner = make_scanner()
+    worker = IngestWorker()
+    scanner.set_ingest_worker(worker)
+    batches: list[RawAdvertisementBatch] = []
+    scanner.set_raw_batch_handler(batches.append)
+    release = threading.Event()
+    build = ESPHomeScanner._build_raw_batch
+
+    def _blocked_build(
+        self: ESPHomeScanner, advertisements: object, now: float
+    ) -> tuple[RawAdvertisementBatch, int]:
+        release.wait(1.0)
+        return build(self, advertisements, now)
+
+    worker.async_start()
+    with patch.object(ESPHomeScanner, "_build_raw_batch", _blocked_build):
+        scanner.async_on_raw_advertisements(ADV)
+        stopping = asyncio.create_task(worker.stop())
+        await asyncio.sleep(0.01)
+        assert not stopping.done()
+        # Batches arriving meanwhile still queue behind the backlog.
+        assert worker.running
+        scanner.async_on_raw_advertisements(LATER)
+        release.set()
+        await asyncio.wait_for(stopping, timeout=1)
+    assert not worker.running
+    assert [batch.rssis for batch in batches] == [[-96, -66], [-50]]
+    assert scanner.async_get_ingest_metrics().bytes_received == 9
+
+
+@pytest.mark.asyncio
+async def test_worker_pool_pins_each_scanner_to_one_worker() -> None:
+    """Scanners spread round robin; each proxy's batches stay on one thread."""
+    pool = IngestWorkerPool(threads=2)
+    scanners = [make_scanner() for _ in range(4)]
+    workers = [pool.bind(scanner) for scanner in scanners]
+    assert workers == [pool.workers[0], pool.workers[1]] * 2
+    batches: list[RawAdvertisementBatch] = []
+    for scanner in scanners:
+        scanner.set_raw_batch_handler(batches.append)
+    pool.async_start()
+    try:
+        for _ in range(5):
+            for scanner in scanners:
+                scanner.async_on_raw_advertisements(ADV)
+        for worker in pool.workers:
+            await _drain(worker, 10)
+    finally:
+        await pool.stop()
+    assert len(batches) == 20
+    assert not any(worker.running for worker in pool.workers)
+    assert len(IngestWorkerPool().workers) >= 1
+    with pytest.raises(ValueError, match="thread count"):
+        IngestWorkerPool(threads=0)
@@ -157,3 +157,36 @@ async def test_connect_no_watchdog_without_state_and_mode(
     scanner = client_data.scanner
     assert scanner is not None
     assert scanner._resubscribe_advertisements is None
+
+
+@pytest.mark.asyncio
+async def test_connect_binds_pausable_subscription(
+    mock_client: APIClient, mock_device_info: DeviceInfo
+) -> None:
+    """Raw and decoded subscriptions can both be paused and resumed."""
+    decoded = dataclasses.replace(
+        mock_device_info,
+        bluetooth_proxy_feature_flags=BluetoothProxyFeature.PASSIVE_SCAN,
+    )
+    for info, subscribe in (
+        (mock_device_info, mock_client.subscribe_bluetooth_le_raw_advertisements),
+        (decoded, mock_client.subscribe_bluetooth_le_advertisements),
+    ):
+        subscribe.reset_mock()
+        scanner = connect_scanner(mock_client, info, available=True).scanner
+        assert scanner is not None
+        scanner.async_pause_advertisements()
+        subscribe.return_value.assert_called_once()
+        scanner.async_resume_advertisements()
+        assert subscribe.call_count == 2
+
+
+@pytest.mark.asyncio
+async def test_can_connect_false_when_free_slots_leased() -> None:
+    """`_can_connect` counts slots leased to connects in flight as taken."""
+    device = ESPHomeBluetoothDevice("proxy", "AA:BB:CC:DD:EE:FF", available=True)
+    device.ble_connections_free = 1
+    device.async_lease_slot(1, 60.0)
+    assert _can_connect(device, "AA:BB:CC:DD:EE:FF") is False
+    device.async_release_slot_lease(1)
+    assert _can_connect(device, "AA:BB:CC:DD:EE:FF") is True
@@ -707,3 +707,30 @@ async def test_teardown_scanner_unregisters_even_if_unsetup_raises(
     unregister.assert_called_once_with()
     assert cast(Callable[[], None] | None, conn_manager._unsetup_scanner) is None
     assert cast(Callable[[], None] | None, conn_manager._unregister_scanner) is None
+
+
+@pytest.mark.asyncio
+async def test_reconnect_on_stall(
+    config: ESPHomeDeviceConfig,
+    patched_scanner_wiring: tuple[Mock, Mock],
+) -> None:
+    """A stalled scanner drops the API connection; teardown stops watching."""
+    manager = APIConnectionManager(config, reconnect_on_stall=True)
+    manager._cli = Mock()
+    manager._cli.device_info = AsyncMock(return_value=Mock())
+    manager._cli.disconnect = AsyncMock()
+    mock_scanner = Mock()
+    unwatch = mock_scanner.async_watch_for_stalls.return_value
+    connect_scanner_mock, _ = patched_scanner_wiring
+    connect_scanner_mock.return_value.scanner = mock_scanner
+    connect_scanner_mock.return_value.disconnect_callbacks = set()
+
+    await manager._on_connect()
+    (on_stall,) = mock_scanner.async_watch_for_stalls.call_args.args
+    on_stall(Mock(gap=30.0))
+    on_stall(Mock(gap=35.0))
+    await asyncio.sleep(0)
+    manager._cli.disconnect.assert_awaited_once_with(force=True)
+
+    manager._teardown_session()
+    unwatch.assert_called_once_with()